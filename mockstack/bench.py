@@ -0,0 +1,488 @@
+"""Load generator for measuring the throughput of mockstack.
+
+Drives the configured app with a mix of requests from concurrent clients,
+and reports throughput, latency percentiles and error rates, overall and
+broken down by the template or rule which handled each request.
+
+The app is either driven in-process (through its ASGI interface, measuring
+mockstack alone), on a local socket (including the HTTP server), or any
+running mockstack instance can be targeted by URL.
+
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import socket
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from enum import StrEnum
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+import httpx
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from mockstack.config import Settings
+from mockstack.metrics import UNMATCHED_ROUTE, RequestMetrics, request_metrics_for
+
+# response header through which the app reports the route of each request.
+ROUTE_HEADER = "x-mockstack-bench-route"
+
+# latency percentiles included in reports.
+PERCENTILES = (50, 90, 95, 99)
+
+
+class BenchMode(StrEnum):
+    """How the app is driven.
+
+    - IN_PROCESS sends requests straight to the ASGI app.
+    - SOCKET serves the app on a local socket, including the HTTP server.
+
+    """
+
+    IN_PROCESS = "in-process"
+    SOCKET = "socket"
+
+
+@dataclass(frozen=True)
+class BenchRequest:
+    """A request sent by the load generator."""
+
+    method: str
+    path: str
+    headers: dict[str, str] = field(default_factory=dict)
+    body: bytes | None = None
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "BenchRequest":
+        """Parse a request given as "[METHOD] PATH", e.g. "POST /api/v1/projects"."""
+        method, _, path = spec.strip().rpartition(" ")
+        return cls(method=(method.strip() or "GET").upper(), path=path)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "BenchRequest":
+        """Parse a request recorded as a JSON object.
+
+        Only `path` is required. `body` may be a string, or any other JSON
+        value, which is then sent as JSON.
+
+        """
+        headers = {k.lower(): str(v) for k, v in data.get("headers", {}).items()}
+        body = data.get("body")
+        if body is not None and not isinstance(body, str):
+            body = json.dumps(body)
+            headers.setdefault("content-type", "application/json")
+
+        return cls(
+            method=data.get("method", "GET").upper(),
+            path=data["path"],
+            headers=headers,
+            body=body.encode("utf-8") if body is not None else None,
+        )
+
+
+def load_traffic_file(filename: Path | str) -> list[BenchRequest]:
+    """Load recorded traffic from a file with one JSON request per line."""
+    with open(filename, "r") as file:
+        return [
+            BenchRequest.from_dict(json.loads(line)) for line in file if line.strip()
+        ]
+
+
+@dataclass(frozen=True)
+class BenchResult:
+    """The outcome of a single request."""
+
+    route: str
+    duration: float
+    status_code: int | None = None
+    error: str | None = None
+
+    @property
+    def failed(self) -> bool:
+        """Whether the request failed, i.e. raised or got a server error."""
+        return self.error is not None or (self.status_code or 0) >= 500
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """The p-th percentile of sorted values, using the nearest-rank method."""
+    if not sorted_values:
+        return 0.0
+
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(results: Sequence[BenchResult], elapsed: float) -> dict[str, Any]:
+    """Throughput, latency (in milliseconds) and error statistics of results."""
+    durations = sorted(result.duration * 1000 for result in results)
+    errors = sum(result.failed for result in results)
+
+    return {
+        "requests": len(results),
+        "rps": len(results) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "mean": sum(durations) / len(durations) if durations else 0.0,
+            **{f"p{p}": percentile(durations, p) for p in PERCENTILES},
+            "max": durations[-1] if durations else 0.0,
+        },
+        "errors": errors,
+        "error_rate": errors / len(results) if results else 0.0,
+        "status_codes": dict(
+            sorted(
+                Counter(
+                    str(result.status_code or result.error) for result in results
+                ).items()
+            )
+        ),
+    }
+
+
+def report_for(
+    results: Sequence[BenchResult], elapsed: float, *, by_route: bool = True
+) -> dict[str, Any]:
+    """The benchmark report, overall and broken down by route.
+
+    Without `by_route`, e.g. when routes are not reported by the app, `routes`
+    is None.
+
+    """
+    report = {"elapsed_seconds": elapsed, **summarize(results, elapsed)}
+    if not by_route:
+        return report | {"routes": None}
+
+    results_by_route: dict[str, list[BenchResult]] = defaultdict(list)
+    for result in results:
+        results_by_route[result.route].append(result)
+
+    return report | {
+        "routes": {
+            route: summarize(route_results, elapsed)
+            for route, route_results in sorted(results_by_route.items())
+        }
+    }
+
+
+def print_report(report: dict[str, Any]) -> None:
+    """Print a report as a table."""
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(
+        title=(
+            f"mockstack bench: {report['requests']} requests "
+            f"in {report['elapsed_seconds']:.2f}s"
+        ),
+        caption=(
+            "per-route breakdown unavailable for --url"
+            if report["routes"] is None
+            else None
+        ),
+    )
+    table.add_column("route")
+    for column in ("requests", "rps", "mean", *(f"p{p}" for p in PERCENTILES)):
+        table.add_column(column, justify="right")
+    table.add_column("max", justify="right")
+    table.add_column("errors", justify="right")
+
+    def add_row(route: str, summary: dict[str, Any], **kwargs) -> None:
+        latency = summary["latency_ms"]
+        table.add_row(
+            route,
+            str(summary["requests"]),
+            f"{summary['rps']:.1f}",
+            *(
+                f"{latency[key]:.2f}ms"
+                for key in ("mean", *(f"p{p}" for p in PERCENTILES), "max")
+            ),
+            f"{summary['error_rate']:.1%}",
+            **kwargs,
+        )
+
+    if report["routes"] is not None:
+        for route, summary in report["routes"].items():
+            add_row(route, summary)
+        table.add_section()
+    add_row("total", report, style="bold")
+
+    Console().print(table)
+
+
+class RouteHeaderMiddleware:
+    """Reports the template or rule handling each request in a response header.
+
+    Relies on strategies reporting their route for metrics (see
+    `mockstack.metrics.RequestMetrics`), whether or not metrics are enabled.
+
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        scope.setdefault("state", {}).setdefault("metrics", RequestMetrics())
+
+        async def send_with_route(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # looked up again, as the metrics middleware replaces it when enabled.
+                request_metrics = request_metrics_for(scope)
+                route = request_metrics.route if request_metrics else None
+                headers = MutableHeaders(scope=message)
+                headers[ROUTE_HEADER] = route or UNMATCHED_ROUTE
+            await send(message)
+
+        await self.app(scope, receive, send_with_route)
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    requests: Sequence[BenchRequest],
+    *,
+    concurrency: int,
+    total: int | None = None,
+    duration: float | None = None,
+) -> tuple[list[BenchResult], float]:
+    """Send requests from concurrent clients, returning results and elapsed time.
+
+    Requests are sent in order, cycling through them, until either `total`
+    requests were sent or `duration` seconds have passed.
+
+    """
+    if total is None and duration is None:
+        raise ValueError("Either total or duration is required")
+
+    results: list[BenchResult] = []
+    sent = 0
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else math.inf
+
+    async def worker() -> None:
+        nonlocal sent
+        while (total is None or sent < total) and time.perf_counter() < deadline:
+            request = requests[sent % len(requests)]
+            sent += 1
+
+            request_start = time.perf_counter()
+            try:
+                response = await client.request(
+                    request.method,
+                    request.path,
+                    headers=request.headers,
+                    content=request.body,
+                )
+            except httpx.HTTPError as e:
+                results.append(
+                    BenchResult(
+                        route=UNMATCHED_ROUTE,
+                        duration=time.perf_counter() - request_start,
+                        error=type(e).__name__,
+                    )
+                )
+                continue
+
+            results.append(
+                BenchResult(
+                    route=response.headers.get(ROUTE_HEADER, request.path),
+                    duration=time.perf_counter() - request_start,
+                    status_code=response.status_code,
+                )
+            )
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return results, time.perf_counter() - start
+
+
+async def bench(
+    settings: Settings | None,
+    requests: Sequence[BenchRequest],
+    *,
+    mode: BenchMode = BenchMode.IN_PROCESS,
+    url: str | None = None,
+    concurrency: int = 10,
+    total: int | None = None,
+    duration: float | None = None,
+    warmup: int = 0,
+) -> dict[str, Any]:
+    """Benchmark the app for the given settings, or the mockstack at `url`.
+
+    Routes are only reported by the app for the given settings, so reports for
+    `url` are not broken down by route, and settings are not needed.
+
+    """
+    from mockstack.embedding import BASE_URL, QUIET_LOGGING, EmbeddedMockStack
+
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async def run(client: httpx.AsyncClient) -> dict[str, Any]:
+        if warmup:
+            await drive(client, requests, concurrency=concurrency, total=warmup)
+        results, elapsed = await drive(
+            client, requests, concurrency=concurrency, total=total, duration=duration
+        )
+        return report_for(results, elapsed, by_route=url is None)
+
+    if url is not None:
+        async with httpx.AsyncClient(base_url=url, limits=limits) as client:
+            return await run(client)
+    if settings is None:
+        raise ValueError("Either settings or url is required")
+
+    # logging every request would mostly measure (and flood) the console.
+    embedded = EmbeddedMockStack(settings, logging=QUIET_LOGGING)
+    embedded.app.add_middleware(RouteHeaderMiddleware)
+
+    if mode == BenchMode.IN_PROCESS:
+        async with embedded:
+            async with httpx.AsyncClient(
+                transport=embedded.async_transport(), base_url=BASE_URL
+            ) as client:
+                return await run(client)
+
+    import uvicorn
+
+    from mockstack.server import server_options
+
+    sock = socket.create_server(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    options = server_options(settings) | {
+        "host": "127.0.0.1",
+        "port": port,
+        "access_log": False,
+    }
+    server = uvicorn.Server(
+        uvicorn.Config(embedded.app, log_level="warning", **options)
+    )
+
+    # served from a thread with its own event loop, as sharing the loop of the
+    # client would serialize the two and mostly measure the scheduling between them.
+    serving = threading.Thread(target=server.run, kwargs={"sockets": [sock]})
+    serving.start()
+    try:
+        while not server.started:
+            if not serving.is_alive():
+                raise RuntimeError("The benchmarked server failed to start.")
+            await asyncio.sleep(0.01)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits
+        ) as client:
+            return await run(client)
+    finally:
+        server.should_exit = True
+        await asyncio.to_thread(serving.join)
+        sock.close()
+
+
+def parser_for_bench() -> argparse.ArgumentParser:
+    """Command line parser for the bench options."""
+    parser = argparse.ArgumentParser(
+        prog="mockstack bench",
+        description=(
+            "Measure the throughput of mockstack. Any mockstack setting can be "
+            "given as well, to configure the benchmarked app."
+        ),
+    )
+    parser.add_argument(
+        "--request",
+        dest="request_specs",
+        action="append",
+        metavar="'[METHOD] PATH'",
+        help="request to send, e.g. 'GET /api/v1/projects/1'. Can be repeated.",
+    )
+    parser.add_argument(
+        "--traffic-file",
+        type=Path,
+        help="file of recorded requests to send, one JSON object per line "
+        'with "path" and optionally "method", "headers" and "body".',
+    )
+    parser.add_argument(
+        "--mode",
+        type=BenchMode,
+        choices=list(BenchMode),
+        default=BenchMode.IN_PROCESS,
+        help="drive the app in-process, or over a local socket.",
+    )
+    parser.add_argument(
+        "--url", help="benchmark the mockstack running at this URL instead."
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=10, help="number of concurrent clients."
+    )
+    parser.add_argument(
+        "--total", type=int, help="number of requests to send (default: 1000)."
+    )
+    parser.add_argument(
+        "--duration", type=float, help="seconds to send requests for, instead."
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=0, help="requests to send before measuring."
+    )
+    parser.add_argument(
+        "--json",
+        dest="json_filename",
+        type=Path,
+        help="also write the report as JSON to this file ('-' for stdout only).",
+    )
+    return parser
+
+
+def requests_for(args: argparse.Namespace) -> list[BenchRequest]:
+    """The requests to send given the command line options."""
+    requests: list[BenchRequest] = []
+    if args.traffic_file is not None:
+        requests.extend(load_traffic_file(args.traffic_file))
+    requests.extend(BenchRequest.from_spec(spec) for spec in args.request_specs or ())
+
+    return requests or [BenchRequest.from_spec("GET /")]
+
+
+def run(argv: Iterable[str]) -> dict[str, Any]:
+    """Run the bench command with the given command line arguments."""
+    from pydantic_settings import CliApp, CliSettingsSource
+
+    from mockstack.config import CliSettings
+
+    argv = list(argv)
+    parser = parser_for_bench()
+    cli_settings: CliSettingsSource[CliSettings] = CliSettingsSource(
+        CliSettings, root_parser=parser, cli_parse_args=False
+    )
+    args = parser.parse_args(argv)
+    # no app is built for a running mockstack, so settings are not required.
+    settings = (
+        CliApp.run(CliSettings, cli_args=argv, cli_settings_source=cli_settings)
+        if args.url is None
+        else None
+    )
+
+    report = asyncio.run(
+        bench(
+            settings,
+            requests_for(args),
+            mode=args.mode,
+            url=args.url,
+            concurrency=args.concurrency,
+            total=args.total if args.total or args.duration else 1000,
+            duration=args.duration,
+            warmup=args.warmup,
+        )
+    )
+
+    if args.json_filename is None:
+        print_report(report)
+    elif str(args.json_filename) == "-":
+        print(json.dumps(report, indent=2))
+    else:
+        args.json_filename.write_text(json.dumps(report, indent=2))
+        print_report(report)
+
+    return report
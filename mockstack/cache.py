@@ -0,0 +1,218 @@
+"""Generic caching building blocks."""
+
+import contextlib
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """A size-bounded least-recently-used cache.
+
+    The size of each value is given by `sizeof`, which defaults to counting
+    entries. Passing e.g. `len` for bytes values bounds the cache by memory
+    instead. Values larger than the whole cache are never stored.
+
+    `on_evict` is called with the key and value of each entry evicted to make
+    room for others, but not for entries removed explicitly.
+
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        *,
+        sizeof: Callable[[V], int] = lambda _: 1,
+        on_evict: Callable[[K, V], None] | None = None,
+    ):
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.on_evict = on_evict
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[K, tuple[V, int]] = OrderedDict()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        """Get a value, marking it as recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: K, value: V) -> None:
+        """Store a value, evicting least recently used values as needed."""
+        size = self.sizeof(value)
+        self.pop(key)
+        if size > self.max_size:
+            return
+
+        self._entries[key] = (value, size)
+        self.size += size
+        while self.size > self.max_size:
+            evicted_key, (evicted, evicted_size) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+            if self.on_evict is not None:
+                self.on_evict(evicted_key, evicted)
+
+    def pop(self, key: K) -> V | None:
+        """Remove a value, returning it if it was present."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+
+        self.size -= entry[1]
+        return entry[0]
+
+    def items(self) -> list[tuple[K, V]]:
+        """All keys and values, from least to most recently used.
+
+        A snapshot, which does not mark any values as recently used.
+
+        """
+        return [(key, value) for key, (value, _) in self._entries.items()]
+
+    def clear(self) -> None:
+        """Remove all values."""
+        self._entries.clear()
+        self.size = 0
+
+
+class DiskCache:
+    """A persistent key-value store of bytes values under a directory.
+
+    Keys are hashed into filenames, so any string can be used as a key.
+    Writes are atomic, making the store safe to share between processes.
+
+    With `max_bytes`, once the total size of the stored values exceeds it, the
+    least recently used values (by modification time, which reads refresh) are
+    removed until the total is back under `PRUNE_RATIO` of `max_bytes`, so that
+    pruning is not needed on every write. Values larger than `max_bytes` are
+    never stored.
+
+    """
+
+    # fraction of `max_bytes` the total size is brought back to when pruning.
+    PRUNE_RATIO = 0.9
+
+    def __init__(self, directory: Path | str, *, max_bytes: int | None = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # total size of the stored values as last known by this process, which
+        # is only exact after pruning when the directory is shared. Computed on
+        # first write, as it requires scanning the directory.
+        self.size: int | None = None
+
+    def path_for(self, key: str) -> Path:
+        """The file backing the given key."""
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.directory / digest[:2] / digest
+
+    def get(self, key: str) -> bytes | None:
+        """Read a value, or None if it is not stored."""
+        path = self.path_for(key)
+        try:
+            value = path.read_bytes()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        if self.max_bytes is not None:
+            # marks the value as recently used, for pruning.
+            with contextlib.suppress(FileNotFoundError):
+                os.utime(path)
+
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        """Write a value atomically, pruning least recently used values as needed."""
+        if self.max_bytes is not None and len(value) > self.max_bytes:
+            self.delete(key)
+            return
+
+        path = self.path_for(key)
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp_filename = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp_filename, path)
+        except BaseException:
+            os.unlink(tmp_filename)
+            raise
+
+        if self.max_bytes is None:
+            return
+
+        if self.size is None:
+            self.size = sum(size for _, size, _ in self._scan())
+        else:
+            # overwritten values are counted twice until the next pruning.
+            self.size += len(value)
+        if self.size > self.max_bytes:
+            self.prune()
+
+    def delete(self, key: str) -> None:
+        """Remove a value if it is stored."""
+        path = self.path_for(key)
+        try:
+            size = path.stat().st_size
+            os.unlink(path)
+        except FileNotFoundError:
+            return
+
+        if self.size is not None:
+            self.size = max(self.size - size, 0)
+
+    def prune(self) -> None:
+        """Remove least recently used values until within `max_bytes`."""
+        if self.max_bytes is None:
+            return
+
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * self.PRUNE_RATIO
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(path)
+                total -= size
+
+        self.size = total
+
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        """Modification time, size and path of the stored values."""
+        entries = []
+        for path in self.directory.glob("*/*"):
+            if path.suffix == ".tmp":
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # removed (e.g. by another process) while scanning.
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        return entries
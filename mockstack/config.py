@@ -1,4 +1,5 @@
 from functools import lru_cache
+from pathlib import Path
 from typing import Any, Literal, Self
 
 from pydantic import DirectoryPath, FilePath, model_validator
@@ -13,7 +14,11 @@ from mockstack.constants import (
     ENV_FILE,
     ENV_NESTED_DELIMITER,
     ENV_PREFIX,
+    OpenTelemetryExporterProtocol,
     ProxyRulesRedirectVia,
+    ServerHTTPProtocol,
+    ServerLoop,
+    TemplatesManifestWatchMode,
 )
 
 
@@ -24,10 +29,84 @@ class OpenTelemetrySettings(BaseSettings):
 
     endpoint: str = "http://localhost:4317/"
 
+    # transport used to export spans. Note that OTLP/HTTP endpoints typically
+    # listen on port 4318 and expect the full path, e.g. http://localhost:4318/v1/traces
+    protocol: OpenTelemetryExporterProtocol = OpenTelemetryExporterProtocol.GRPC
+
+    # fraction of traces (between 0 and 1) to sample. Requests carrying a
+    # trace context follow the sampling decision of their parent instead.
+    sample_ratio: float = 1.0
+
+    # upper bound on the number of traces sampled per second. None disables the limit.
+    max_traces_per_second: float | None = None
+
+    # batching of exported spans. See the OpenTelemetry SDK BatchSpanProcessor
+    # for details. None uses the SDK defaults (or OTEL_BSP_* environment variables).
+    max_export_batch_size: int | None = None
+    max_queue_size: int | None = None
+    schedule_delay_millis: float | None = None
+    export_timeout_millis: float | None = None
+
     # whether to capture the response body.
     # this can be heavy, sensitive (PII) and/or not needed depending on the use case.
     capture_response_body: CliImplicitFlag[bool] = False
 
+    # maximum number of bytes of each response body to capture. Longer bodies
+    # are truncated, which is recorded on the span.
+    capture_response_body_max_bytes: int = 64 * 1024
+
+    # fraction of traced requests (between 0 and 1) whose response body is captured.
+    capture_response_body_sample_ratio: float = 1.0
+
+
+class MetricsSettings(BaseSettings):
+    """Settings for Prometheus metrics."""
+
+    # scoped so that e.g. `path` is not read from the PATH environment variable.
+    model_config = SettingsConfigDict(
+        env_prefix=f"{ENV_PREFIX}metrics{ENV_NESTED_DELIMITER}"
+    )
+
+    # whether to collect metrics and expose them on `path`.
+    # requires the optional dependency mockstack[metrics].
+    enabled: CliImplicitFlag[bool] = False
+
+    # reserved path on which metrics are served in the Prometheus text format.
+    # requests to this path never reach the strategy.
+    path: str = "/__mockstack__/metrics"
+
+
+class ServerSettings(BaseSettings):
+    """Settings for tuning the (uvicorn) server."""
+
+    model_config = SettingsConfigDict(
+        env_prefix=f"{ENV_PREFIX}server{ENV_NESTED_DELIMITER}"
+    )
+
+    # event loop implementation. "auto" prefers uvloop when installed.
+    loop: ServerLoop = ServerLoop.AUTO
+
+    # HTTP/1.1 parser implementation. "auto" prefers httptools when installed.
+    http: ServerHTTPProtocol = ServerHTTPProtocol.AUTO
+
+    # maximum number of pending connections queued by the listening socket.
+    backlog: int = 2048
+
+    # maximum number of concurrent connections or tasks before responding
+    # with 503 Service Unavailable. None disables the limit.
+    limit_concurrency: int | None = None
+
+    # seconds to keep idle client connections open between requests.
+    timeout_keep_alive: int = 5
+
+    # maximum size in bytes of an incomplete HTTP event when using h11.
+    # None uses the h11 default.
+    h11_max_incomplete_event_size: int | None = None
+
+    # whether to log every request. Disabling it can make a noticeable
+    # difference to throughput under load.
+    access_log: CliImplicitFlag[bool] = True
+
 
 class Settings(BaseSettings):
     """Settings for mockstack.
@@ -52,9 +131,19 @@ class Settings(BaseSettings):
     # port to run the server on
     port: int = 8000
 
+    # number of worker processes serving requests. Templates and rules are
+    # loaded once before the workers are forked, so they share them in memory.
+    workers: int = 1
+
+    # server tuning configuration
+    server: ServerSettings = ServerSettings()
+
     # OpenTelemetry configuration
     opentelemetry: OpenTelemetrySettings = OpenTelemetrySettings()
 
+    # Prometheus metrics configuration
+    metrics: MetricsSettings = MetricsSettings()
+
     # strategy to use for handling requests
     strategy: Literal["filefixtures", "proxyrules"] = "filefixtures"
 
@@ -68,6 +157,53 @@ class Settings(BaseSettings):
     # with a 404, we will then try to simulate creation of the resource.
     filefixtures_enable_templates_for_post: CliImplicitFlag[bool] = True
 
+    # whether to index templates_dir in memory at startup.
+    # When enabled, template lookups are answered from the in-memory manifest
+    # instead of hitting the filesystem on every request, which can make a big
+    # difference on slow (e.g. network) filesystems.
+    filefixtures_templates_manifest: CliImplicitFlag[bool] = False
+
+    # how to keep the templates manifest up to date with changes on disk.
+    # "auto" uses native filesystem events if `watchfiles` is installed and
+    # otherwise falls back to polling. "none" disables watching altogether.
+    filefixtures_templates_manifest_watch: TemplatesManifestWatchMode = (
+        TemplatesManifestWatchMode.AUTO
+    )
+
+    # interval in seconds between re-scans of templates_dir when polling.
+    filefixtures_templates_manifest_poll_interval: float = 1.0
+
+    # whether to remember resources created via POST in memory, so that they can
+    # be read back. GET, PATCH, PUT and DELETE requests for stored resources (and
+    # GET requests for their collections) are then served from the store, and
+    # all other requests fall back to templates as usual.
+    filefixtures_resource_store: CliImplicitFlag[bool] = False
+
+    # upper bound on the total size in bytes (JSON-encoded) of stored resources.
+    # The least recently used resources are evicted beyond it.
+    filefixtures_resource_store_max_bytes: int = 64 * 1024 * 1024
+
+    # time in seconds after which stored resources expire, counting from when
+    # they were last written. None keeps them until evicted.
+    filefixtures_resource_store_ttl: float | None = None
+
+    # field holding the identifier of created resources, as injected through
+    # created_resource_metadata.
+    filefixtures_resource_store_id_field: str = "id"
+
+    # fields of stored resources to index, so that collections can be filtered
+    # by their values with query parameters, e.g. `GET /api/v1/projects?status=active`.
+    filefixtures_resource_store_indexed_fields: list[str] = []
+
+    # optional SQLite database file in which stored resources are persisted, so
+    # that they survive restarts and are shared by all worker processes. Created
+    # if it does not exist. Resources are only kept in memory otherwise.
+    filefixtures_resource_store_path: Path | None = None
+
+    # interval in seconds between compactions of the resource store, which
+    # remove expired resources and, when persisted, enforce max_bytes.
+    filefixtures_resource_store_compaction_interval: float = 60.0
+
     # rules filename for proxyrules strategy
     proxyrules_rules_filename: FilePath | None = None  # type: ignore[assignment]
 
@@ -78,6 +214,66 @@ class Settings(BaseSettings):
     # default timeout for reverse proxy requests. given in seconds. None disables timeouts.
     proxyrules_reverse_proxy_timeout: float | None = 10.0
 
+    # connection pooling for reverse proxy requests. A single upstream client is
+    # shared across requests for the lifetime of the app, so connections to
+    # upstream hosts are kept alive and reused. None disables the given limit.
+    proxyrules_reverse_proxy_max_connections: int | None = 100
+    proxyrules_reverse_proxy_max_keepalive_connections: int | None = 20
+
+    # how long (in seconds) idle keep-alive connections are kept in the pool.
+    proxyrules_reverse_proxy_keepalive_expiry: float | None = 5.0
+
+    # whether to negotiate HTTP/2 with upstream hosts that support it.
+    # requires the optional dependency mockstack[http2].
+    proxyrules_reverse_proxy_http2: CliImplicitFlag[bool] = False
+
+    # whether to stream request and response bodies through the reverse proxy
+    # instead of buffering them fully in memory. Useful for large payloads and
+    # server-sent events. Response bodies are passed through as-is (e.g. still
+    # compressed) in this mode.
+    proxyrules_reverse_proxy_streaming: CliImplicitFlag[bool] = False
+
+    # whether to record successful reverse proxied GET responses as templates
+    # under templates_dir, named the way the filefixtures strategy looks them up.
+    # Running the filefixtures strategy against the same templates_dir then
+    # replays the recorded responses without any upstream services.
+    # Responses are written in the background after being sent to the client.
+    # Streamed responses (see above) are not recorded.
+    proxyrules_record_templates: CliImplicitFlag[bool] = False
+
+    # whether to cache reverse proxied GET responses according to HTTP caching
+    # semantics (Cache-Control, Expires, ETag / Last-Modified revalidation,
+    # stale-while-revalidate and Vary).
+    proxyrules_cache_enabled: CliImplicitFlag[bool] = False
+
+    # upper bound on the total size in bytes of responses cached in memory.
+    proxyrules_cache_max_bytes: int = 64 * 1024 * 1024
+
+    # optional directory for persisting cached responses on disk, in addition
+    # to the in-memory cache. Created if it does not exist.
+    proxyrules_cache_dir: Path | None = None
+
+    # upper bound on the total size in bytes of responses cached on disk. Least
+    # recently used responses are removed beyond it.
+    proxyrules_cache_dir_max_bytes: int = 1024 * 1024 * 1024
+
+    # whether to coalesce identical concurrent reverse proxied requests, so that
+    # they share a single in-flight upstream call and its buffered response.
+    # Only applies to requests with safe methods (GET, HEAD, OPTIONS) and no
+    # body. Protects fragile upstream services from thundering herds.
+    proxyrules_coalesce_requests: CliImplicitFlag[bool] = False
+
+    # request headers which, in addition to the method and URL, must match for
+    # concurrent requests to be coalesced. Should include any header that can
+    # change the upstream response, e.g. credentials or content negotiation.
+    proxyrules_coalesce_headers: CliSuppress[list[str]] = [
+        "accept",
+        "accept-encoding",
+        "accept-language",
+        "authorization",
+        "cookie",
+    ]
+
     # controls behavior of proxying. Whether to simulate creation of resources
     # when a POST request is made to a resource that doesn't match any rules..
     proxyrules_simulate_create_on_missing: CliImplicitFlag[bool] = False
@@ -87,6 +283,38 @@ class Settings(BaseSettings):
     # disable with caution!
     proxyrules_verify_ssl_certificates: CliImplicitFlag[bool] = True
 
+    # host of the Ollama server used by the `ollama` template function.
+    # None uses the default of the ollama client (OLLAMA_HOST or localhost).
+    ollama_host: str | None = None
+
+    # maximum number of concurrent `ollama` template calls per model. Further
+    # calls wait for a slot, without blocking requests to other endpoints.
+    ollama_max_concurrency: int = 1
+
+    # whether to cache completions of the `ollama` template function, keyed on
+    # the model, messages and options. Repeated identical prompts are then only
+    # generated once, at the cost of no longer being non-deterministic.
+    ollama_cache_enabled: CliImplicitFlag[bool] = False
+
+    # maximum number of completions cached in memory.
+    ollama_cache_max_entries: int = 1024
+
+    # optional directory for persisting cached completions on disk, in addition
+    # to the in-memory cache. Created if it does not exist.
+    ollama_cache_dir: Path | None = None
+
+    # upper bound on the total size in bytes of completions cached on disk.
+    # Least recently used completions are removed beyond it.
+    ollama_cache_dir_max_bytes: int = 256 * 1024 * 1024
+
+    # optional directory of tabular datasets available to templates, e.g. a file
+    # `customers.csv` as `datasets.customers`. CSV and JSON lines files are
+    # supported, as well as Parquet with the optional dependency mockstack[parquet].
+    datasets_dir: DirectoryPath | None = None
+
+    # columns of datasets indexed for constant-time lookups, when present.
+    datasets_index_columns: list[str] = ["id"]
+
     # metadata fields to inject into created resources.
     # A few template fields are available. See documentation for more details.
     created_resource_metadata: CliSuppress[dict[str, Any]] = {
@@ -157,6 +385,10 @@ class Settings(BaseSettings):
                 raise ValueError(
                     "proxyrules_rules_filename is required when strategy is proxyrules"
                 )
+            if self.proxyrules_record_templates and self.templates_dir is None:
+                raise ValueError(
+                    "templates_dir is required when proxyrules_record_templates is set"
+                )
 
         elif self.strategy == "filefixtures":
             if self.templates_dir is None:
@@ -7,10 +7,31 @@ ENV_PREFIX = "mockstack__"
 ENV_FILE = ".env"
 ENV_NESTED_DELIMITER = "__"
 
+# environment variable used to hand serialized settings to worker processes.
+SERIALIZED_SETTINGS_ENV_VAR = "MOCKSTACK_SERIALIZED_SETTINGS"
+
 # Template files are identified by a file:// URL prefix.
 PROXYRULES_FILE_TEMPLATE_PREFIX = "file:///"
 
-SENSITIVE_HEADERS = ["authorization", "cookie", "set-cookie"]
+SENSITIVE_HEADERS = frozenset({"authorization", "cookie", "set-cookie"})
+
+# Headers which are meaningful only for a single transport-level connection
+# and must not be forwarded by proxies.
+# See https://datatracker.ietf.org/doc/html/rfc9110#section-7.6.1
+HOP_BY_HOP_HEADERS = (
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+)
+
+# methods which are safe to coalesce into a single upstream request.
+# See https://www.rfc-editor.org/rfc/rfc9110#section-9.2.1
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
 
 # See https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/Content-Encoding
 CONTENT_ENCODING_COMPRESSED = (
@@ -36,3 +57,55 @@ class ProxyRulesRedirectVia(StrEnum):
     HTTP_TEMPORARY_REDIRECT = "http_307_temporary"
     HTTP_PERMANENT_REDIRECT = "http_301_permanent"
     REVERSE_PROXY = "reverse_proxy"
+
+
+class TemplatesManifestWatchMode(StrEnum):
+    """How to keep the in-memory templates manifest up to date.
+
+    - AUTO uses native filesystem events when `watchfiles` is installed,
+        falling back to polling otherwise.
+    - WATCHFILES uses native filesystem events via `watchfiles`.
+    - POLL periodically re-scans the templates directory.
+    - NONE never refreshes the manifest after startup.
+
+    """
+
+    AUTO = "auto"
+    WATCHFILES = "watchfiles"
+    POLL = "poll"
+    NONE = "none"
+
+
+class OpenTelemetryExporterProtocol(StrEnum):
+    """The transport used to export spans to the OTLP endpoint.
+
+    Values match those of the standard OTEL_EXPORTER_OTLP_PROTOCOL variable.
+
+    """
+
+    GRPC = "grpc"
+    HTTP_PROTOBUF = "http/protobuf"
+
+
+class ServerLoop(StrEnum):
+    """The event loop implementation used by the server.
+
+    - AUTO uses `uvloop` when installed, falling back to `asyncio` otherwise.
+
+    """
+
+    AUTO = "auto"
+    ASYNCIO = "asyncio"
+    UVLOOP = "uvloop"
+
+
+class ServerHTTPProtocol(StrEnum):
+    """The HTTP/1.1 parser used by the server.
+
+    - AUTO uses `httptools` when installed, falling back to `h11` otherwise.
+
+    """
+
+    AUTO = "auto"
+    H11 = "h11"
+    HTTPTOOLS = "httptools"
@@ -0,0 +1,383 @@
+"""Tabular datasets available to templates.
+
+Datasets are loaded once from CSV, JSON lines or (with the optional dependency
+mockstack[parquet]) Parquet files into compact, column-oriented structures, so
+that templates can emulate endpoints over large numbers of records:
+
+    {{ datasets.customers.get(customers) | tojson }}
+    {{ datasets.customers.filter(query, limit=20) | tojson }}
+
+"""
+
+import csv
+import importlib.util
+import itertools
+import json
+import logging
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+from mockstack.exceptions import raise_for_missing
+from mockstack.store import index_value
+
+# checked without importing pyarrow, which is only imported (as it is
+# comparatively slow to) once a Parquet dataset is loaded.
+IS_PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+logger = logging.getLogger("mockstack.datasets")
+
+
+def compact_column(values: list, *, parse: bool = False) -> Sequence:
+    """A compact column holding the given values.
+
+    Integer and float columns are stored in typed arrays, and repeated strings
+    share a single object. With `parse`, string values (e.g. read from CSV) are
+    converted to numbers if all of them represent numbers exactly.
+
+    """
+    if parse and all(isinstance(value, str) for value in values):
+        for convert, typecode in ((int, "q"), (float, "d")):
+            try:
+                converted = [convert(value) for value in values]
+            except (ValueError, OverflowError):
+                continue
+            # only if nothing is lost, e.g. leading zeros of "007".
+            if all(str(c) == value for c, value in zip(converted, values)):
+                values = converted
+                break
+
+    if values and all(type(value) is int for value in values):
+        try:
+            return array("q", values)
+        except OverflowError:
+            pass
+    if values and all(type(value) in (int, float) for value in values):
+        return array("d", values)
+
+    strings: dict[str, str] = {}
+    return [
+        strings.setdefault(value, value) if isinstance(value, str) else value
+        for value in values
+    ]
+
+
+def column_matcher(column: Sequence, value: Any) -> Callable[[int], bool]:
+    """A predicate on row positions, for the column value being equal to `value`.
+
+    Values are compared as they would be in a query string, e.g. `"3"` matches
+    the number 3.
+
+    """
+    key = index_value(value)
+    if isinstance(column, array):
+        try:
+            number = int(key) if column.typecode == "q" else float(key)
+        except ValueError:
+            return lambda position: False
+        return lambda position: column[position] == number
+
+    return lambda position: (
+        column[position] == key
+        if isinstance(column[position], str)
+        else index_value(column[position]) == key
+    )
+
+
+class Dataset:
+    """A tabular dataset, stored column by column.
+
+    Rows are materialized as dicts only when returned. Values of the
+    `index_columns` are indexed in hash tables, for constant-time lookups.
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        columns: Mapping[str, Sequence],
+        *,
+        index_columns: Iterable[str] = (),
+    ):
+        self.name = name
+        self.columns = dict(columns)
+        self.length = len(next(iter(self.columns.values()), ()))
+
+        # positions of the rows by indexed value, a single position being
+        # stored as is to save memory on unique columns.
+        self.indexes: dict[str, dict[str, int | list[int]]] = {
+            column: self._index(self.columns[column])
+            for column in index_columns
+            if column in self.columns
+        }
+
+    @classmethod
+    def from_rows(
+        cls, name: str, rows: Iterable[Mapping[str, Any]], **kwargs
+    ) -> "Dataset":
+        """Create a dataset from rows, e.g. parsed JSON objects."""
+        values: dict[str, list] = {}
+        length = 0
+        for row in rows:
+            for column, value in row.items():
+                if column not in values:
+                    # columns missing from earlier rows are padded with None.
+                    values[column] = [None] * length
+                values[column].append(value)
+            length += 1
+            for column_values in values.values():
+                if len(column_values) < length:
+                    column_values.append(None)
+
+        return cls(
+            name,
+            {
+                column: compact_column(column_values)
+                for column, column_values in values.items()
+            },
+            **kwargs,
+        )
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[dict]:
+        return (self.row(position) for position in range(self.length))
+
+    def __repr__(self) -> str:
+        return f"<Dataset {self.name}: {self.length} rows>"
+
+    def row(self, position: int) -> dict:
+        """The row at the given position."""
+        return {name: column[position] for name, column in self.columns.items()}
+
+    def get(self, value: Any, column: str | None = None) -> dict | None:
+        """The first row whose `column` equals the value, if any.
+
+        The column defaults to the first indexed column, e.g. `id`.
+
+        """
+        if column is None:
+            if not self.indexes:
+                raise ValueError(f"Dataset {self.name} has no indexed columns")
+            column = next(iter(self.indexes))
+
+        position = next(iter(self._positions({column: value})), None)
+        return self.row(position) if position is not None else None
+
+    def filter(
+        self,
+        filters: Mapping[str, Any] | None = None,
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+        **kwargs: Any,
+    ) -> list[dict]:
+        """The rows whose columns equal the given values, in dataset order.
+
+        Filters on names which are not columns are ignored, so that e.g. the
+        `query` of a request can be passed as is. Indexed columns narrow down
+        the rows to scan.
+
+        """
+        positions = self._positions({**(filters or {}), **kwargs})
+        stop = offset + limit if limit is not None else None
+        if isinstance(positions, Sequence):
+            selected: Iterable[int] = positions[offset:stop]
+        else:
+            selected = itertools.islice(positions, offset, stop)
+
+        return [self.row(position) for position in selected]
+
+    def count(self, filters: Mapping[str, Any] | None = None, **kwargs: Any) -> int:
+        """The number of rows whose columns equal the given values."""
+        positions = self._positions({**(filters or {}), **kwargs})
+        if isinstance(positions, Sequence):
+            return len(positions)
+
+        return sum(1 for _ in positions)
+
+    def page(
+        self, filters: Mapping[str, Any] | None = None, *, limit: int, offset: int = 0
+    ) -> tuple[int, list[dict]]:
+        """The number of matching rows, along with those of a page of them.
+
+        Equivalent to `count` and `filter`, but scanning the rows only once.
+
+        """
+        positions = self._positions(filters or {})
+        if not isinstance(positions, Sequence):
+            # only the positions of matching rows are kept.
+            positions = list(positions)
+
+        selected = positions[offset : offset + limit]
+        return len(positions), [self.row(position) for position in selected]
+
+    def _positions(self, filters: Mapping[str, Any]) -> Sequence[int] | Iterator[int]:
+        """Positions of the rows matching the filters, in ascending order.
+
+        Positions are given as a sequence when known without scanning, e.g.
+        all rows, so that pages are sliced in constant time.
+
+        """
+        conditions = {
+            column: value for column, value in filters.items() if column in self.columns
+        }
+
+        candidates: Sequence[int] = range(self.length)
+        indexed = [column for column in conditions if column in self.indexes]
+        if indexed:
+            column = min(indexed, key=lambda c: len(self._indexed(c, conditions[c])))
+            candidates = self._indexed(column, conditions.pop(column))
+        if not conditions:
+            return candidates
+
+        positions: Iterator[int] = iter(candidates)
+        for column, value in conditions.items():
+            positions = filter(column_matcher(self.columns[column], value), positions)
+
+        return positions
+
+    def _indexed(self, column: str, value: Any) -> list[int]:
+        positions = self.indexes[column].get(index_value(value), [])
+        return [positions] if isinstance(positions, int) else positions
+
+    def _index(self, column: Sequence) -> dict[str, int | list[int]]:
+        index: dict[str, int | list[int]] = {}
+        for position, value in enumerate(column):
+            if value is None:
+                continue
+
+            key = index_value(value)
+            existing = index.setdefault(key, position)
+            if existing == position:
+                continue
+            if isinstance(existing, int):
+                index[key] = [existing, position]
+            else:
+                existing.append(position)
+
+        return index
+
+
+def load_csv(path: Path, **kwargs) -> Dataset:
+    """Load a dataset from a CSV file with a header row.
+
+    Rows with fewer values than the header are padded with None, and rows with
+    more values are skipped.
+
+    """
+    with open(path, newline="") as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        values: list[list] = [[] for _ in header]
+        for row in reader:
+            if len(row) > len(header):
+                logger.warning(
+                    "Skipping row %d of %s: %d values for %d columns",
+                    reader.line_num,
+                    path,
+                    len(row),
+                    len(header),
+                )
+                continue
+
+            for column_values, value in itertools.zip_longest(values, row):
+                column_values.append(value)
+
+    return Dataset(
+        path.stem,
+        {
+            column: compact_column(column_values, parse=True)
+            for column, column_values in zip(header, values)
+        },
+        **kwargs,
+    )
+
+
+def load_jsonl(path: Path, **kwargs) -> Dataset:
+    """Load a dataset from a file with one JSON object per line."""
+    with open(path) as file:
+        return Dataset.from_rows(
+            path.stem, (json.loads(line) for line in file if line.strip()), **kwargs
+        )
+
+
+def load_parquet(path: Path, **kwargs) -> Dataset:
+    """Load a dataset from a Parquet file."""
+    if not IS_PYARROW_AVAILABLE:
+        raise_for_missing(
+            "pyarrow is not available. Install with optional dependency mockstack[parquet] to load Parquet datasets."
+        )
+
+    import pyarrow.parquet
+
+    table = pyarrow.parquet.read_table(path)
+    return Dataset(
+        path.stem,
+        {
+            column: compact_column(column_values)
+            for column, column_values in table.to_pydict().items()
+        },
+        **kwargs,
+    )
+
+
+# dataset loaders by file extension.
+LOADERS: dict[str, Callable[..., Dataset]] = {
+    ".csv": load_csv,
+    ".jsonl": load_jsonl,
+    ".parquet": load_parquet,
+}
+
+
+class Datasets:
+    """The datasets in a directory, by name, i.e. the `datasets` template global.
+
+    Each file with a supported extension is a dataset named after the file,
+    e.g. `customers.csv` is available as `datasets.customers`. Datasets are
+    loaded on first use, or all at once with `load_all`.
+
+    """
+
+    def __init__(
+        self, directory: Path | str, *, index_columns: Iterable[str] = ("id",)
+    ):
+        self.directory = Path(directory)
+        self.index_columns = tuple(index_columns)
+        self.filenames = {
+            path.stem: path
+            for path in sorted(self.directory.iterdir())
+            if path.suffix in LOADERS
+        }
+        self._datasets: dict[str, Dataset] = {}
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.filenames
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.filenames)
+
+    def __getitem__(self, name: str) -> Dataset:
+        dataset = self._datasets.get(name)
+        if dataset is None:
+            path = self.filenames[name]
+            dataset = LOADERS[path.suffix](path, index_columns=self.index_columns)
+            self._datasets[name] = dataset
+            logger.info("Loaded dataset %s with %d rows", name, len(dataset))
+
+        return dataset
+
+    def __getattr__(self, name: str) -> Dataset:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(f"No dataset named {name} in {self.directory}")
+
+    def load_all(self) -> None:
+        """Load all datasets which were not loaded yet."""
+        for name in self.filenames:
+            _ = self[name]
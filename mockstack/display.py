@@ -10,6 +10,10 @@ from mockstack.config import Settings
 
 def announce(app: FastAPI, settings: Settings):
     """Log the startup message with the active settings."""
+    # imported here as the server module imports uvicorn, which is only needed
+    # (and loaded already) when actually serving.
+    from mockstack.server import effective_http, effective_loop
+
     logger = logging.getLogger("uvicorn")
     extra = {"markup": True}
 
@@ -22,6 +26,14 @@ def announce(app: FastAPI, settings: Settings):
         extra=extra,
     )
     logger.info(str(app.state.strategy), extra=extra)
+    logger.info(
+        f"[medium_purple]server[/medium_purple] "
+        f"loop: [medium_purple]{effective_loop(settings.server.loop)}[/medium_purple], "
+        f"http: [medium_purple]{effective_http(settings.server.http)}[/medium_purple], "
+        f"workers: [medium_purple]{settings.workers}[/medium_purple], "
+        f"access_log: [medium_purple]{settings.server.access_log}[/medium_purple]",
+        extra=extra,
+    )
     logger.info(
         f"[medium_purple]OpenTelemetry[/medium_purple] enabled: [medium_purple]{settings.opentelemetry.enabled}[/medium_purple],\n "
         f"endpoint: [medium_purple]{settings.opentelemetry.endpoint}[/medium_purple],\n "
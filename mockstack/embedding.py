@@ -0,0 +1,273 @@
+"""Embedding mockstack in-process, e.g. in test suites.
+
+Requests are routed straight into the ASGI app instead of over a socket, so
+there are no ports to allocate and very little per-call overhead:
+
+>>> with EmbeddedMockStack(templates_dir="tests/templates") as mockstack:
+...     client = httpx.Client(transport=mockstack.transport(), base_url=BASE_URL)
+...     client.get("/api/v1/projects/1234")
+
+or asynchronously:
+
+>>> async with EmbeddedMockStack(templates_dir="tests/templates") as mockstack:
+...     client = httpx.AsyncClient(transport=mockstack.async_transport(), base_url=BASE_URL)
+...     await client.get("/api/v1/projects/1234")
+
+"""
+
+import io
+from contextlib import AsyncExitStack, ExitStack
+from typing import Any
+
+import httpx
+from anyio.from_thread import BlockingPortal, start_blocking_portal
+from fastapi import FastAPI
+from pydantic import Field
+from pydantic_settings import BaseSettings, CliSuppress, PydanticBaseSettingsSource
+
+from mockstack.config import (
+    MetricsSettings,
+    OpenTelemetrySettings,
+    ServerSettings,
+    Settings,
+)
+from mockstack.main import create_app
+
+try:
+    import requests
+    from requests.adapters import BaseAdapter
+    from requests.structures import CaseInsensitiveDict
+    from requests.utils import get_encoding_from_headers
+
+    IS_REQUESTS_AVAILABLE = True
+except ImportError:
+    IS_REQUESTS_AVAILABLE = False
+
+# base URL for clients of an embedded mockstack. Any URL works, as requests
+# never leave the process.
+BASE_URL = "http://mockstack"
+
+
+# logging configuration which only logs warnings, to the handlers of the host
+# application rather than to the console.
+QUIET_LOGGING: dict[str, Any] = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.NullHandler"},
+    },
+    "loggers": {
+        name: {"level": "WARNING"}
+        for name in ("uvicorn", "FileFixturesStrategy", "ProxyRulesStrategy")
+    },
+}
+
+
+class InitSettingsOnlyMixin:
+    """Mixin for settings given only explicitly, ignoring environment variables and .env files."""
+
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls: type[BaseSettings],
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ) -> tuple[PydanticBaseSettingsSource, ...]:
+        return (init_settings,)
+
+
+class EmbeddedServerSettings(InitSettingsOnlyMixin, ServerSettings):
+    """Server settings of embedded instances."""
+
+
+class EmbeddedOpenTelemetrySettings(InitSettingsOnlyMixin, OpenTelemetrySettings):
+    """OpenTelemetry settings of embedded instances."""
+
+
+class EmbeddedMetricsSettings(InitSettingsOnlyMixin, MetricsSettings):
+    """Metrics settings of embedded instances."""
+
+
+class EmbeddedSettings(InitSettingsOnlyMixin, Settings):
+    """Settings given only explicitly, ignoring environment variables and .env files.
+
+    Embedded instances are thereby isolated from each other and from the
+    environment the tests happen to run in. This includes nested settings,
+    whose defaults would otherwise be read from the environment.
+
+    Logging defaults to `QUIET_LOGGING`, as logging every request to the
+    console would cost more than handling it.
+
+    """
+
+    server: EmbeddedServerSettings = Field(default_factory=EmbeddedServerSettings)
+
+    opentelemetry: EmbeddedOpenTelemetrySettings = Field(
+        default_factory=EmbeddedOpenTelemetrySettings
+    )
+
+    metrics: EmbeddedMetricsSettings = Field(default_factory=EmbeddedMetricsSettings)
+
+    logging: CliSuppress[dict[str, Any]] = QUIET_LOGGING
+
+
+class EmbeddedMockStack:
+    """A mockstack app running in the current process.
+
+    Settings are either given as a `Settings` object, or as keyword arguments
+    for `EmbeddedSettings`. The app is started up (and shut down) by entering
+    (and exiting) the instance as a context manager: asynchronously for use
+    with `async_transport`, or synchronously for use with `transport` and
+    `requests_adapter`, in which case the app runs on an event loop in a
+    background thread.
+
+    """
+
+    def __init__(self, settings: Settings | None = None, **overrides: Any):
+        if settings is None:
+            settings = EmbeddedSettings(**overrides)
+        elif overrides:
+            settings = settings.model_copy(update=overrides)
+
+        self.settings = settings
+        self.app: FastAPI = create_app(settings=settings)
+        self._portal: BlockingPortal | None = None
+        self._exit_stack: ExitStack | AsyncExitStack | None = None
+
+    async def __aenter__(self) -> "EmbeddedMockStack":
+        exit_stack = AsyncExitStack()
+        await exit_stack.enter_async_context(self.app.router.lifespan_context(self.app))
+        self._exit_stack = exit_stack
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        assert isinstance(self._exit_stack, AsyncExitStack)
+        await self._exit_stack.aclose()
+        self._exit_stack = None
+
+    def __enter__(self) -> "EmbeddedMockStack":
+        exit_stack = ExitStack()
+        portal = exit_stack.enter_context(start_blocking_portal())
+        exit_stack.enter_context(
+            portal.wrap_async_context_manager(
+                self.app.router.lifespan_context(self.app)
+            )
+        )
+        self._portal = portal
+        self._exit_stack = exit_stack
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        assert isinstance(self._exit_stack, ExitStack)
+        self._exit_stack.close()
+        self._exit_stack = None
+        self._portal = None
+
+    def async_transport(self) -> httpx.AsyncBaseTransport:
+        """An httpx transport for `httpx.AsyncClient` routing into the app."""
+        return httpx.ASGITransport(app=self.app)
+
+    def transport(self) -> httpx.BaseTransport:
+        """An httpx transport for `httpx.Client` routing into the app.
+
+        Only usable while the instance is entered synchronously.
+
+        """
+        if self._portal is None:
+            raise RuntimeError(
+                "The sync transport requires entering the EmbeddedMockStack with `with`."
+            )
+
+        return PortalTransport(httpx.ASGITransport(app=self.app), self._portal)
+
+    def requests_adapter(self) -> "BaseAdapter":
+        """A transport adapter for `requests` sessions routing into the app.
+
+        Mount it on a session for the base URL, e.g.
+        `session.mount(BASE_URL, mockstack.requests_adapter())`.
+        Only usable while the instance is entered synchronously.
+
+        """
+        if not IS_REQUESTS_AVAILABLE:
+            raise RuntimeError(
+                "requests is not available. Install it to use the requests adapter."
+            )
+
+        return RequestsAdapter(self.transport())
+
+
+class PortalTransport(httpx.BaseTransport):
+    """Sync httpx transport running an async transport through a blocking portal."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, portal: BlockingPortal):
+        self.transport = transport
+        self.portal = portal
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        return self.portal.call(self.handle_async_request, request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        try:
+            # raw, i.e. still encoded, as expected from a transport.
+            content = b"".join([chunk async for chunk in response.aiter_raw()])
+        finally:
+            await response.aclose()
+
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            content=content,
+            extensions=response.extensions,
+        )
+
+
+if IS_REQUESTS_AVAILABLE:
+
+    class RequestsAdapter(BaseAdapter):
+        """Transport adapter for `requests` sending requests via an httpx transport."""
+
+        def __init__(self, transport: httpx.BaseTransport):
+            super().__init__()
+            self.transport = transport
+
+        def send(
+            self,
+            request,
+            stream=False,
+            timeout=None,
+            verify=True,
+            cert=None,
+            proxies=None,
+        ) -> requests.Response:
+            body = request.body
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+
+            httpx_response = self.transport.handle_request(
+                httpx.Request(
+                    request.method,
+                    request.url,
+                    headers=list(request.headers.items()),
+                    content=body,
+                )
+            )
+            content = httpx_response.read()
+
+            response = requests.Response()
+            response.status_code = httpx_response.status_code
+            response.reason = httpx_response.reason_phrase
+            response.headers = CaseInsensitiveDict(httpx_response.headers)
+            response.encoding = get_encoding_from_headers(response.headers)
+            response.raw = io.BytesIO(content)
+            response.url = request.url
+            response.request = request
+            # used e.g. by auth handlers to resend requests.
+            response.connection = self  # type: ignore[assignment]
+            return response
+
+        def close(self) -> None:
+            pass
@@ -0,0 +1,317 @@
+"""HTTP-semantics caching of upstream responses.
+
+Implements the subset of RFC 9111 relevant for a shared cache in front of
+upstream services: freshness from `Cache-Control` / `Expires`, revalidation
+with `ETag` / `Last-Modified`, `stale-while-revalidate` and `Vary`.
+
+"""
+
+import asyncio
+import json
+from dataclasses import dataclass, replace
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Iterable, Mapping
+
+from mockstack.cache import DiskCache, LRUCache
+
+# status codes which are cacheable by default.
+# See https://www.rfc-editor.org/rfc/rfc9110#section-15.1
+CACHEABLE_STATUS_CODES = frozenset(
+    {200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501}
+)
+
+# headers from a 304 Not Modified response which must not replace stored ones.
+# See https://www.rfc-editor.org/rfc/rfc9111#section-3.2
+NOT_MODIFIED_EXCLUDED_HEADERS = frozenset(
+    {"content-length", "content-encoding", "transfer-encoding", "content-range"}
+)
+
+# response header reporting how the response was served by the cache.
+CACHE_STATUS_HEADER = "x-mockstack-cache"
+
+# upper bound on the number of distinct URLs tracked for Vary headers.
+MAX_VARY_ENTRIES = 100_000
+
+
+def parse_cache_control(value: str | None) -> dict[str, str | None]:
+    """Parse a Cache-Control header value into a dictionary of directives.
+
+    Examples:
+    ---------
+    >>> parse_cache_control('max-age=60, no-cache, private="set-cookie"')
+    {'max-age': '60', 'no-cache': None, 'private': 'set-cookie'}
+
+    """
+    directives: dict[str, str | None] = {}
+    if not value:
+        return directives
+
+    for part in value.split(","):
+        name, has_argument, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = (
+                argument.strip().strip('"') if has_argument else None
+            )
+
+    return directives
+
+
+def parse_seconds(value: str | None) -> int | None:
+    """Parse a delta-seconds value, returning None when invalid."""
+    if value is None:
+        return None
+    try:
+        seconds = int(value)
+    except ValueError:
+        return None
+    return seconds if seconds >= 0 else None
+
+
+def parse_http_date(value: str | None) -> float | None:
+    """Parse an HTTP date into a timestamp, returning None when invalid."""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """An upstream response stored in the cache."""
+
+    status_code: int
+    headers: list[tuple[str, str]]
+    content: bytes
+    stored_at: float
+
+    def header(self, name: str) -> str | None:
+        """Get the first value of a header, case-insensitively."""
+        name = name.lower()
+        return next((v for k, v in self.headers if k.lower() == name), None)
+
+    @property
+    def cache_control(self) -> dict[str, str | None]:
+        return parse_cache_control(self.header("cache-control"))
+
+    @property
+    def size(self) -> int:
+        """Approximate memory footprint in bytes."""
+        return len(self.content) + sum(len(k) + len(v) for k, v in self.headers)
+
+    def freshness_lifetime(self) -> float | None:
+        """How long the response is fresh for, or None if not explicitly given."""
+        cache_control = self.cache_control
+        for directive in ("s-maxage", "max-age"):
+            seconds = parse_seconds(cache_control.get(directive))
+            if seconds is not None:
+                return seconds
+
+        expires = self.header("expires")
+        if expires is not None:
+            expires_at = parse_http_date(expires)
+            if expires_at is None:
+                # invalid dates, e.g. "0", represent a time in the past.
+                return 0
+            date = parse_http_date(self.header("date")) or self.stored_at
+            return max(0.0, expires_at - date)
+
+        return None
+
+    def age(self, now: float) -> float:
+        """The current age of the response in seconds."""
+        initial_age = parse_seconds(self.header("age")) or 0
+        return initial_age + max(0.0, now - self.stored_at)
+
+    def is_fresh(self, now: float) -> bool:
+        """Whether the response can be served without revalidation."""
+        if "no-cache" in self.cache_control:
+            return False
+
+        lifetime = self.freshness_lifetime()
+        return lifetime is not None and self.age(now) < lifetime
+
+    def can_serve_stale(self, now: float) -> bool:
+        """Whether the stale response can be served while revalidating it."""
+        cache_control = self.cache_control
+        if any(d in cache_control for d in ("no-cache", "must-revalidate")):
+            return False
+
+        lifetime = self.freshness_lifetime()
+        window = parse_seconds(cache_control.get("stale-while-revalidate"))
+        if lifetime is None or window is None:
+            return False
+
+        return self.age(now) < lifetime + window
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for revalidating the response."""
+        validators = {}
+        etag = self.header("etag")
+        if etag is not None:
+            validators["if-none-match"] = etag
+        last_modified = self.header("last-modified")
+        if last_modified is not None:
+            validators["if-modified-since"] = last_modified
+        return validators
+
+    def revalidated(
+        self, headers: Iterable[tuple[str, str]], now: float
+    ) -> "CachedResponse":
+        """Refresh the response from the headers of a 304 Not Modified response."""
+        updates = [
+            (k, v) for k, v in headers if k.lower() not in NOT_MODIFIED_EXCLUDED_HEADERS
+        ]
+        updated_names = {k.lower() for k, _ in updates}
+        kept = [(k, v) for k, v in self.headers if k.lower() not in updated_names]
+        return replace(self, headers=kept + updates, stored_at=now)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the response for the on-disk tier."""
+        metadata = {
+            "status_code": self.status_code,
+            "headers": self.headers,
+            "stored_at": self.stored_at,
+        }
+        return json.dumps(metadata).encode() + b"\n" + self.content
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedResponse":
+        """Deserialize a response stored by `to_bytes`."""
+        metadata, _, content = data.partition(b"\n")
+        fields = json.loads(metadata)
+        return cls(
+            status_code=fields["status_code"],
+            headers=[(k, v) for k, v in fields["headers"]],
+            content=content,
+            stored_at=fields["stored_at"],
+        )
+
+
+def is_storable(
+    request_headers: Mapping[str, str],
+    status_code: int,
+    response_headers: Mapping[str, str],
+) -> bool:
+    """Whether a response may be stored by a shared cache."""
+    if status_code not in CACHEABLE_STATUS_CODES:
+        return False
+
+    request_cache_control = parse_cache_control(request_headers.get("cache-control"))
+    response_cache_control = parse_cache_control(response_headers.get("cache-control"))
+    if "no-store" in request_cache_control:
+        return False
+    if any(d in response_cache_control for d in ("no-store", "private")):
+        return False
+    if response_headers.get("vary", "").strip() == "*":
+        return False
+
+    if "authorization" in request_headers and not any(
+        d in response_cache_control for d in ("public", "s-maxage", "must-revalidate")
+    ):
+        return False
+
+    # without explicit freshness or validators a stored response is never usable.
+    return any(
+        (
+            "max-age" in response_cache_control,
+            "s-maxage" in response_cache_control,
+            "expires" in response_headers,
+            "etag" in response_headers,
+            "last-modified" in response_headers,
+        )
+    )
+
+
+class HttpCache:
+    """Cache of upstream responses with a memory tier and optional disk tier.
+
+    Responses are keyed by method and URL (including the query string), and by
+    the values of the request headers listed in the response `Vary` header.
+    The memory tier is an LRU bounded by the total size of cached responses.
+    The disk tier, when configured, persists responses across restarts, and is
+    bounded by `directory_max_bytes`.
+
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int,
+        directory: Path | str | None = None,
+        directory_max_bytes: int | None = None,
+    ):
+        self.memory: LRUCache[str, CachedResponse] = LRUCache(
+            max_bytes, sizeof=lambda response: response.size
+        )
+        self.vary: LRUCache[str, tuple[str, ...]] = LRUCache(MAX_VARY_ENTRIES)
+        self.disk = (
+            DiskCache(directory, max_bytes=directory_max_bytes)
+            if directory is not None
+            else None
+        )
+
+    @staticmethod
+    def primary_key(method: str, url: str) -> str:
+        return f"{method.upper()} {url}"
+
+    @staticmethod
+    def variant_key(
+        primary_key: str, vary: tuple[str, ...], request_headers: Mapping[str, str]
+    ) -> str:
+        values = "\n".join(f"{name}: {request_headers.get(name, '')}" for name in vary)
+        return f"{primary_key}\n{values}"
+
+    async def get(
+        self, method: str, url: str, request_headers: Mapping[str, str]
+    ) -> CachedResponse | None:
+        """Look up the stored response matching a request, if any."""
+        primary_key = self.primary_key(method, url)
+
+        vary = self.vary.get(primary_key)
+        if vary is None and self.disk is not None:
+            data = await asyncio.to_thread(self.disk.get, f"vary {primary_key}")
+            if data is not None:
+                vary = tuple(json.loads(data))
+                self.vary.set(primary_key, vary)
+        if vary is None:
+            return None
+
+        key = self.variant_key(primary_key, vary, request_headers)
+        response = self.memory.get(key)
+        if response is None and self.disk is not None:
+            data = await asyncio.to_thread(self.disk.get, key)
+            if data is not None:
+                response = CachedResponse.from_bytes(data)
+                self.memory.set(key, response)
+
+        return response
+
+    async def set(
+        self,
+        method: str,
+        url: str,
+        request_headers: Mapping[str, str],
+        response: CachedResponse,
+    ) -> None:
+        """Store a response for a request."""
+        primary_key = self.primary_key(method, url)
+        vary = tuple(
+            sorted(
+                name.strip().lower()
+                for name in (response.header("vary") or "").split(",")
+                if name.strip()
+            )
+        )
+        key = self.variant_key(primary_key, vary, request_headers)
+
+        self.vary.set(primary_key, vary)
+        self.memory.set(key, response)
+
+        if self.disk is not None:
+            await asyncio.to_thread(
+                self.disk.set, f"vary {primary_key}", json.dumps(vary).encode()
+            )
+            await asyncio.to_thread(self.disk.set, key, response.to_bytes())
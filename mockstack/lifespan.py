@@ -17,10 +17,21 @@ def logging_dict_config_from(settings: Settings) -> dict:
         """Enable verbose debug logging."""
         settings.logging["handlers"]["console"]["level"] = DEBUG
 
+    def disable_access_logging(settings: Settings):
+        """Silence the per-request access log of the server."""
+        settings.logging["loggers"]["uvicorn.access"] = {
+            "handlers": [],
+            "propagate": False,
+        }
+
     if settings.debug:
         # Enable verbose debug logging if debug mode is set.
         enable_debug_logging(settings)
 
+    if not settings.server.access_log:
+        # otherwise re-enabled by configuring its parent "uvicorn" logger.
+        disable_access_logging(settings)
+
     return settings.logging
 
 
@@ -40,6 +51,10 @@ def lifespan_provider(
 
         announce(app, settings)
 
-        yield
+        await app.state.strategy.startup()
+        try:
+            yield
+        finally:
+            await app.state.strategy.shutdown()
 
     return lifespan
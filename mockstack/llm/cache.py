@@ -0,0 +1,70 @@
+"""Content-addressed cache of LLM completions."""
+
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+from mockstack.cache import DiskCache, LRUCache
+
+
+class LLMCache:
+    """Cache of LLM completions keyed on their inputs.
+
+    Completions are keyed on a digest of the model, messages and options of
+    the call, so identical prompts are only generated once. Completions are
+    kept in an in-memory LRU, and optionally persisted on disk so they
+    survive restarts and can be shared between processes, up to
+    `directory_max_bytes` in total.
+
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        directory: Path | str | None = None,
+        directory_max_bytes: int | None = None,
+    ):
+        self.memory: LRUCache[str, str] = LRUCache(max_entries)
+        self.disk = (
+            DiskCache(directory, max_bytes=directory_max_bytes)
+            if directory is not None
+            else None
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: str, messages: Any, options: dict[str, Any]) -> str:
+        """Digest identifying a completion by its inputs."""
+        payload = json.dumps(
+            {"model": model, "messages": messages, "options": options},
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def get(self, key: str) -> str | None:
+        """Look up a cached completion."""
+        completion = self.memory.get(key)
+        if completion is None and self.disk is not None:
+            data = await asyncio.to_thread(self.disk.get, key)
+            if data is not None:
+                completion = data.decode()
+                self.memory.set(key, completion)
+
+        if completion is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return completion
+
+    async def set(self, key: str, completion: str) -> None:
+        """Store a completion."""
+        self.memory.set(key, completion)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, completion.encode())
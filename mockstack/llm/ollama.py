@@ -1,10 +1,13 @@
 """Ollama integration"""
 
-from typing import List, Dict
+import asyncio
+from functools import cached_property
+
+from mockstack.llm.cache import LLMCache
+from mockstack.singleflight import SingleFlight
 
 try:
-    from ollama import chat
-    from ollama import ChatResponse
+    from ollama import AsyncClient, ChatResponse
 
     IS_OLLAMA_AVAILABLE = True
 except ImportError:
@@ -13,38 +16,88 @@ except ImportError:
 
 if IS_OLLAMA_AVAILABLE:
 
-    class OllamaLLM:
-        def __init__(self, model: str = "llama3.2"):
-            self.model = model
+    class AsyncOllamaLLM:
+        """Non-blocking Ollama interface for templates rendered asynchronously.
+
+        A single `ollama.AsyncClient` is reused for all calls, so a slow model
+        only holds up the requests waiting on it rather than the event loop.
+        The number of concurrent calls per model is bounded, since a local
+        Ollama instance processes a limited number of requests in parallel
+        and queueing many more only delays all of them.
+
+        When a cache is given, completions are looked up by their inputs
+        first, and identical concurrent calls share a single generation.
+
+        """
+
+        def __init__(
+            self,
+            *,
+            host: str | None = None,
+            max_concurrency: int = 1,
+            cache: LLMCache | None = None,
+        ):
+            self.host = host
+            self.max_concurrency = max_concurrency
+            self.cache = cache
+            self._semaphores: dict[str, asyncio.Semaphore] = {}
+            self._inflight: SingleFlight[str] = SingleFlight()
+
+        @cached_property
+        def client(self) -> AsyncClient:
+            return AsyncClient(host=self.host)
+
+        def semaphore_for(self, model: str) -> asyncio.Semaphore:
+            """The semaphore bounding concurrent calls to a model."""
+            if model not in self._semaphores:
+                self._semaphores[model] = asyncio.Semaphore(self.max_concurrency)
+            return self._semaphores[model]
 
-        def __call__(
+        async def __call__(
             self,
-            messages: List[Dict[str, str]],
+            messages: list[dict[str, str]],
+            model: str = "llama3.2",
             max_tokens: int = 4096,
             temperature: float = 0.7,
         ) -> str:
-            response: ChatResponse = chat(
-                model=self.model,
-                messages=messages,
-                options={"num_ctx": max_tokens, "temperature": temperature},
+            options = {"num_ctx": max_tokens, "temperature": temperature}
+            if self.cache is None:
+                return await self.generate(model, messages, options)
+
+            key = self.cache.key(model, messages, options)
+            return await self._inflight.do(
+                key, lambda: self.cached_generate(key, model, messages, options)
             )
 
+        async def cached_generate(
+            self,
+            key: str,
+            model: str,
+            messages: list[dict[str, str]],
+            options: dict[str, float],
+        ) -> str:
+            assert self.cache is not None
+            completion = await self.cache.get(key)
+            if completion is None:
+                completion = await self.generate(model, messages, options)
+                await self.cache.set(key, completion)
+            return completion
+
+        async def generate(
+            self,
+            model: str,
+            messages: list[dict[str, str]],
+            options: dict[str, float],
+        ) -> str:
+            async with self.semaphore_for(model):
+                response: ChatResponse = await self.client.chat(
+                    model=model,
+                    messages=messages,
+                    options=options,
+                )
+
             return content(response)
 
     def content(response: ChatResponse) -> str:
         """Extract the message content from the LLM response."""
         return response["message"]["content"]
-
-    def ollama(
-        messages: List[Dict[str, str]],
-        model: str = "llama3.2",
-        *args,
-        **kwargs,
-    ) -> str:
-        """Fluent interface for Ollama to be used in templates."""
-
-        return OllamaLLM(model)(
-            messages,
-            *args,
-            **kwargs,
-        )
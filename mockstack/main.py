@@ -1,10 +1,14 @@
 """Application entrypoints."""
 
+import os
+
 from fastapi import FastAPI
 from pydantic_settings import CliApp, CliSettingsSource
 
 from mockstack.config import CliSettings, Settings, settings_provider
+from mockstack.constants import SERIALIZED_SETTINGS_ENV_VAR
 from mockstack.lifespan import lifespan_provider
+from mockstack.metrics import metrics_provider
 from mockstack.middleware import middleware_provider
 from mockstack.routers.catchall import catchall_router_provider
 from mockstack.routers.homepage import homepage_router_provider
@@ -20,6 +24,7 @@ def create_app(settings: Settings | None = None) -> FastAPI:
 
     strategy_provider(app, settings)
     middleware_provider(app, settings)
+    metrics_provider(app, settings)
     opentelemetry_provider(app, settings)
 
     homepage_router_provider(app, settings)
@@ -28,10 +33,29 @@ def create_app(settings: Settings | None = None) -> FastAPI:
     return app
 
 
+def create_app_from_environment() -> FastAPI:
+    """Create the fastapi app from settings serialized into the environment.
+
+    Used as the app factory of worker processes spawned by uvicorn.
+
+    """
+    settings = Settings.model_validate_json(os.environ[SERIALIZED_SETTINGS_ENV_VAR])
+
+    return create_app(settings=settings)
+
+
 def run():
-    """run the mockstack server."""
+    """run the mockstack server, or the `bench` command."""
     import argparse
-    import uvicorn
+    import sys
+
+    if sys.argv[1:2] == ["bench"]:
+        from mockstack.bench import run as run_bench
+
+        run_bench(sys.argv[2:])
+        return
+
+    from mockstack.server import serve
 
     parser = argparse.ArgumentParser()
     cli_settings = CliSettingsSource(CliSettings, root_parser=parser)
@@ -39,7 +63,7 @@ def run():
 
     app = create_app(settings=settings)
 
-    uvicorn.run(app, host=settings.host, port=settings.port)
+    serve(app, settings)
 
 
 def version():
@@ -0,0 +1,250 @@
+"""In-memory manifest of the templates directory."""
+
+import asyncio
+import logging
+import os
+from enum import StrEnum
+from pathlib import Path
+from typing import Callable, Iterable
+
+from mockstack.constants import TemplatesManifestWatchMode
+
+try:
+    from watchfiles import Change, awatch
+
+    IS_WATCHFILES_AVAILABLE = True
+except ImportError:
+    IS_WATCHFILES_AVAILABLE = False
+
+
+class ManifestChange(StrEnum):
+    """The type of change applied to a manifest entry."""
+
+    ADDED = "added"
+    MODIFIED = "modified"
+    DELETED = "deleted"
+
+
+class TemplatesManifest:
+    """An in-memory index of the template files available under a directory.
+
+    Looking up a template name is a dictionary lookup rather than a filesystem
+    call, which matters when the strategy probes several candidate names per
+    request on a slow (e.g. network) filesystem. The manifest is kept fresh by
+    applying incremental deltas, either from a filesystem watcher or by
+    periodically re-scanning the directory.
+
+    """
+
+    logger = logging.getLogger("TemplatesManifest")
+
+    def __init__(self, templates_dir: Path | str):
+        self.templates_dir = Path(templates_dir)
+        self.entries: dict[str, float] = {}
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def scan(self, subdir: str | None = None) -> dict[str, float]:
+        """Scan the templates directory for files and their modification times.
+
+        Names are relative to the templates directory and use forward slashes,
+        matching the names used by the Jinja2 loader. `subdir` restricts the
+        scan to a (relative) subdirectory.
+
+        """
+        top = self.templates_dir / subdir if subdir else self.templates_dir
+        entries: dict[str, float] = {}
+        for root, _, filenames in os.walk(top):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                try:
+                    mtime = os.stat(path).st_mtime
+                except FileNotFoundError:
+                    # file was removed while we were scanning.
+                    continue
+                name = Path(path).relative_to(self.templates_dir).as_posix()
+                entries[name] = mtime
+
+        return entries
+
+    def build(self) -> None:
+        """(Re)build the manifest from scratch."""
+        self.entries = self.scan()
+        self.logger.debug(
+            "Built templates manifest with %d entries for %s",
+            len(self.entries),
+            self.templates_dir,
+        )
+
+    def apply(
+        self, changes: Iterable[tuple[ManifestChange, str]]
+    ) -> list[tuple[ManifestChange, str]]:
+        """Apply incremental changes given as (change, name) pairs.
+
+        Modification times are refreshed from the filesystem for added or
+        modified entries. Changes to directories (e.g. moved in or out of the
+        templates directory) apply to all entries under them, by re-scanning
+        the directory. Returns the changes that were effectively applied.
+
+        """
+        applied: list[tuple[ManifestChange, str]] = []
+        for change, name in changes:
+            path = self.templates_dir / name
+            if os.path.isdir(path):
+                applied.extend(self._rescan(name))
+                continue
+
+            if change == ManifestChange.DELETED:
+                applied.extend(self._remove(name))
+                continue
+
+            try:
+                mtime = os.stat(path).st_mtime
+            except FileNotFoundError:
+                applied.extend(self._remove(name))
+                continue
+
+            previous = self.entries.get(name)
+            self.entries[name] = mtime
+            if previous is None:
+                applied.append((ManifestChange.ADDED, name))
+            elif previous != mtime:
+                applied.append((ManifestChange.MODIFIED, name))
+
+        return applied
+
+    def refresh(self) -> list[tuple[ManifestChange, str]]:
+        """Re-scan the directory and apply the difference to the manifest."""
+        current = self.scan()
+        changes = self._diff(self.entries, current)
+        self.entries = current
+        return changes
+
+    async def watch(
+        self,
+        *,
+        mode: TemplatesManifestWatchMode = TemplatesManifestWatchMode.AUTO,
+        poll_interval: float = 1.0,
+        on_change: Callable[[list[tuple[ManifestChange, str]]], None] | None = None,
+    ) -> None:
+        """Keep the manifest up to date until cancelled.
+
+        In `auto` mode, native filesystem events are used when the optional
+        `watchfiles` package is available, otherwise we fall back to polling.
+
+        """
+        if mode == TemplatesManifestWatchMode.NONE:
+            return
+
+        if mode == TemplatesManifestWatchMode.AUTO:
+            mode = (
+                TemplatesManifestWatchMode.WATCHFILES
+                if IS_WATCHFILES_AVAILABLE
+                else TemplatesManifestWatchMode.POLL
+            )
+
+        if (
+            mode == TemplatesManifestWatchMode.WATCHFILES
+            and not IS_WATCHFILES_AVAILABLE
+        ):
+            raise RuntimeError(
+                "watchfiles is not available. Install it or use the 'poll' watch mode."
+            )
+
+        def notify(changes: list[tuple[ManifestChange, str]]) -> None:
+            if not changes:
+                return
+            self.logger.debug("Templates manifest changes: %s", changes)
+            if on_change is not None:
+                on_change(changes)
+
+        while True:
+            changes_iter = (
+                self._iter_watchfiles_changes()
+                if mode == TemplatesManifestWatchMode.WATCHFILES
+                else self._iter_polled_changes(poll_interval)
+            )
+            try:
+                async for changes in changes_iter:
+                    notify(changes)
+                return
+            except Exception:
+                # rather than leaving the manifest frozen, catch up with a full
+                # re-scan and resume watching.
+                self.logger.exception(
+                    "Watching %s failed, restarting in %s seconds",
+                    self.templates_dir,
+                    poll_interval,
+                )
+                await asyncio.sleep(poll_interval)
+                try:
+                    notify(await asyncio.to_thread(self.refresh))
+                except Exception:
+                    self.logger.exception("Refreshing the templates manifest failed")
+
+    async def _iter_watchfiles_changes(self):
+        """Yield manifest deltas derived from native filesystem events."""
+        kinds = {
+            Change.added: ManifestChange.ADDED,
+            Change.modified: ManifestChange.MODIFIED,
+            Change.deleted: ManifestChange.DELETED,
+        }
+        base = self.templates_dir.resolve()
+        async for events in awatch(self.templates_dir, recursive=True):
+            changes = []
+            for kind, path in events:
+                name = Path(path).resolve().relative_to(base).as_posix()
+                if name != ".":
+                    changes.append((kinds[kind], name))
+
+            yield self.apply(changes)
+
+    def _rescan(self, subdir: str) -> list[tuple[ManifestChange, str]]:
+        """Replace the entries under a subdirectory by a fresh scan of it."""
+        previous = {name: self.entries[name] for name in self._names_under(subdir)}
+        current = self.scan(subdir)
+        for name in previous.keys() - current.keys():
+            del self.entries[name]
+        self.entries.update(current)
+        return self._diff(previous, current)
+
+    def _remove(self, name: str) -> list[tuple[ManifestChange, str]]:
+        """Remove an entry, or all entries under it if it was a directory."""
+        removed = []
+        if self.entries.pop(name, None) is not None:
+            removed.append((ManifestChange.DELETED, name))
+        for child in self._names_under(name):
+            del self.entries[child]
+            removed.append((ManifestChange.DELETED, child))
+
+        return removed
+
+    def _names_under(self, subdir: str) -> list[str]:
+        prefix = subdir.rstrip("/") + "/"
+        return [name for name in self.entries if name.startswith(prefix)]
+
+    @staticmethod
+    def _diff(
+        previous: dict[str, float], current: dict[str, float]
+    ) -> list[tuple[ManifestChange, str]]:
+        changes: list[tuple[ManifestChange, str]] = [
+            (ManifestChange.DELETED, name) for name in previous.keys() - current.keys()
+        ]
+        for name, mtime in current.items():
+            mtime_before = previous.get(name)
+            if mtime_before is None:
+                changes.append((ManifestChange.ADDED, name))
+            elif mtime_before != mtime:
+                changes.append((ManifestChange.MODIFIED, name))
+
+        return changes
+
+    async def _iter_polled_changes(self, poll_interval: float):
+        """Yield manifest deltas by periodically re-scanning the directory."""
+        while True:
+            await asyncio.sleep(poll_interval)
+            yield await asyncio.to_thread(self.refresh)
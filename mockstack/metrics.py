@@ -0,0 +1,190 @@
+"""Prometheus metrics for the mockstack app.
+
+Strategies describe how they handled a request on `request.state` (see
+`RequestMetrics`), and `MetricsMiddleware` turns that into metrics once the
+response is sent. Strategies therefore do not depend on the metrics backend,
+and pay nothing for metrics when they are disabled.
+
+"""
+
+import importlib.util
+import os
+import time
+from dataclasses import dataclass
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from mockstack.config import Settings
+
+# checked without importing prometheus_client, which is only imported (as it
+# is comparatively slow to) once metrics are enabled.
+IS_PROMETHEUS_AVAILABLE = importlib.util.find_spec("prometheus_client") is not None
+
+
+# route label for requests not matched to any template or rule.
+UNMATCHED_ROUTE = "unmatched"
+
+
+@dataclass
+class RequestMetrics:
+    """What happened while handling a request, as reported by the strategy."""
+
+    # name of the template or rule which handled the request.
+    route: str | None = None
+
+    # whether a template was found for the request, for template lookups.
+    template_hit: bool | None = None
+
+    # status code and duration in seconds of the upstream call, if any.
+    upstream_status_code: int | None = None
+    upstream_duration: float | None = None
+
+
+def request_metrics_for(scope: Scope) -> RequestMetrics | None:
+    """The metrics of the request with the given scope, when metrics are enabled."""
+    return scope.get("state", {}).get("metrics")
+
+
+class Metrics:
+    """The metrics collected by mockstack.
+
+    When the `PROMETHEUS_MULTIPROC_DIR` environment variable is set, e.g. when
+    running several worker processes, metrics are aggregated across processes
+    by the prometheus client library and exposed as a whole from each worker.
+
+    """
+
+    def __init__(self, *, strategy: str):
+        from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+        self.strategy = strategy
+        self.registry = CollectorRegistry()
+
+        self.requests_in_flight = Gauge(
+            "mockstack_requests_in_flight",
+            "Number of requests currently being handled.",
+            multiprocess_mode="livesum",
+            registry=self.registry,
+        )
+        self.request_duration = Histogram(
+            "mockstack_request_duration_seconds",
+            "Time taken to handle requests.",
+            ["method", "strategy", "route"],
+            registry=self.registry,
+        )
+        self.template_lookups = Counter(
+            "mockstack_template_lookups_total",
+            "Number of template lookups, by whether a template was found.",
+            ["strategy", "result"],
+            registry=self.registry,
+        )
+        self.upstream_request_duration = Histogram(
+            "mockstack_upstream_request_duration_seconds",
+            "Time taken by upstream services to respond to reverse proxied requests.",
+            ["method", "status_code"],
+            registry=self.registry,
+        )
+
+    @property
+    def is_multiprocess(self) -> bool:
+        return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+    def exposition(self) -> bytes:
+        """The current metrics in the Prometheus text format."""
+        from prometheus_client import CollectorRegistry, generate_latest, multiprocess
+
+        if self.is_multiprocess:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return generate_latest(registry)
+
+        return generate_latest(self.registry)
+
+    def observe(
+        self, method: str, duration: float, request_metrics: RequestMetrics
+    ) -> None:
+        """Record the metrics of a handled request."""
+        self.request_duration.labels(
+            method=method,
+            strategy=self.strategy,
+            route=request_metrics.route or UNMATCHED_ROUTE,
+        ).observe(duration)
+
+        if request_metrics.template_hit is not None:
+            self.template_lookups.labels(
+                strategy=self.strategy,
+                result="hit" if request_metrics.template_hit else "miss",
+            ).inc()
+
+        if (
+            request_metrics.upstream_status_code is not None
+            and request_metrics.upstream_duration is not None
+        ):
+            self.upstream_request_duration.labels(
+                method=method,
+                status_code=str(request_metrics.upstream_status_code),
+            ).observe(request_metrics.upstream_duration)
+
+
+class MetricsMiddleware:
+    """Collects request metrics and serves them on a reserved path."""
+
+    def __init__(self, app: ASGIApp, *, metrics: "Metrics", path: str):
+        self.app = app
+        self.metrics = metrics
+        self.path = path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["path"] == self.path:
+            await self.send_exposition(send)
+            return
+
+        request_metrics = RequestMetrics()
+        scope.setdefault("state", {})["metrics"] = request_metrics
+        start_time = time.perf_counter()
+        self.metrics.requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.metrics.requests_in_flight.dec()
+            self.metrics.observe(
+                scope["method"], time.perf_counter() - start_time, request_metrics
+            )
+
+    async def send_exposition(self, send: Send) -> None:
+        from prometheus_client import CONTENT_TYPE_LATEST
+
+        body = self.metrics.exposition()
+        start: Message = {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", CONTENT_TYPE_LATEST.encode("latin-1")),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        }
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
+
+
+def metrics_provider(app: FastAPI, settings: Settings) -> None:
+    """Instrument the metrics middleware to the mockstack app, when enabled."""
+    if not settings.metrics.enabled:
+        return
+
+    if not IS_PROMETHEUS_AVAILABLE:
+        raise RuntimeError(
+            "prometheus-client is not available. "
+            "Install with optional dependency mockstack[metrics] to use metrics."
+        )
+
+    app.add_middleware(
+        MetricsMiddleware,
+        metrics=Metrics(strategy=settings.strategy),
+        path=settings.metrics.path,
+    )
@@ -1,53 +1,174 @@
 """Middleware definitionsfor the mockstack app."""
 
+import random
 import time
 
 from fastapi import FastAPI, Request
 from opentelemetry import trace
 from opentelemetry.propagate import extract
+from opentelemetry.trace import INVALID_SPAN
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from mockstack.config import Settings
 from mockstack.constants import SENSITIVE_HEADERS
 from mockstack.telemetry import (
+    ResponseBodyCapture,
     span_name_for,
     with_request_attributes,
     with_response_attributes,
-    with_response_body,
 )
 
 
-def middleware_provider(app: FastAPI, settings: Settings) -> None:
-    """Instrument the middlewares to the mockstack app."""
+class ProcessTimeMiddleware:
+    """Adds an X-Process-Time header with the time taken to start the response."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    @app.middleware("http")
-    async def add_process_time_header(request: Request, call_next):
         start_time = time.time()
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        response.headers["X-Process-Time"] = str(process_time)
-        return response
 
-    @app.middleware("http")
-    async def instrument_opentelemetry(request: Request, call_next):
+        async def send_with_process_time(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                process_time = time.time() - start_time
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", str(process_time))
+            await send(message)
+
+        await self.app(scope, receive, send_with_process_time)
+
+
+class NoOpSpanMiddleware:
+    """Makes a no-op span available on `request.state.span`.
+
+    Used when OpenTelemetry is disabled so that strategies can use the span
+    unconditionally, without paying for creating a span on every request.
+
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["span"] = INVALID_SPAN
+        await self.app(scope, receive, send)
+
+
+class OpenTelemetryMiddleware:
+    """Traces each request in an OpenTelemetry span.
+
+    The span is made available to the rest of the app on `request.state.span`.
+    Response attributes are added as the response starts. When enabled, up to
+    `capture_response_body_max_bytes` of the response body are captured as it
+    is sent, for a `capture_response_body_sample_ratio` fraction of requests.
+    Responses pass through unchanged and are never buffered.
+
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        capture_response_body: bool = False,
+        capture_response_body_max_bytes: int = 64 * 1024,
+        capture_response_body_sample_ratio: float = 1.0,
+    ):
+        self.app = app
+        self.capture_response_body = capture_response_body
+        self.capture_response_body_max_bytes = capture_response_body_max_bytes
+        self.capture_response_body_sample_ratio = capture_response_body_sample_ratio
+
+    def should_capture_response_body(self) -> bool:
+        """Whether to capture the body of the current response."""
+        return (
+            self.capture_response_body
+            and random.random() < self.capture_response_body_sample_ratio
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
         tracer = trace.get_tracer(__name__)
         ctx = extract(request.headers)
         with tracer.start_as_current_span(span_name_for(request), context=ctx) as span:
-            span = with_request_attributes(
-                request, span, sensitive_headers=SENSITIVE_HEADERS
-            )
-
             # Make the current opentelemetry span available to the request.
             # This is useful for strategies that need to add custom attributes
             # to the span associated with the request.
             request.state.span = span
 
-            response = await call_next(request)
+            if not span.is_recording():
+                # e.g. not sampled, so attributes would be discarded anyway.
+                await self.app(scope, receive, send)
+                return
+
+            with_request_attributes(request, span, sensitive_headers=SENSITIVE_HEADERS)
+
+            capture_response_body = self.should_capture_response_body()
+            body: ResponseBodyCapture | None = None
+            content_type: str | None = None
+
+            async def send_with_attributes(message: Message) -> None:
+                nonlocal body, content_type
+                if message["type"] == "http.response.start":
+                    headers = Headers(raw=message.get("headers", []))
+                    with_response_attributes(
+                        message["status"],
+                        headers,
+                        span,
+                        sensitive_headers=SENSITIVE_HEADERS,
+                    )
+                    if capture_response_body:
+                        content_type = headers.get("content-type")
+                        content_length = headers.get("content-length")
+                        body = ResponseBodyCapture(
+                            self.capture_response_body_max_bytes,
+                            content_length=(
+                                int(content_length)
+                                if content_length and content_length.isdigit()
+                                else None
+                            ),
+                        )
+                elif message["type"] == "http.response.body" and body is not None:
+                    body.write(message.get("body", b""))
+                await send(message)
+
+            await self.app(scope, receive, send_with_attributes)
+
+            if body is not None:
+                span.set_attributes(body.attributes(content_type))
+
+
+def middleware_provider(app: FastAPI, settings: Settings) -> None:
+    """Instrument the middlewares to the mockstack app.
 
-            span = with_response_attributes(
-                response, span, sensitive_headers=SENSITIVE_HEADERS
-            )
+    Middlewares are plain ASGI apps rather than `BaseHTTPMiddleware`, so they
+    add no per-request tasks and do not interfere with streaming responses.
+    The last middleware added is the outermost one.
 
-            if settings.opentelemetry.capture_response_body:
-                response, span = await with_response_body(response, span)
+    When OpenTelemetry is disabled, no spans are created at all and strategies
+    are handed a shared no-op span instead.
 
-            return response
+    """
+    app.add_middleware(ProcessTimeMiddleware)
+    if settings.opentelemetry.enabled:
+        app.add_middleware(
+            OpenTelemetryMiddleware,
+            capture_response_body=settings.opentelemetry.capture_response_body,
+            capture_response_body_max_bytes=(
+                settings.opentelemetry.capture_response_body_max_bytes
+            ),
+            capture_response_body_sample_ratio=(
+                settings.opentelemetry.capture_response_body_sample_ratio
+            ),
+        )
+    else:
+        app.add_middleware(NoOpSpanMiddleware)
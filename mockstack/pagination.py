@@ -0,0 +1,179 @@
+"""Pagination of large collections in templates.
+
+The `paginate` template function slices a collection by the pagination
+parameters of the request query, materializing only the requested page:
+
+    {% set page = paginate(range(1000000), query) %}
+    {"items": [{% for i in page.items %}{"id": {{ i }}}{{ "," if not loop.last }}{% endfor %}],
+     "total": {{ page.total }}, "next": {{ page.next_cursor | json_dumps }}}
+
+Collections are sequences, including lazy ones such as `range`, or datasets
+(see `mockstack.datasets`). Pages are serialized with the `json_dumps` filter,
+which uses orjson when available (optional dependency mockstack[orjson]).
+
+"""
+
+import base64
+import binascii
+import importlib.util
+import json
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from mockstack.datasets import Dataset
+
+# checked without importing orjson, which is only imported once a value is
+# serialized.
+IS_ORJSON_AVAILABLE = importlib.util.find_spec("orjson") is not None
+
+CURSOR_PREFIX = "offset:"
+
+
+def encode_cursor(offset: int) -> str:
+    """An opaque cursor for the page starting at the given offset.
+
+    Examples:
+    ---------
+    >>> encode_cursor(40)
+    'b2Zmc2V0OjQw'
+
+    """
+    token = base64.urlsafe_b64encode(f"{CURSOR_PREFIX}{offset}".encode())
+    return token.decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """The offset of the page a cursor points to."""
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        if not decoded.startswith(CURSOR_PREFIX):
+            raise ValueError
+        offset = int(decoded.removeprefix(CURSOR_PREFIX))
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+    if offset < 0:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return offset
+
+
+@dataclass(frozen=True)
+class Page:
+    """A page of a collection, along with what is needed to fetch the next one."""
+
+    items: list
+    total: int
+    offset: int
+    limit: int
+
+    @property
+    def number(self) -> int:
+        """The (1-based) number of the page, for pages aligned on the limit."""
+        return self.offset // self.limit + 1
+
+    @property
+    def has_next(self) -> bool:
+        return self.offset + self.limit < self.total
+
+    @property
+    def next_offset(self) -> int | None:
+        return self.offset + self.limit if self.has_next else None
+
+    @property
+    def next_page(self) -> int | None:
+        return self.number + 1 if self.has_next else None
+
+    @property
+    def next_cursor(self) -> str | None:
+        return encode_cursor(self.offset + self.limit) if self.has_next else None
+
+    def as_dict(self) -> dict:
+        """The page as commonly returned by list endpoints."""
+        return {
+            "items": self.items,
+            "total": self.total,
+            "offset": self.offset,
+            "limit": self.limit,
+            "next": self.next_cursor,
+        }
+
+
+def _int_param(query: Mapping[str, Any], name: str) -> int | None:
+    try:
+        return int(query[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def paginate(
+    collection: Sequence | Dataset,
+    query: Mapping[str, Any] | None = None,
+    *,
+    filters: Mapping[str, Any] | None = None,
+    default_limit: int = 20,
+    max_limit: int = 1000,
+    limit_param: str = "limit",
+    offset_param: str = "offset",
+    page_param: str = "page",
+    cursor_param: str = "cursor",
+) -> Page:
+    """The page of a collection requested by the query parameters.
+
+    The page starts at the offset given by the cursor, the offset or the
+    (1-based) page number, in this order of precedence, and holds up to
+    `limit` items (between 1 and `max_limit`). Missing or malformed parameters,
+    including invalid cursors, fall back to the first page of `default_limit`
+    items.
+
+    Datasets can additionally be filtered by column values, as in
+    `Dataset.filter`, ignoring the pagination parameters.
+
+    """
+    query = query or {}
+
+    limit = _int_param(query, limit_param)
+    limit = min(max(limit if limit is not None else default_limit, 1), max_limit)
+
+    offset: int | None = None
+    if query.get(cursor_param):
+        try:
+            offset = decode_cursor(str(query[cursor_param]))
+        except ValueError:
+            offset = 0
+    if offset is None:
+        offset = _int_param(query, offset_param)
+    if offset is None:
+        page = _int_param(query, page_param)
+        offset = (page - 1) * limit if page is not None else 0
+    offset = max(offset, 0)
+
+    if isinstance(collection, Dataset):
+        params = {limit_param, offset_param, page_param, cursor_param}
+        conditions = {
+            name: value for name, value in (filters or {}).items() if name not in params
+        }
+        total, items = collection.page(conditions, limit=limit, offset=offset)
+    else:
+        total = len(collection)
+        items = list(collection[offset : offset + limit])
+
+    return Page(items=items, total=total, offset=offset, limit=limit)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Page):
+        return value.as_dict()
+    return str(value)
+
+
+def json_dumps(value: Any) -> str:
+    """Serialize a value to JSON, e.g. a page, using orjson when available."""
+    if IS_ORJSON_AVAILABLE:
+        import orjson
+
+        # pages go through `_default`, rather than orjson's own dataclass support.
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+        return orjson.dumps(value, default=_default, option=option).decode()
+
+    return json.dumps(value, default=_default, separators=(",", ":"))
@@ -0,0 +1,347 @@
+"""Durable store of resources, in a SQLite database shared between processes."""
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, TypeVar
+
+from mockstack.store import BaseResourceStore, Collection, index_value
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    resource TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    UNIQUE (collection, id)
+);
+CREATE TABLE IF NOT EXISTS resource_fields (
+    collection TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    id TEXT NOT NULL,
+    PRIMARY KEY (collection, field, value, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS resource_fields_by_id ON resource_fields (collection, id);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# condition on resources which have not expired, given the current time.
+NOT_EXPIRED = "(expires_at IS NULL OR expires_at > ?)"
+
+T = TypeVar("T")
+
+
+def collection_key(collection: Collection) -> str:
+    """The key of a collection in the database."""
+    name, parent_ids = collection
+    return json.dumps([name, *parent_ids])
+
+
+class SQLiteResourceStore(BaseResourceStore):
+    """Store of resources persisted in a SQLite database.
+
+    The database is used in WAL mode, so that the worker processes of a server
+    can share it: readers never block, and writers wait for each other up to
+    `busy_timeout` seconds. Resources are kept across restarts, and as they are
+    read in place, nothing needs to be replayed on startup.
+
+    Each process opens its own connection on first use, i.e. not before worker
+    processes are forked. Operations run on a single thread of the process
+    which owns the connection, so as not to block the event loop.
+
+    Expired resources are never returned. `compact` removes them, along with
+    the least recently written resources beyond `max_bytes` in total, and
+    truncates the write-ahead log.
+
+    """
+
+    def __init__(
+        self,
+        filename: Path | str,
+        *,
+        max_bytes: int,
+        ttl: float | None = None,
+        indexed_fields: Iterable[str] = (),
+        busy_timeout: float = 5.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.filename = Path(filename)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.indexed_fields = frozenset(indexed_fields)
+        self.busy_timeout = busy_timeout
+        self.clock = clock
+
+        self._connection: sqlite3.Connection | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._pid: int | None = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The connection of the current process.
+
+        Only used from the thread of `executor`.
+
+        """
+        if self._connection is None:
+            self._connection = self._connect()
+
+        return self._connection
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """The thread of the current process running database operations."""
+        if self._executor is None or self._pid != os.getpid():
+            # those of the parent process are not usable after a fork.
+            self._connection = None
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="mockstack-sqlite"
+            )
+            self._pid = os.getpid()
+
+        return self._executor
+
+    # operations on the database, run on the thread of `executor`.
+
+    def _count(self) -> int:
+        (count,) = self.connection.execute(
+            f"SELECT COUNT(*) FROM resources WHERE {NOT_EXPIRED}", (self.clock(),)
+        ).fetchone()
+        return count
+
+    def _contains(self, collection: Collection) -> bool:
+        row = self.connection.execute(
+            f"SELECT 1 FROM resources WHERE collection = ? AND {NOT_EXPIRED} LIMIT 1",
+            (collection_key(collection), self.clock()),
+        ).fetchone()
+        return row is not None
+
+    def _get(self, collection: Collection, resource_id: str) -> dict | None:
+        row = self.connection.execute(
+            "SELECT resource FROM resources "
+            f"WHERE collection = ? AND id = ? AND {NOT_EXPIRED}",
+            (collection_key(collection), resource_id, self.clock()),
+        ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def _put(self, collection: Collection, resource_id: str, resource: dict) -> None:
+        key = collection_key(collection)
+        data = json.dumps(resource, default=str)
+        expires_at = self.clock() + self.ttl if self.ttl is not None else None
+
+        with self._transaction(self.connection) as connection:
+            # deleted rather than replaced in place, so that the resource moves
+            # to the end of the store order.
+            self._delete_rows(connection, key, resource_id)
+            connection.execute(
+                "INSERT INTO resources (collection, id, resource, size, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, resource_id, data, len(data), expires_at),
+            )
+            self._index(connection, key, resource_id, resource)
+
+    def _delete(self, collection: Collection, resource_id: str) -> dict | None:
+        key = collection_key(collection)
+        with self._transaction(self.connection) as connection:
+            row = connection.execute(
+                "SELECT resource FROM resources WHERE collection = ? AND id = ?",
+                (key, resource_id),
+            ).fetchone()
+            self._delete_rows(connection, key, resource_id)
+
+        return json.loads(row[0]) if row is not None else None
+
+    def _list(self, collection: Collection, filters: Mapping[str, str]) -> list[dict]:
+        key = collection_key(collection)
+        query = f"SELECT resource FROM resources WHERE collection = ? AND {NOT_EXPIRED}"
+        params: list = [key, self.clock()]
+        for field, value in filters.items():
+            query += (
+                " AND id IN (SELECT id FROM resource_fields"
+                " WHERE collection = ? AND field = ? AND value = ?)"
+            )
+            params.extend((key, field, value))
+        query += " ORDER BY rowid"
+
+        return [
+            json.loads(resource)
+            for (resource,) in self.connection.execute(query, params).fetchall()
+        ]
+
+    def _clear(self) -> None:
+        with self._transaction(self.connection) as connection:
+            connection.execute("DELETE FROM resources")
+            connection.execute("DELETE FROM resource_fields")
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = None
+
+    async def count(self) -> int:
+        return await self._run(self._count)
+
+    async def contains(self, collection: Collection) -> bool:
+        return await self._run(self._contains, collection)
+
+    async def get(self, collection: Collection, resource_id: str) -> dict | None:
+        return await self._run(self._get, collection, resource_id)
+
+    async def put(
+        self, collection: Collection, resource_id: str, resource: dict
+    ) -> None:
+        await self._run(self._put, collection, resource_id, resource)
+
+    async def delete(self, collection: Collection, resource_id: str) -> dict | None:
+        return await self._run(self._delete, collection, resource_id)
+
+    async def list(
+        self, collection: Collection, filters: Mapping[str, str] | None = None
+    ) -> list[dict]:
+        filters = filters or {}
+        self._check_filters(filters)
+        return await self._run(self._list, collection, filters)
+
+    async def clear(self) -> None:
+        await self._run(self._clear)
+
+    async def compact(self) -> None:
+        """Remove expired and evicted resources, and truncate the write-ahead log.
+
+        Runs in a thread, with a connection of its own.
+
+        """
+        await asyncio.to_thread(self._compact)
+
+    async def close(self) -> None:
+        if self._executor is not None and self._pid == os.getpid():
+            await self._run(self._close)
+            self._executor.shutdown()
+        self._connection = None
+        self._executor = None
+        self._pid = None
+
+    async def _run(self, function: Callable[..., T], *args: Any) -> T:
+        """Run a database operation on the thread of the current process."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    def _compact(self) -> None:
+        connection = self._connect()
+        try:
+            with self._transaction(connection):
+                connection.execute(
+                    "DELETE FROM resources WHERE expires_at <= ?", (self.clock(),)
+                )
+                # keeps the most recently written resources within max_bytes.
+                connection.execute(
+                    "DELETE FROM resources WHERE rowid IN ("
+                    " SELECT rowid FROM ("
+                    "  SELECT rowid, SUM(size) OVER (ORDER BY rowid DESC) AS total"
+                    "  FROM resources"
+                    " ) WHERE total > ?"
+                    ")",
+                    (self.max_bytes,),
+                )
+                connection.execute(
+                    "DELETE FROM resource_fields WHERE NOT EXISTS ("
+                    " SELECT 1 FROM resources"
+                    " WHERE resources.collection = resource_fields.collection"
+                    " AND resources.id = resource_fields.id"
+                    ")"
+                )
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating (or migrating) the database as needed."""
+        self.filename.parent.mkdir(parents=True, exist_ok=True)
+        # transactions are managed explicitly, see `_transaction`.
+        connection = sqlite3.connect(
+            self.filename, timeout=self.busy_timeout, isolation_level=None
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        # commits survive crashes of the process, though not of the machine,
+        # which is plenty for simulated resources and much faster.
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+
+        indexed_fields = json.dumps(sorted(self.indexed_fields))
+        with self._transaction(connection):
+            row = connection.execute(
+                "SELECT value FROM metadata WHERE key = 'indexed_fields'"
+            ).fetchone()
+            if row is None or row[0] != indexed_fields:
+                self._reindex(connection)
+                connection.execute(
+                    "INSERT OR REPLACE INTO metadata (key, value) "
+                    "VALUES ('indexed_fields', ?)",
+                    (indexed_fields,),
+                )
+
+        return connection
+
+    @contextmanager
+    def _transaction(
+        self, connection: sqlite3.Connection
+    ) -> Iterator[sqlite3.Connection]:
+        """A write transaction.
+
+        The write lock is taken up front, so that concurrent transactions wait
+        for each other instead of failing to upgrade their read locks.
+
+        """
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _delete_rows(
+        self, connection: sqlite3.Connection, key: str, resource_id: str
+    ) -> None:
+        connection.execute(
+            "DELETE FROM resources WHERE collection = ? AND id = ?", (key, resource_id)
+        )
+        connection.execute(
+            "DELETE FROM resource_fields WHERE collection = ? AND id = ?",
+            (key, resource_id),
+        )
+
+    def _index(
+        self,
+        connection: sqlite3.Connection,
+        key: str,
+        resource_id: str,
+        resource: dict,
+    ) -> None:
+        connection.executemany(
+            "INSERT INTO resource_fields (collection, field, value, id) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (key, field, index_value(resource[field]), resource_id)
+                for field in self.indexed_fields & resource.keys()
+            ],
+        )
+
+    def _reindex(self, connection: sqlite3.Connection) -> None:
+        """Rebuild the indexes, e.g. after the indexed fields changed."""
+        connection.execute("DELETE FROM resource_fields")
+        for key, resource_id, data in connection.execute(
+            "SELECT collection, id, resource FROM resources"
+        ).fetchall():
+            self._index(connection, key, resource_id, json.loads(data))
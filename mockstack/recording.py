@@ -0,0 +1,91 @@
+"""Recording of proxied responses as filefixtures templates."""
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from mockstack.templating import (
+    iter_possible_template_filenames,
+    parse_template_name_segments_and_identifiers,
+)
+
+
+class TemplateRecorder:
+    """Records upstream responses into a templates directory.
+
+    Each response is written under the most specific template name that the
+    filefixtures strategy would look up for the same request path, so that
+    running the filefixtures strategy against the same templates directory
+    replays the recorded responses.
+
+    """
+
+    logger = logging.getLogger("TemplateRecorder")
+
+    def __init__(self, templates_dir: Path | str):
+        self.templates_dir = Path(templates_dir)
+
+    def template_name_for(self, path: str) -> str:
+        """The most specific template name filefixtures would look up for a path."""
+        name_segments, identifiers = parse_template_name_segments_and_identifiers(
+            path, default_identifier_key="id"
+        )
+        return next(
+            iter_possible_template_filenames(
+                name_segments,
+                identifiers,
+                template_file_separator="-",
+                template_file_extension=".j2",
+                default_template_name="index.j2",
+            )
+        )
+
+    def template_source_for(self, content: bytes) -> str | None:
+        """Convert a response body into template source.
+
+        Bodies containing Jinja2 syntax are wrapped in a raw block so that they
+        are replayed verbatim. Returns None for bodies that cannot be stored as
+        a text template.
+
+        """
+        try:
+            text = content.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+
+        if not any(marker in text for marker in ("{{", "{%", "{#")):
+            return text
+
+        if "endraw" in text:
+            # cannot be escaped safely with a raw block.
+            return None
+
+        return "{% raw %}" + text + "{% endraw %}"
+
+    def record(self, path: str, content: bytes) -> Path | None:
+        """Write the response body for a request path to its template file.
+
+        The file is written atomically so a concurrent reader never observes a
+        partially written template. Returns the template filename, or None if
+        the response could not be recorded.
+
+        """
+        name = self.template_name_for(path)
+        source = self.template_source_for(content)
+        if source is None:
+            self.logger.warning("Not recording non-text response for %s", path)
+            return None
+
+        filename = self.templates_dir / name
+        fd, tmp_filename = tempfile.mkstemp(dir=self.templates_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(source)
+            os.replace(tmp_filename, filename)
+        except BaseException:
+            os.unlink(tmp_filename)
+            raise
+
+        self.logger.debug("Recorded response for %s into %s", path, filename)
+        return filename
@@ -1,15 +1,22 @@
 """Rules for the proxy rules strategy."""
 
+import heapq
 import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Self
+from typing import Iterable, Iterator, Self
 
 from fastapi import Request
 
 from mockstack.constants import PROXYRULES_FILE_TEMPLATE_PREFIX
 from mockstack.templating import parse_template_name_segments_and_identifiers
 
+# characters with a special meaning in regular expressions.
+REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
+
+# quantifiers which make the preceding character optional.
+REGEX_OPTIONAL_QUANTIFIERS = frozenset("?*{")
+
 
 class RuleResult(ABC):
     """Base class for rule application results."""
@@ -56,6 +63,11 @@ class Rule:
         self.method = method
         self.name = name
 
+        self.regex = re.compile(pattern)
+        # whether the pattern can only match at the start of the path. As for
+        # `literal_prefix`, alternations may match elsewhere, e.g. `^/a|x`.
+        self.anchored = pattern.startswith(("^", "\\A")) and "|" not in pattern
+
     @classmethod
     def from_dict(cls, data: dict[str, str]) -> Self:
         return cls(
@@ -71,12 +83,19 @@ class Rule:
             # if rule is limited to a specific HTTP method, validate first.
             return False
 
-        return re.match(self.pattern, request.url.path) is not None
+        return self.regex.match(request.url.path) is not None
 
-    def apply(self, request: Request) -> RuleResult:
-        """Apply the rule to the request."""
+    def apply(self, request: Request, match: re.Match | None = None) -> RuleResult:
+        """Apply the rule to the request.
+
+        `match` is the match of the rule for the request path, when already
+        known (e.g. from `RuleMatcher.match_for`).
+
+        """
         path = request.url.path
-        result = self._url_for(path)
+        if match is None:
+            match = self.regex.match(path)
+        result = self._url_for(path, match)
 
         # Check if the replacement is a file template
         if result.startswith(PROXYRULES_FILE_TEMPLATE_PREFIX):
@@ -94,8 +113,26 @@ class Rule:
             # Regular URL replacement
             return URLRuleResult(url=result)
 
-    def _url_for(self, path: str) -> str:
-        return re.sub(self.pattern, self.replacement, path)
+    def _url_for(self, path: str, match: re.Match | None = None) -> str:
+        """Substitute the replacement for the pattern in the given path.
+
+        When the match for the path is already known and the pattern does not
+        occur again in the rest of the path, the substitution is expanded from
+        that match directly instead of re-scanning the path from the start.
+        Patterns anchored at the start cannot occur again, so the rest of the
+        path is only searched for unanchored ones.
+
+        """
+        if match is not None and (
+            self.anchored or self.regex.search(path, match.end()) is None
+        ):
+            return (
+                path[: match.start()]
+                + match.expand(self.replacement)
+                + path[match.end() :]
+            )
+
+        return self.regex.sub(self.replacement, path)
 
     def _create_template_context(self, request: Request) -> dict:
         """Create template context from the request, using the same logic as templating.py."""
@@ -110,3 +147,155 @@ class Rule:
             "method": request.method,
             **identifiers,
         }
+
+
+def literal_prefix(pattern: str) -> str:
+    """Return the literal string any path matching the pattern must start with.
+
+    Rule patterns are matched against the start of the path, so e.g. the pattern
+    `^/api/v1/projects/(\\d+)` can only match paths starting with `/api/v1/projects/`.
+    The analysis is conservative: when in doubt, a shorter (possibly empty)
+    prefix is returned.
+
+    Examples:
+    ---------
+    >>> literal_prefix(r"^/api/v1/projects/(\\d+)")
+    '/api/v1/projects/'
+
+    >>> literal_prefix(r"/api/v1?/items")
+    '/api/v'
+
+    >>> literal_prefix(r"/api|/v1")
+    ''
+
+    """
+    if "|" in pattern:
+        # alternations may allow matching paths without the leading literal.
+        return ""
+
+    prefix = []
+    i = 1 if pattern.startswith("^") else 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            escaped = pattern[i + 1 : i + 2]
+            if not escaped or escaped.isalnum():
+                # character classes, anchors and back-references, e.g. \d, \A, \1.
+                break
+            literal, step = escaped, 2
+        elif char in REGEX_SPECIAL_CHARS:
+            break
+        else:
+            literal, step = char, 1
+
+        quantifier = pattern[i + step : i + step + 1]
+        if quantifier in REGEX_OPTIONAL_QUANTIFIERS:
+            break
+
+        prefix.append(literal)
+        if quantifier == "+":
+            break
+
+        i += step
+
+    return "".join(prefix)
+
+
+class RulePrefixIndex:
+    """Index of rules for a single HTTP method, bucketed by literal prefix.
+
+    Rules are stored in a character trie keyed by their literal prefix, so only
+    rules whose prefix the path actually starts with are tried. Rules without a
+    usable prefix are always tried. Candidates are evaluated in their original
+    order to preserve first-match-wins semantics.
+
+    """
+
+    def __init__(self, rules: Iterable[tuple[int, Rule]]):
+        self.trie: dict = {}
+        self.unprefixed: list[tuple[int, Rule]] = []
+
+        for position, rule in rules:
+            prefix = literal_prefix(rule.pattern)
+            if not prefix:
+                self.unprefixed.append((position, rule))
+                continue
+
+            node = self.trie
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node.setdefault(None, []).append((position, rule))
+
+    def candidates(self, path: str) -> list[tuple[int, Rule]]:
+        """Rules whose literal prefix is a prefix of the path."""
+        candidates: list[tuple[int, Rule]] = []
+        node = self.trie
+        for char in path:
+            child = node.get(char)
+            if child is None:
+                break
+            node = child
+            candidates.extend(node.get(None, ()))
+
+        return candidates
+
+    def match(self, path: str) -> tuple[Rule, re.Match] | None:
+        """Find the first rule matching the path, along with its match object."""
+        candidates = self.candidates(path)
+        ordered: Iterator[tuple[int, Rule]]
+        if candidates:
+            candidates.sort(key=lambda candidate: candidate[0])
+            ordered = heapq.merge(
+                candidates, self.unprefixed, key=lambda candidate: candidate[0]
+            )
+        else:
+            ordered = iter(self.unprefixed)
+
+        for _, rule in ordered:
+            match = rule.regex.match(path)
+            if match is not None:
+                return rule, match
+
+        return None
+
+
+class RuleMatcher:
+    """Compiled matcher for finding the first rule that matches a request.
+
+    Equivalent to scanning the rules in order and returning the first one for
+    which `Rule.matches` is true, but rules are pre-bucketed by HTTP method and
+    literal path prefix so that only plausible candidates are evaluated.
+
+    """
+
+    def __init__(self, rules: list[Rule]):
+        self.rules = rules
+
+        methods = {rule.method.upper() for rule in rules if rule.method is not None}
+        self.indexes = {
+            method: RulePrefixIndex(
+                (position, rule)
+                for position, rule in enumerate(rules)
+                if rule.method is None or rule.method.upper() == method
+            )
+            for method in methods
+        }
+        self.default_index = RulePrefixIndex(
+            (position, rule)
+            for position, rule in enumerate(rules)
+            if rule.method is None
+        )
+
+    def match(self, method: str, path: str) -> tuple[Rule, re.Match] | None:
+        """Find the first rule matching the method and path."""
+        index = self.indexes.get(method.upper(), self.default_index)
+        return index.match(path)
+
+    def match_for(self, request: Request) -> tuple[Rule, re.Match] | None:
+        """Find the first rule matching the request, along with its match object."""
+        return self.match(request.method, request.url.path)
+
+    def rule_for(self, request: Request) -> Rule | None:
+        """Find the first rule matching the request."""
+        found = self.match_for(request)
+        return found[0] if found is not None else None
@@ -0,0 +1,84 @@
+"""Sampling of OpenTelemetry traces."""
+
+import threading
+import time
+
+from opentelemetry.sdk.trace.sampling import (
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
+
+from mockstack.config import OpenTelemetrySettings
+
+
+class RateLimitingSampler(Sampler):
+    """Samples at most `max_per_second` traces per second.
+
+    Uses a token bucket refilled continuously, allowing bursts of up to one
+    second worth of traces. Traces within the limit are sampled according to
+    the `delegate` sampler, so that e.g. ratio sampling can be rate limited.
+
+    """
+
+    def __init__(self, max_per_second: float, delegate: Sampler | None = None):
+        self.max_per_second = max_per_second
+        self.delegate = delegate
+        self._tokens = max_per_second
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.max_per_second,
+                self._tokens + (now - self._last) * self.max_per_second,
+            )
+            self._last = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def should_sample(
+        self,
+        parent_context,
+        trace_id,
+        name,
+        kind=None,
+        attributes=None,
+        links=None,
+        trace_state=None,
+    ) -> SamplingResult:
+        if self.delegate is not None:
+            result = self.delegate.should_sample(
+                parent_context, trace_id, name, kind, attributes, links, trace_state
+            )
+            if not result.decision.is_sampled():
+                return result
+
+        if not self._acquire():
+            return SamplingResult(Decision.DROP)
+
+        return SamplingResult(Decision.RECORD_AND_SAMPLE, attributes)
+
+    def get_description(self) -> str:
+        delegate = self.delegate.get_description() if self.delegate else None
+        return f"RateLimitingSampler{{{self.max_per_second}, {delegate}}}"
+
+
+def sampler_for(settings: OpenTelemetrySettings) -> Sampler:
+    """The sampler to use for the given settings.
+
+    Root spans are sampled by ratio and optionally rate limited, while spans
+    with a remote parent follow the sampling decision of the parent.
+
+    """
+    root: Sampler = TraceIdRatioBased(settings.sample_ratio)
+    if settings.max_traces_per_second is not None:
+        root = RateLimitingSampler(settings.max_traces_per_second, root)
+
+    return ParentBased(root)
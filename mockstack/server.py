@@ -0,0 +1,233 @@
+"""Serving the application with one or more worker processes."""
+
+import gc
+import importlib.util
+import logging
+import os
+import signal
+import socket
+import time
+
+import uvicorn
+from fastapi import FastAPI
+
+from mockstack.config import Settings
+from mockstack.constants import (
+    SERIALIZED_SETTINGS_ENV_VAR,
+    ServerHTTPProtocol,
+    ServerLoop,
+)
+
+# import string of the app factory used by spawned workers.
+APP_FACTORY = "mockstack.main:create_app_from_environment"
+
+# exit code of workers which failed to start up, as with uvicorn.
+STARTUP_FAILURE_EXIT_CODE = 3
+
+logger = logging.getLogger("mockstack.server")
+
+
+class WorkerRestarts:
+    """Backoff for restarting workers which keep exiting soon after being forked.
+
+    Workers exiting within `min_uptime` seconds count as failing fast, e.g. on
+    a startup error. They are restarted after a delay doubling from
+    `initial_delay` up to `max_delay` with each consecutive fast failure, and
+    `max_failures` consecutive fast failures are an error. Workers which ran
+    for longer are restarted right away.
+
+    """
+
+    def __init__(
+        self,
+        *,
+        min_uptime: float = 10.0,
+        initial_delay: float = 0.5,
+        max_delay: float = 30.0,
+        max_failures: int = 5,
+    ):
+        self.min_uptime = min_uptime
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.max_failures = max_failures
+        self.failures = 0
+
+    def delay_for(self, uptime: float) -> float:
+        """The delay before replacing a worker which exited after `uptime` seconds.
+
+        Raises a `RuntimeError` once workers failed fast `max_failures` times
+        in a row.
+
+        """
+        if uptime >= self.min_uptime:
+            self.failures = 0
+            return 0.0
+
+        self.failures += 1
+        if self.failures >= self.max_failures:
+            raise RuntimeError(
+                f"Workers exited within {self.min_uptime} seconds of starting "
+                f"{self.failures} times in a row, giving up. "
+                "See the worker logs above for the cause."
+            )
+
+        return min(self.initial_delay * 2 ** (self.failures - 1), self.max_delay)
+
+
+def effective_loop(loop: ServerLoop) -> ServerLoop:
+    """The event loop implementation the server will actually use."""
+    if loop != ServerLoop.AUTO:
+        return loop
+
+    if importlib.util.find_spec("uvloop") is not None:
+        return ServerLoop.UVLOOP
+    return ServerLoop.ASYNCIO
+
+
+def effective_http(http: ServerHTTPProtocol) -> ServerHTTPProtocol:
+    """The HTTP/1.1 parser the server will actually use."""
+    if http != ServerHTTPProtocol.AUTO:
+        return http
+
+    if importlib.util.find_spec("httptools") is not None:
+        return ServerHTTPProtocol.HTTPTOOLS
+    return ServerHTTPProtocol.H11
+
+
+def server_options(settings: Settings) -> dict:
+    """Keyword arguments for running uvicorn with the given settings."""
+    options = {
+        "host": settings.host,
+        "port": settings.port,
+        "loop": str(settings.server.loop),
+        "http": str(settings.server.http),
+        "backlog": settings.server.backlog,
+        "limit_concurrency": settings.server.limit_concurrency,
+        "timeout_keep_alive": settings.server.timeout_keep_alive,
+        "access_log": settings.server.access_log,
+    }
+    if settings.server.h11_max_incomplete_event_size is not None:
+        options["h11_max_incomplete_event_size"] = (
+            settings.server.h11_max_incomplete_event_size
+        )
+
+    return options
+
+
+def serve(app: FastAPI, settings: Settings) -> None:
+    """Serve the app with `settings.workers` worker processes.
+
+    On platforms supporting `fork`, a pre-fork master loads templates and rules
+    once and then forks the workers, which share them copy-on-write and accept
+    connections on a single listening socket. Elsewhere, workers are spawned by
+    uvicorn and each rebuild the app from the serialized settings.
+
+    """
+    if settings.workers <= 1:
+        uvicorn.run(app, **server_options(settings))
+    elif hasattr(os, "fork"):
+        serve_forked(app, settings)
+    else:
+        serve_spawned(settings)
+
+
+def serve_spawned(settings: Settings) -> None:
+    """Serve with workers spawned by uvicorn, using the app factory."""
+    os.environ[SERIALIZED_SETTINGS_ENV_VAR] = settings.model_dump_json()
+
+    uvicorn.run(
+        APP_FACTORY,
+        factory=True,
+        workers=settings.workers,
+        **server_options(settings),
+    )
+
+
+def serve_forked(app: FastAPI, settings: Settings) -> None:
+    """Serve with workers forked from this (master) process.
+
+    Workers which exit unexpectedly are replaced, backing off when they keep
+    failing soon after starting (see `WorkerRestarts`). SIGINT and SIGTERM
+    shut all workers down gracefully.
+
+    """
+    config = uvicorn.Config(app, **server_options(settings))
+    sock = config.bind_socket()
+
+    app.state.strategy.preload()
+
+    # objects allocated so far are never collected, so the garbage collector
+    # does not touch (and thereby copy) the pages shared with the workers.
+    gc.freeze()
+
+    # start times of the workers, by pid.
+    workers: dict[int, float] = {}
+    restarts = WorkerRestarts()
+    shutting_down = False
+
+    def shutdown(signum, frame):
+        nonlocal shutting_down
+        shutting_down = True
+        for pid in workers:
+            # SIGTERM rather than forwarding the signal as is: on a terminal the
+            # workers receive SIGINT directly, and a second SIGINT forces exit.
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    for _ in range(settings.workers):
+        workers[fork_worker(config, sock)] = time.monotonic()
+
+    try:
+        while workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+
+            started_at = workers.pop(pid, None)
+            if shutting_down or started_at is None:
+                continue
+
+            try:
+                delay = restarts.delay_for(time.monotonic() - started_at)
+            except RuntimeError as error:
+                shutdown(None, None)
+                logger.error("%s", error)
+                raise SystemExit(STARTUP_FAILURE_EXIT_CODE) from error
+
+            logger.warning(
+                "Worker %d exited with status %d, restarting in %.1f seconds",
+                pid,
+                os.waitstatus_to_exitcode(status),
+                delay,
+            )
+            time.sleep(delay)
+            if not shutting_down:
+                workers[fork_worker(config, sock)] = time.monotonic()
+    finally:
+        for pid in list(workers):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        sock.close()
+
+
+def fork_worker(config: uvicorn.Config, sock: socket.socket) -> int:
+    """Fork a worker process serving on the given socket, returning its pid."""
+    pid = os.fork()
+    if pid:
+        return pid
+
+    exit_code = 1
+    try:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        server = uvicorn.Server(config)
+        server.run(sockets=[sock])
+        # uvicorn returns rather than raising when e.g. the lifespan fails.
+        exit_code = 0 if server.started else STARTUP_FAILURE_EXIT_CODE
+    finally:
+        os._exit(exit_code)
@@ -0,0 +1,51 @@
+"""Coalescing of identical concurrent calls (single-flight)."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Runs at most one in-flight call per key.
+
+    Callers which arrive while a call for the same key is still running
+    wait for that call and share its result (or exception) instead of
+    starting their own. Once the call completes the key is forgotten, so
+    later callers start a new call.
+
+    The call runs in its own task, so a caller being cancelled does not
+    cancel the call for the other callers waiting on it.
+
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task[T]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn`, or wait for the call already in flight for `key`."""
+        task = self._calls.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task[T]) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def cancel(self) -> None:
+        """Cancel all calls in flight."""
+        for task in list(self._calls.values()):
+            task.cancel()
@@ -0,0 +1,302 @@
+"""Stores of resources simulated by the filefixtures strategy."""
+
+import json
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from mockstack.cache import LRUCache
+from mockstack.config import Settings
+from mockstack.identifiers import looks_like_id
+from mockstack.templating import parse_template_name_segments_and_identifiers
+
+# route reported (e.g. in metrics) for requests served from the store.
+RESOURCE_STORE_ROUTE = "resource-store"
+
+# a collection of resources, given by its name (as in template names) and the
+# identifiers of its parent resources, e.g. ("api-v1-projects-tasks", ("1234",)).
+Collection = tuple[str, tuple[str, ...]]
+
+
+def resource_key_for(
+    path: str, *, template_file_separator: str = "-"
+) -> tuple[Collection, str | None]:
+    """The collection addressed by a request path, and the resource id if any.
+
+    Examples:
+    ---------
+    >>> resource_key_for("/api/v1/projects/1234/tasks/5678")
+    (('api-v1-projects-tasks', ('1234',)), '5678')
+
+    >>> resource_key_for("/api/v1/projects/1234/tasks")
+    (('api-v1-projects-tasks', ('1234',)), None)
+
+    """
+    name_segments, identifiers = parse_template_name_segments_and_identifiers(
+        path, default_identifier_key="id"
+    )
+    ids = list(identifiers.values())
+    last_segment = path.rstrip("/").rsplit("/", 1)[-1]
+    resource_id = ids.pop() if ids and looks_like_id(last_segment) else None
+
+    return (template_file_separator.join(name_segments), tuple(ids)), resource_id
+
+
+def index_value(value: Any) -> str:
+    """The value of a field as indexed, comparable to query parameters."""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, sort_keys=True)
+
+
+@dataclass(frozen=True)
+class StoredResource:
+    """A resource along with its bookkeeping."""
+
+    resource: dict
+    size: int
+    expires_at: float | None
+
+
+class BaseResourceStore(ABC):
+    """Base class for stores of resources, keyed by collection and id.
+
+    Operations are coroutines, so that stores doing I/O (e.g. to a database)
+    do not block the event loop.
+
+    """
+
+    # fields of resources by which listings can be filtered.
+    indexed_fields: frozenset[str]
+
+    @abstractmethod
+    async def count(self) -> int:
+        """The number of stored resources."""
+
+    @abstractmethod
+    async def contains(self, collection: Collection) -> bool:
+        """Whether any resources are stored in the collection."""
+
+    @abstractmethod
+    async def get(self, collection: Collection, resource_id: str) -> dict | None:
+        """Get a resource, unless it was never stored, deleted or expired."""
+
+    @abstractmethod
+    async def put(
+        self, collection: Collection, resource_id: str, resource: dict
+    ) -> None:
+        """Store a resource, replacing any resource with the same id."""
+
+    @abstractmethod
+    async def delete(self, collection: Collection, resource_id: str) -> dict | None:
+        """Remove a resource, returning it if it was stored."""
+
+    @abstractmethod
+    async def list(
+        self, collection: Collection, filters: Mapping[str, str] | None = None
+    ) -> list[dict]:
+        """The resources of a collection, in the order they were stored.
+
+        `filters` restricts the listing to resources whose indexed fields have
+        the given values.
+
+        """
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove all resources."""
+
+    async def compact(self) -> None:
+        """Reclaim space held by expired or evicted resources.
+
+        Invoked periodically while the app is running.
+
+        """
+
+    async def close(self) -> None:
+        """Release any resources held by the store."""
+
+    def _check_filters(self, filters: Mapping[str, str]) -> None:
+        for field in filters:
+            if field not in self.indexed_fields:
+                raise ValueError(f"Field is not indexed: {field}")
+
+
+class ResourceStore(BaseResourceStore):
+    """Memory-bounded store of resources, keyed by collection and id.
+
+    Resources are looked up by id in constant time. Once their total size
+    (JSON-encoded) exceeds `max_bytes`, the least recently used resources are
+    evicted, and resources expire `ttl` seconds after they were last written.
+    Expired resources are removed when next accessed.
+
+    Each collection keeps the ids of its resources in the order they were
+    stored, for listing, and the given `indexed_fields` of resources are
+    indexed for filtering listings by their values.
+
+    Operations never block, and run directly on the event loop.
+
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int,
+        ttl: float | None = None,
+        indexed_fields: Iterable[str] = (),
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.indexed_fields = frozenset(indexed_fields)
+        self.clock = clock
+
+        self._resources: LRUCache[tuple[Collection, str], StoredResource] = LRUCache(
+            max_bytes,
+            sizeof=lambda stored: stored.size,
+            on_evict=self._unindex,
+        )
+        # ids of the resources of each collection, as an insertion-ordered set.
+        self._collections: dict[Collection, dict[str, None]] = {}
+        # ids of the resources of each collection by the values of indexed fields.
+        self._indexes: dict[tuple[Collection, str], dict[str, dict[str, None]]] = {}
+
+    async def count(self) -> int:
+        return len(self._resources)
+
+    async def contains(self, collection: Collection) -> bool:
+        return collection in self._collections
+
+    async def get(self, collection: Collection, resource_id: str) -> dict | None:
+        return self._get(collection, resource_id)
+
+    async def put(
+        self, collection: Collection, resource_id: str, resource: dict
+    ) -> None:
+        key = (collection, resource_id)
+        self._delete(collection, resource_id)
+
+        stored = StoredResource(
+            resource=resource,
+            size=len(json.dumps(resource, default=str)),
+            expires_at=self.clock() + self.ttl if self.ttl is not None else None,
+        )
+        self._resources.set(key, stored)
+        if key in self._resources:
+            self._index(key, stored)
+
+    async def delete(self, collection: Collection, resource_id: str) -> dict | None:
+        return self._delete(collection, resource_id)
+
+    async def list(
+        self, collection: Collection, filters: Mapping[str, str] | None = None
+    ) -> list[dict]:
+        filters = filters or {}
+        self._check_filters(filters)
+
+        ids: list[str]
+        if filters:
+            # starting from the fewest candidates. Indexes keep the store order.
+            smallest, *others = sorted(
+                (
+                    self._indexes.get((collection, field), {}).get(value, {})
+                    for field, value in filters.items()
+                ),
+                key=len,
+            )
+            ids = [
+                resource_id
+                for resource_id in smallest
+                if all(resource_id in matching for matching in others)
+            ]
+        else:
+            ids = list(self._collections.get(collection, {}))
+
+        resources = []
+        for resource_id in ids:
+            resource = self._get(collection, resource_id)
+            if resource is not None:
+                resources.append(resource)
+
+        return resources
+
+    async def clear(self) -> None:
+        self._resources.clear()
+        self._collections.clear()
+        self._indexes.clear()
+
+    async def compact(self) -> None:
+        """Remove expired resources."""
+        now = self.clock()
+        expired = [
+            key
+            for key, stored in self._resources.items()
+            if stored.expires_at is not None and stored.expires_at <= now
+        ]
+        for collection, resource_id in expired:
+            self._delete(collection, resource_id)
+
+    def _get(self, collection: Collection, resource_id: str) -> dict | None:
+        key = (collection, resource_id)
+        stored = self._resources.get(key)
+        if stored is None:
+            return None
+
+        if stored.expires_at is not None and stored.expires_at <= self.clock():
+            self._delete(collection, resource_id)
+            return None
+
+        return stored.resource
+
+    def _delete(self, collection: Collection, resource_id: str) -> dict | None:
+        key = (collection, resource_id)
+        stored = self._resources.pop(key)
+        if stored is None:
+            return None
+
+        self._unindex(key, stored)
+        return stored.resource
+
+    def _index(self, key: tuple[Collection, str], stored: StoredResource) -> None:
+        collection, resource_id = key
+        self._collections.setdefault(collection, {})[resource_id] = None
+        for field in self.indexed_fields & stored.resource.keys():
+            value = index_value(stored.resource[field])
+            index = self._indexes.setdefault((collection, field), {})
+            index.setdefault(value, {})[resource_id] = None
+
+    def _unindex(self, key: tuple[Collection, str], stored: StoredResource) -> None:
+        collection, resource_id = key
+        ids = self._collections.get(collection, {})
+        ids.pop(resource_id, None)
+        if not ids:
+            self._collections.pop(collection, None)
+
+        for field in self.indexed_fields & stored.resource.keys():
+            index = self._indexes.get((collection, field), {})
+            value = index_value(stored.resource[field])
+            matching = index.get(value, {})
+            matching.pop(resource_id, None)
+            if not matching:
+                index.pop(value, None)
+            if not index:
+                self._indexes.pop((collection, field), None)
+
+
+def resource_store_for(settings: Settings) -> BaseResourceStore | None:
+    """The resource store configured for the filefixtures strategy, if enabled."""
+    if not settings.filefixtures_resource_store:
+        return None
+
+    options: dict[str, Any] = {
+        "max_bytes": settings.filefixtures_resource_store_max_bytes,
+        "ttl": settings.filefixtures_resource_store_ttl,
+        "indexed_fields": settings.filefixtures_resource_store_indexed_fields,
+    }
+    if settings.filefixtures_resource_store_path is not None:
+        from mockstack.persistence import SQLiteResourceStore
+
+        return SQLiteResourceStore(settings.filefixtures_resource_store_path, **options)
+
+    return ResourceStore(**options)
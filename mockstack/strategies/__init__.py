@@ -1,5 +1,18 @@
 from mockstack.strategies.base import BaseStrategy
-from mockstack.strategies.filefixtures import FileFixturesStrategy
-from mockstack.strategies.proxyrules import ProxyRulesStrategy
 
 __all__ = ["BaseStrategy", "FileFixturesStrategy", "ProxyRulesStrategy"]
+
+
+def __getattr__(name: str):
+    # strategies are imported on first access, so that only the strategy in use
+    # (and its dependencies) is loaded. See `factory.strategy_class_for`.
+    if name == "FileFixturesStrategy":
+        from mockstack.strategies.filefixtures import FileFixturesStrategy
+
+        return FileFixturesStrategy
+    if name == "ProxyRulesStrategy":
+        from mockstack.strategies.proxyrules import ProxyRulesStrategy
+
+        return ProxyRulesStrategy
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,10 +1,14 @@
 """Base strategy for MockStack."""
 
+import asyncio
 from abc import ABC, abstractmethod
+from functools import cached_property
 
 from fastapi import Request, Response
 
 from mockstack.config import Settings
+from mockstack.datasets import Datasets
+from mockstack.llm.cache import LLMCache
 
 
 class BaseStrategy(ABC):
@@ -16,7 +20,61 @@ class BaseStrategy(ABC):
     @abstractmethod
     async def apply(self, request: Request) -> Response:
         """Apply the strategy to the request and response."""
-        pass
+
+    @cached_property
+    def ollama_cache(self) -> LLMCache | None:
+        """Cache of completions for the `ollama` template function, when enabled."""
+        if not self.settings.ollama_cache_enabled:
+            return None
+
+        return LLMCache(
+            max_entries=self.settings.ollama_cache_max_entries,
+            directory=self.settings.ollama_cache_dir,
+            directory_max_bytes=self.settings.ollama_cache_dir_max_bytes,
+        )
+
+    @cached_property
+    def datasets(self) -> Datasets | None:
+        """Datasets available to templates as the `datasets` global, when configured."""
+        if self.settings.datasets_dir is None:
+            return None
+
+        return Datasets(
+            self.settings.datasets_dir,
+            index_columns=self.settings.datasets_index_columns,
+        )
+
+    def preload(self) -> None:
+        """Hook invoked once before worker processes are forked.
+
+        Strategies can override this to load templates, rules and other
+        read-only state up front, so that forked workers share it in memory
+        (copy-on-write) instead of each loading their own copy.
+
+        Loads the datasets, if configured.
+
+        """
+        if self.datasets is not None:
+            self.datasets.load_all()
+
+    async def startup(self) -> None:
+        """Hook invoked once when the application starts up.
+
+        Strategies can override this to start background tasks or acquire
+        long-lived resources.
+
+        Loads the datasets not loaded yet (e.g. by `preload`), if configured.
+
+        """
+        if self.datasets is not None:
+            await asyncio.to_thread(self.datasets.load_all)
+
+    async def shutdown(self) -> None:
+        """Hook invoked once when the application shuts down.
+
+        Strategies should release anything acquired in `startup` here.
+
+        """
 
     def update_opentelemetry(self, request: Request, *args, **kwargs) -> None:
         """Update the opentelemetry span with strategy-specific attributes.
@@ -25,4 +83,3 @@ class BaseStrategy(ABC):
         When OpenTelemetry is not enabled, this span will exist but will not be reported.
 
         """
-        pass
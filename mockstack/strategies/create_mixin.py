@@ -1,12 +1,13 @@
 """Create mixin class."""
 
 from datetime import datetime, timezone
+from typing import Any
 from uuid import uuid4
 import json
 
 from fastapi import Request, Response, status
 from fastapi.responses import JSONResponse
-from jinja2 import Environment
+from jinja2 import Environment, Template
 
 from mockstack.intent import wants_json
 
@@ -24,15 +25,17 @@ class CreateMixin:
             # We return a 201 CREATED response with the resource as the body,
             # potentially injecting the resource ID into the response.
             resource = await request.json()
+            content = await self._content(
+                resource,
+                request=request,
+                env=env,
+                created_resource_metadata=created_resource_metadata,
+            )
+            await self._on_created(request, content)
 
             return JSONResponse(
                 status_code=status.HTTP_201_CREATED,
-                content=self._content(
-                    resource,
-                    request=request,
-                    env=env,
-                    created_resource_metadata=created_resource_metadata,
-                ),
+                content=content,
             )
         else:
             # We return a 201 CREATED response with an empty body.
@@ -41,7 +44,7 @@ class CreateMixin:
                 content=None,
             )
 
-    def _content(
+    async def _content(
         self,
         resource: dict,
         *,
@@ -56,20 +59,30 @@ class CreateMixin:
         as well as any other metadata fields that are configured for the strategy.
 
         """
+        renderer = self._metadata_renderer(env, created_resource_metadata)
+        return await renderer.render(resource, self._metadata_context(request))
+
+    def _metadata_renderer(
+        self, env: Environment, created_resource_metadata: dict
+    ) -> "MetadataRenderer":
+        """The renderer for the metadata fields, compiled once and then reused."""
+        renderer: MetadataRenderer | None = getattr(
+            self, "_created_resource_metadata_renderer", None
+        )
+        if renderer is None or not renderer.compiled_for(
+            env, created_resource_metadata
+        ):
+            renderer = MetadataRenderer(env, created_resource_metadata)
+            self._created_resource_metadata_renderer = renderer
+
+        return renderer
 
-        def with_metadata(resource: dict, copy=True) -> dict:
-            """Inject metadata fields into the resource."""
-            _resource = resource.copy() if copy else resource
-            for key, value in created_resource_metadata.items():
-                if isinstance(value, str):
-                    _resource[key] = env.from_string(value).render(
-                        self._metadata_context(request)
-                    )
-                else:
-                    _resource[key] = value
-            return _resource
+    async def _on_created(self, request: Request, resource: dict) -> None:
+        """Hook invoked with each resource created from a JSON request.
 
-        return with_metadata(resource)
+        Strategies can override this to e.g. remember created resources.
+
+        """
 
     def _metadata_context(self, request: Request) -> dict:
         """Context for injecting metadata fields into resources.
@@ -89,7 +102,69 @@ class CreateMixin:
     ) -> None:
         """Update the opentelemetry span with the create mixin details."""
         span = request.state.span
+        if not span.is_recording():
+            return
+
         span.set_attribute(
             "mockstack.create_mixin.created_resource_metadata",
             json.dumps(created_resource_metadata),
         )
+
+
+class MetadataRenderer:
+    """Renders the metadata fields injected into created resources.
+
+    String fields are compiled into templates once, rather than on every
+    request, and strings without any template syntax are injected as is.
+    All fields are rendered with a single context per resource.
+
+    """
+
+    def __init__(self, env: Environment, created_resource_metadata: dict):
+        self.env = env
+        self.created_resource_metadata = created_resource_metadata
+
+        # (key, value, template) of each field, in the configured order. The
+        # template is None for fields injected as is.
+        self.fields: list[tuple[str, Any, Template | None]] = [
+            (
+                key,
+                value,
+                env.from_string(value)
+                if isinstance(value, str) and self._is_template(value)
+                else None,
+            )
+            for key, value in created_resource_metadata.items()
+        ]
+
+    def compiled_for(self, env: Environment, created_resource_metadata: dict) -> bool:
+        """Whether this renderer was compiled for the given environment and metadata."""
+        return (
+            self.env is env
+            and self.created_resource_metadata is created_resource_metadata
+        )
+
+    async def render(self, resource: dict, context: dict) -> dict:
+        """A copy of the resource with the metadata fields injected."""
+        _resource = resource.copy()
+        for key, value, template in self.fields:
+            _resource[key] = (
+                value if template is None else await template.render_async(context)
+            )
+        return _resource
+
+    def _is_template(self, value: str) -> bool:
+        """Whether rendering the string could yield anything but the string itself."""
+        delimiters = (
+            self.env.variable_start_string,
+            self.env.block_start_string,
+            self.env.comment_start_string,
+            self.env.line_statement_prefix,
+            self.env.line_comment_prefix,
+        )
+        return (
+            any(delimiter and delimiter in value for delimiter in delimiters)
+            # newlines are normalized, and a trailing one stripped, when rendering.
+            or "\n" in value
+            or "\r" in value
+        )
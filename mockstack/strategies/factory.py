@@ -1,11 +1,19 @@
 """Factory for creating strategies."""
 
+from importlib import import_module
 from typing import Type
 
 from fastapi import FastAPI
 
 from mockstack.config import Settings
-from mockstack.strategies import BaseStrategy
+from mockstack.strategies.base import BaseStrategy
+
+# strategy classes by name, given as import paths so that only the strategy
+# in use is imported.
+STRATEGIES = {
+    "filefixtures": "mockstack.strategies.filefixtures:FileFixturesStrategy",
+    "proxyrules": "mockstack.strategies.proxyrules:ProxyRulesStrategy",
+}
 
 
 def name_for(cls: type[BaseStrategy]) -> str:
@@ -23,19 +31,27 @@ def name_for(cls: type[BaseStrategy]) -> str:
     return getattr(cls, "name", cls.__name__.replace("Strategy", "").lower())
 
 
+def strategy_class_for(name: str) -> Type[BaseStrategy]:
+    """Import the class of the strategy with the given name."""
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {name}")
+
+    module_name, _, class_name = STRATEGIES[name].partition(":")
+    return getattr(import_module(module_name), class_name)
+
+
 def available_strategies() -> dict[str, Type[BaseStrategy]]:
-    """Get all available strategies."""
-    return {name_for(subclass): subclass for subclass in BaseStrategy.__subclasses__()}  # type: ignore[type-abstract]
+    """Get all available strategies.
 
+    Nb. this imports every strategy. Use `strategy_class_for` to import just one.
 
-def strategy_provider(app: FastAPI, settings: Settings) -> BaseStrategy:
-    """Factory for creating strategies."""
-    strategies = available_strategies()
+    """
+    return {name: strategy_class_for(name) for name in STRATEGIES}
 
-    if settings.strategy not in strategies:
-        raise ValueError(f"Unknown strategy: {settings.strategy}")
 
-    strategy = strategies[settings.strategy](settings)
+def strategy_provider(app: FastAPI, settings: Settings) -> BaseStrategy:
+    """Factory for creating strategies."""
+    strategy = strategy_class_for(settings.strategy)(settings)
 
     # add strategy to app state for dependency injection
     app.state.strategy = strategy
@@ -43,6 +59,6 @@ def strategy_provider(app: FastAPI, settings: Settings) -> BaseStrategy:
     return strategy
 
 
-AVAILABLE_STRATEGIES = tuple(available_strategies().keys())
+AVAILABLE_STRATEGIES = tuple(STRATEGIES.keys())
 
 DEFAULT_STRATEGY = "filefixtures"
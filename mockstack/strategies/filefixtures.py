@@ -1,5 +1,6 @@
 """MockStack strategy for using file-based fixtures."""
 
+import asyncio
 import logging
 import os
 from functools import cached_property
@@ -7,7 +8,7 @@ from pathlib import Path
 
 from fastapi import HTTPException, Request, Response, status
 from fastapi.responses import JSONResponse
-from jinja2 import Environment
+from jinja2 import Environment, TemplateSyntaxError
 
 from mockstack.config import Settings
 from mockstack.intent import (
@@ -15,6 +16,14 @@ from mockstack.intent import (
     looks_like_a_search,
     wants_json,
 )
+from mockstack.manifest import ManifestChange, TemplatesManifest
+from mockstack.metrics import request_metrics_for
+from mockstack.store import (
+    RESOURCE_STORE_ROUTE,
+    BaseResourceStore,
+    resource_key_for,
+    resource_store_for,
+)
 from mockstack.strategies.base import BaseStrategy
 from mockstack.strategies.create_mixin import CreateMixin
 from mockstack.templating import (
@@ -36,21 +45,140 @@ class FileFixturesStrategy(BaseStrategy, CreateMixin):
 
         self.templates_dir = Path(settings.templates_dir)
         self.enable_templates_for_post = settings.filefixtures_enable_templates_for_post
+        self.templates_manifest = settings.filefixtures_templates_manifest
+        self.templates_manifest_watch = settings.filefixtures_templates_manifest_watch
+        self.templates_manifest_poll_interval = (
+            settings.filefixtures_templates_manifest_poll_interval
+        )
 
         self.created_resource_metadata = settings.created_resource_metadata
+        self.resource_store_id_field = settings.filefixtures_resource_store_id_field
+        self.resource_store: BaseResourceStore | None = resource_store_for(settings)
+        self.resource_store_compaction_interval = (
+            settings.filefixtures_resource_store_compaction_interval
+        )
         self.missing_resource_fields = settings.missing_resource_fields
+        self.ollama_host = settings.ollama_host
+        self.ollama_max_concurrency = settings.ollama_max_concurrency
+
+        self._manifest_watcher: asyncio.Task | None = None
+        self._resource_store_compactor: asyncio.Task | None = None
 
     def __str__(self) -> str:
         return (
             f"[medium_purple]filefixtures[/medium_purple]\n "
             f"templates_dir: [medium_purple]{self.templates_dir}[/medium_purple].\n "
-            f"enable_templates_for_post: [medium_purple]{self.enable_templates_for_post}[/medium_purple]. "
+            f"enable_templates_for_post: [medium_purple]{self.enable_templates_for_post}[/medium_purple].\n "
+            f"templates_manifest: [medium_purple]{self.templates_manifest}[/medium_purple] "
+            f"(watch: {self.templates_manifest_watch}).\n "
+            f"resource_store: [medium_purple]{self.resource_store is not None}[/medium_purple]. "
         )
 
     @cached_property
     def env(self) -> Environment:
-        """Jinja2 environment for the filefixtures strategy."""
-        return templates_env_provider(self.templates_dir)
+        """Jinja2 environment for the filefixtures strategy.
+
+        When the templates manifest is enabled, we disable Jinja2's own
+        modification checks and invalidate its cache from manifest changes instead.
+
+        """
+        return templates_env_provider(
+            self.templates_dir,
+            auto_reload=not self.templates_manifest,
+            ollama_host=self.ollama_host,
+            ollama_max_concurrency=self.ollama_max_concurrency,
+            ollama_cache=self.ollama_cache,
+            datasets=self.datasets,
+        )
+
+    @cached_property
+    def manifest(self) -> TemplatesManifest:
+        """In-memory manifest of the available templates."""
+        manifest = TemplatesManifest(self.templates_dir)
+        manifest.build()
+        return manifest
+
+    def preload(self) -> None:
+        """Build the templates manifest and compile all templates."""
+        super().preload()
+
+        if self.templates_manifest:
+            _ = self.manifest
+
+        for name in self.env.list_templates(extensions=["j2"]):
+            try:
+                self.env.get_template(name)
+            except TemplateSyntaxError:
+                # reported again when the template is used, as it would be
+                # without preloading.
+                self.logger.exception("Failed to compile template %s", name)
+
+    async def startup(self) -> None:
+        """Build the templates manifest and start watching for changes.
+
+        Also starts compacting the resource store periodically, if enabled.
+
+        """
+        await super().startup()
+
+        if self.resource_store is not None:
+            self._resource_store_compactor = asyncio.create_task(
+                self._compact_resource_store(self.resource_store)
+            )
+
+        if not self.templates_manifest:
+            return
+
+        await asyncio.to_thread(lambda: self.manifest)
+
+        self._manifest_watcher = asyncio.create_task(
+            self.manifest.watch(
+                mode=self.templates_manifest_watch,
+                poll_interval=self.templates_manifest_poll_interval,
+                on_change=self._on_manifest_change,
+            )
+        )
+
+    async def shutdown(self) -> None:
+        """Stop watching the templates directory and close the resource store."""
+        for task in (self._manifest_watcher, self._resource_store_compactor):
+            if task is None:
+                continue
+
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._manifest_watcher = None
+        self._resource_store_compactor = None
+
+        if self.resource_store is not None:
+            await self.resource_store.close()
+
+    async def _compact_resource_store(self, resource_store: BaseResourceStore) -> None:
+        """Compact the resource store every compaction interval."""
+        while True:
+            await asyncio.sleep(self.resource_store_compaction_interval)
+            try:
+                await resource_store.compact()
+            except Exception:
+                self.logger.exception("Failed to compact the resource store")
+
+    def _on_manifest_change(self, changes: list[tuple[ManifestChange, str]]) -> None:
+        """Invalidate compiled templates that changed on disk."""
+        if self.env.cache is None:
+            return
+
+        if any(change != ManifestChange.ADDED for change, _ in changes):
+            self.env.cache.clear()
+
+    def template_exists(self, name: str) -> bool:
+        """Check whether a template with the given name exists."""
+        if self.templates_manifest:
+            return name in self.manifest
+
+        return os.path.exists(self.templates_dir / name)
 
     async def apply(self, request: Request) -> Response:
         match request.method:
@@ -83,7 +211,9 @@ class FileFixturesStrategy(BaseStrategy, CreateMixin):
         request_json = (await request.json()) if wants_json(request) else None
         if self.enable_templates_for_post:
             try:
-                return self._response_from_template(request, request_json=request_json)
+                return await self._response_from_template(
+                    request, request_json=request_json
+                )
             except HTTPException as e:
                 if e.status_code == status.HTTP_404_NOT_FOUND:
                     # If the template is not found, we try to create the resource with logic below.
@@ -93,11 +223,13 @@ class FileFixturesStrategy(BaseStrategy, CreateMixin):
 
         if looks_like_a_search(request):
             # Searching for resources with a complex query that cannot be expressed in a URI.
-            return self._response_from_template(request, request_json=request_json)
+            return await self._response_from_template(
+                request, request_json=request_json
+            )
         elif looks_like_a_command(request):
             # Executing a 'command' of some sort, like a workflow or a batch job.
             # We return a 201 CREATED status code with response from template.
-            return self._response_from_template(
+            return await self._response_from_template(
                 request, request_json=request_json, status_code=status.HTTP_201_CREATED
             )
         else:
@@ -124,22 +256,99 @@ class FileFixturesStrategy(BaseStrategy, CreateMixin):
         If we find one, we render it and return the response.
         If we don't find one, we raise a 404 error.
 
+        With the resource store enabled, stored resources and collections are
+        served from the store instead.
+
         """
-        return self._response_from_template(request)
+        if self.resource_store is not None:
+            collection, resource_id = resource_key_for(request.url.path)
+            if resource_id is not None:
+                resource = await self.resource_store.get(collection, resource_id)
+                if resource is not None:
+                    return self._response_from_store(request, resource)
+            elif await self.resource_store.contains(collection):
+                filters = {
+                    field: value
+                    for field, value in request.query_params.items()
+                    if field in self.resource_store.indexed_fields
+                }
+                return self._response_from_store(
+                    request, await self.resource_store.list(collection, filters)
+                )
+
+        return await self._response_from_template(request)
 
     async def _delete(self, request: Request) -> Response:
         """Apply the strategy for DELETE requests."""
+        if self.resource_store is not None:
+            collection, resource_id = resource_key_for(request.url.path)
+            if resource_id is not None:
+                await self.resource_store.delete(collection, resource_id)
+
         return Response(status_code=status.HTTP_204_NO_CONTENT)
 
     async def _patch(self, request: Request) -> Response:
-        """Apply the strategy for PATCH requests."""
-        return Response(status_code=status.HTTP_204_NO_CONTENT)
+        """Apply the strategy for PATCH requests.
+
+        Stored resources are updated with the fields of the request resource.
+
+        """
+        return await self._update(request, merge=True)
 
     async def _put(self, request: Request) -> Response:
-        """Apply the strategy for PUT requests."""
-        return Response(status_code=status.HTTP_204_NO_CONTENT)
+        """Apply the strategy for PUT requests.
+
+        Stored resources are replaced by the request resource.
+
+        """
+        return await self._update(request, merge=False)
+
+    async def _update(self, request: Request, *, merge: bool) -> Response:
+        """Update a stored resource, if any, from a JSON request."""
+        if self.resource_store is None or not wants_json(request):
+            return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+        collection, resource_id = resource_key_for(request.url.path)
+        if resource_id is None:
+            return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+        stored = await self.resource_store.get(collection, resource_id)
+        request_resource = await request.json()
+        if stored is None or not isinstance(request_resource, dict):
+            return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+        resource = {**stored, **request_resource} if merge else request_resource
+        # the identifier is given by the path, and cannot be changed.
+        resource[self.resource_store_id_field] = stored.get(
+            self.resource_store_id_field, resource_id
+        )
+        await self.resource_store.put(collection, resource_id, resource)
+
+        return self._response_from_store(request, resource)
+
+    async def _on_created(self, request: Request, resource: dict) -> None:
+        """Remember the created resource, if the resource store is enabled."""
+        if self.resource_store is None:
+            return
 
-    def _response_from_template(
+        resource_id = resource.get(self.resource_store_id_field)
+        collection, parent_id = resource_key_for(request.url.path)
+        if resource_id is None or parent_id is not None:
+            # only resources created in a collection can be addressed by id.
+            return
+
+        await self.resource_store.put(collection, str(resource_id), resource)
+
+    def _response_from_store(
+        self, request: Request, content: dict | list[dict]
+    ) -> Response:
+        """Respond with a stored resource, or a listing of a stored collection."""
+        if (request_metrics := request_metrics_for(request.scope)) is not None:
+            request_metrics.route = RESOURCE_STORE_ROUTE
+
+        return JSONResponse(content=content)
+
+    async def _response_from_template(
         self,
         request: Request,
         *,
@@ -149,22 +358,28 @@ class FileFixturesStrategy(BaseStrategy, CreateMixin):
         for template_args in iter_possible_template_arguments(
             request, request_json=request_json
         ):
-            filename = self.templates_dir / template_args["name"]
-            self.logger.debug("Looking for template filename: %s", filename)
-            if not os.path.exists(filename):
+            name = template_args["name"]
+            self.logger.debug("Looking for template filename: %s", name)
+            if not self.template_exists(name):
                 continue
 
-            self.logger.debug("Found template filename: %s", filename)
+            self.logger.debug("Found template filename: %s", name)
             self.update_opentelemetry(request, template_args)
+            if (request_metrics := request_metrics_for(request.scope)) is not None:
+                request_metrics.route = name
+                request_metrics.template_hit = True
             template = self.env.get_template(template_args["name"])
 
             return Response(
-                template.render(**template_args["context"]),
+                await template.render_async(**template_args["context"]),
                 media_type=template_args["media_type"],
                 status_code=status_code,
             )
 
         # if we get here, we have no template to render.
+        if (request_metrics := request_metrics_for(request.scope)) is not None:
+            request_metrics.template_hit = False
+
         return JSONResponse(
             content=self.missing_resource_fields,
             status_code=status.HTTP_404_NOT_FOUND,
@@ -173,6 +388,8 @@ class FileFixturesStrategy(BaseStrategy, CreateMixin):
     def update_opentelemetry(self, request: Request, template_args: dict) -> None:
         """Update the opentelemetry span with the file fixtures details."""
         span = request.state.span
+        if not span.is_recording():
+            return
 
         span.set_attribute(
             "mockstack.filefixtures.template_name", template_args["name"]
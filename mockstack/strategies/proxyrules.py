@@ -1,6 +1,9 @@
 """Strategy for using proxy rules."""
 
+import asyncio
 import logging
+import re
+import time
 from functools import cached_property
 from pathlib import Path
 from urllib.parse import urlparse
@@ -8,15 +11,31 @@ from urllib.parse import urlparse
 import httpx
 import yaml
 from fastapi import Request, Response, status
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 from httpx import Headers as ResponseHeaders
 from jinja2 import Environment
-from starlette.datastructures import Headers
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers, MutableHeaders
 
 from mockstack.config import Settings
-from mockstack.constants import CONTENT_ENCODING_COMPRESSED, ProxyRulesRedirectVia
+from mockstack.constants import (
+    CONTENT_ENCODING_COMPRESSED,
+    HOP_BY_HOP_HEADERS,
+    SAFE_METHODS,
+    ProxyRulesRedirectVia,
+)
+from mockstack.httpcache import (
+    CACHE_STATUS_HEADER,
+    CachedResponse,
+    HttpCache,
+    is_storable,
+    parse_cache_control,
+)
 from mockstack.intent import looks_like_a_create
-from mockstack.rules import Rule, TemplateRuleResult, URLRuleResult
+from mockstack.metrics import request_metrics_for
+from mockstack.recording import TemplateRecorder
+from mockstack.rules import Rule, RuleMatcher, TemplateRuleResult, URLRuleResult
+from mockstack.singleflight import SingleFlight
 from mockstack.strategies.base import BaseStrategy
 from mockstack.strategies.create_mixin import CreateMixin
 from mockstack.templating import templates_env_provider
@@ -40,6 +59,28 @@ def maybe_update_response_headers(
     return _headers
 
 
+def without_hop_by_hop_headers(response_headers: ResponseHeaders) -> ResponseHeaders:
+    """Remove hop-by-hop headers which must not be forwarded by a proxy."""
+    _headers = response_headers.copy()
+
+    for header in HOP_BY_HOP_HEADERS:
+        if header in _headers:
+            del _headers[header]
+
+    return _headers
+
+
+def has_request_body(headers: Headers) -> bool:
+    """Whether a request comes with a body, according to its headers."""
+    if "transfer-encoding" in headers:
+        return True
+
+    try:
+        return int(headers.get("content-length", 0)) > 0
+    except ValueError:
+        return False
+
+
 class ProxyRulesStrategy(BaseStrategy, CreateMixin):
     """Strategy for using proxy rules."""
 
@@ -49,8 +90,33 @@ class ProxyRulesStrategy(BaseStrategy, CreateMixin):
         super().__init__(settings, *args, **kwargs)
         self.created_resource_metadata = settings.created_resource_metadata
         self.missing_resource_fields = settings.missing_resource_fields
+        self.ollama_host = settings.ollama_host
+        self.ollama_max_concurrency = settings.ollama_max_concurrency
         self.redirect_via = settings.proxyrules_redirect_via
         self.reverse_proxy_timeout = settings.proxyrules_reverse_proxy_timeout
+        self.reverse_proxy_max_connections = (
+            settings.proxyrules_reverse_proxy_max_connections
+        )
+        self.reverse_proxy_max_keepalive_connections = (
+            settings.proxyrules_reverse_proxy_max_keepalive_connections
+        )
+        self.reverse_proxy_keepalive_expiry = (
+            settings.proxyrules_reverse_proxy_keepalive_expiry
+        )
+        self.reverse_proxy_http2 = settings.proxyrules_reverse_proxy_http2
+        self.reverse_proxy_streaming = settings.proxyrules_reverse_proxy_streaming
+        self.record_templates = settings.proxyrules_record_templates
+        self.templates_dir = settings.templates_dir
+        self.cache_enabled = settings.proxyrules_cache_enabled
+        self.cache_max_bytes = settings.proxyrules_cache_max_bytes
+        self.cache_dir = settings.proxyrules_cache_dir
+        self.cache_dir_max_bytes = settings.proxyrules_cache_dir_max_bytes
+        self.coalesce_requests = settings.proxyrules_coalesce_requests
+        self.coalesce_headers = [
+            h.lower() for h in settings.proxyrules_coalesce_headers
+        ]
+
+        self._revalidations: dict[str, asyncio.Task] = {}
         self.rules_filename = settings.proxyrules_rules_filename
         self.simulate_create_on_missing = settings.proxyrules_simulate_create_on_missing
         self.verify_ssl_certificates = settings.proxyrules_verify_ssl_certificates
@@ -63,12 +129,87 @@ class ProxyRulesStrategy(BaseStrategy, CreateMixin):
             f"simulate_create_on_missing: {self.simulate_create_on_missing}.\n "
             f"reverse_proxy_timeout: {self.reverse_proxy_timeout}\n "
             f"verify_ssl_certificates: {self.verify_ssl_certificates}\n "
+            f"max_connections: {self.reverse_proxy_max_connections}, "
+            f"max_keepalive_connections: {self.reverse_proxy_max_keepalive_connections}, "
+            f"keepalive_expiry: {self.reverse_proxy_keepalive_expiry}, "
+            f"http2: {self.reverse_proxy_http2}, "
+            f"streaming: {self.reverse_proxy_streaming}\n "
+            f"record_templates: {self.record_templates} "
+            f"(templates_dir: {self.templates_dir})\n "
+            f"cache_enabled: {self.cache_enabled} "
+            f"(max_bytes: {self.cache_max_bytes}, dir: {self.cache_dir})\n "
+            f"coalesce_requests: {self.coalesce_requests}\n "
         )
 
     @cached_property
     def env(self) -> Environment:
         """Jinja2 environment for the proxy rules strategy."""
-        return templates_env_provider()
+        return templates_env_provider(
+            ollama_host=self.ollama_host,
+            ollama_max_concurrency=self.ollama_max_concurrency,
+            ollama_cache=self.ollama_cache,
+            datasets=self.datasets,
+        )
+
+    @cached_property
+    def client(self) -> httpx.AsyncClient:
+        """Long-lived HTTP client used for reverse proxying.
+
+        The client is shared by all requests so that upstream connections
+        are pooled and kept alive. It is closed when the app shuts down.
+
+        """
+        return httpx.AsyncClient(
+            timeout=self.reverse_proxy_timeout,
+            verify=self.verify_ssl_certificates,
+            http2=self.reverse_proxy_http2,
+            limits=httpx.Limits(
+                max_connections=self.reverse_proxy_max_connections,
+                max_keepalive_connections=self.reverse_proxy_max_keepalive_connections,
+                keepalive_expiry=self.reverse_proxy_keepalive_expiry,
+            ),
+        )
+
+    def preload(self) -> None:
+        """Load and compile the rules."""
+        super().preload()
+
+        _ = self.matcher
+
+    async def shutdown(self) -> None:
+        """Close the reverse proxy client, if it was ever created."""
+        for task in list(self._revalidations.values()):
+            task.cancel()
+        self.inflight.cancel()
+
+        if "client" in self.__dict__:
+            await self.client.aclose()
+            del self.client
+
+    @cached_property
+    def cache(self) -> HttpCache | None:
+        """HTTP cache for reverse proxied GET requests, when enabled."""
+        if not self.cache_enabled:
+            return None
+
+        return HttpCache(
+            max_bytes=self.cache_max_bytes,
+            directory=self.cache_dir,
+            directory_max_bytes=self.cache_dir_max_bytes,
+        )
+
+    @cached_property
+    def inflight(self) -> SingleFlight[tuple[httpx.Response, bytes]]:
+        """Upstream calls in flight, for coalescing identical requests."""
+        return SingleFlight()
+
+    @cached_property
+    def recorder(self) -> TemplateRecorder:
+        """Recorder for writing proxied responses as templates."""
+        if self.templates_dir is None:
+            raise ValueError("templates_dir is not set")
+
+        return TemplateRecorder(self.templates_dir)
 
     @cached_property
     def rules(self) -> list[Rule]:
@@ -82,20 +223,31 @@ class ProxyRulesStrategy(BaseStrategy, CreateMixin):
             data = yaml.safe_load(file)
             return [Rule.from_dict(rule) for rule in data["rules"]]
 
+    @cached_property
+    def matcher(self) -> RuleMatcher:
+        """Compiled matcher over the loaded rules."""
+        return RuleMatcher(self.rules)
+
     def rule_for(self, request: Request) -> Rule | None:
-        try:
-            return next(rule for rule in self.rules if rule.matches(request))
-        except StopIteration:
-            return None
+        """Find the first rule matching the request, in rules file order."""
+        return self.matcher.rule_for(request)
+
+    def match_for(self, request: Request) -> tuple[Rule, re.Match] | None:
+        """Find the first rule matching the request, along with its match object."""
+        return self.matcher.match_for(request)
 
     async def apply(self, request: Request) -> Response:
-        rule = self.rule_for(request)
-        if rule is None:
+        found = self.match_for(request)
+        if found is None:
             return await self.handle_missing_rule(request)
 
-        result = rule.apply(request)
+        rule, match = found
+        result = rule.apply(request, match)
         self.logger.info(f"[rule:{rule.name}] Result: {result}")
 
+        if (request_metrics := request_metrics_for(request.scope)) is not None:
+            request_metrics.route = rule.name or rule.pattern
+
         # Handle template results
         if isinstance(result, TemplateRuleResult):
             return await self.handle_template_result(request, rule, result)
@@ -155,6 +307,10 @@ class ProxyRulesStrategy(BaseStrategy, CreateMixin):
         """Handle template results by rendering the template file."""
         template_path = Path(result.template_path)
 
+        request_metrics = request_metrics_for(request.scope)
+        if request_metrics is not None:
+            request_metrics.template_hit = template_path.exists()
+
         if not template_path.exists():
             self.logger.error(f"Template file not found: {template_path}")
             return JSONResponse(
@@ -171,7 +327,7 @@ class ProxyRulesStrategy(BaseStrategy, CreateMixin):
             template = self.env.from_string(template_content)
 
             # Render the template with context
-            rendered_content = template.render(**result.template_context)
+            rendered_content = await template.render_async(**result.template_context)
 
             # Determine content type based on file extension
             content_type = self._get_content_type(template_path)
@@ -196,35 +352,301 @@ class ProxyRulesStrategy(BaseStrategy, CreateMixin):
 
     async def reverse_proxy(self, request: Request, url: str) -> Response:
         """Reverse proxy the request to the target URL."""
-        async with httpx.AsyncClient(
-            timeout=self.reverse_proxy_timeout, verify=self.verify_ssl_certificates
-        ) as client:
-            request_content = await request.body()
-            request_headers = self.reverse_proxy_headers(request.headers, url=url)
-            req = client.build_request(
+        if self.reverse_proxy_streaming:
+            return await self.streaming_reverse_proxy(request, url)
+
+        if self.cache is not None and request.method == "GET":
+            return await self.cached_reverse_proxy(request, url)
+
+        start_time = time.perf_counter()
+        resp, content = await self.send_upstream(
+            request.method,
+            url,
+            headers=self.reverse_proxy_headers(request.headers, url=url),
+            params=request.url.query,
+            content=await request.body(),
+        )
+        self.record_upstream_metrics(request, resp, time.perf_counter() - start_time)
+
+        return self.response_from_upstream(request, resp, content)
+
+    async def send_upstream(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Headers,
+        params: str,
+        content: bytes | None = None,
+    ) -> tuple[httpx.Response, bytes]:
+        """Send a request upstream and read the full response body.
+
+        When request coalescing is enabled, identical concurrent requests with
+        a safe method and no body share a single upstream call. The returned
+        response and body are then shared between callers, and must not be
+        mutated.
+
+        """
+        if self.should_coalesce(method, content):
+            key = self.coalesce_key(method, url, headers=headers, params=params)
+            return await self.inflight.do(
+                key,
+                lambda: self._send_upstream(
+                    method, url, headers=headers, params=params, content=content
+                ),
+            )
+
+        return await self._send_upstream(
+            method, url, headers=headers, params=params, content=content
+        )
+
+    async def _send_upstream(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Headers,
+        params: str,
+        content: bytes | None = None,
+    ) -> tuple[httpx.Response, bytes]:
+        req = self.client.build_request(
+            method,
+            url,
+            content=content,
+            headers=headers,
+            params=params,
+        )
+
+        resp = await self.client.send(req, stream=False)
+        return resp, resp.read()
+
+    def should_coalesce(self, method: str, content: bytes | None) -> bool:
+        """Whether an upstream request may share a call with identical requests."""
+        return self.coalesce_requests and method in SAFE_METHODS and not content
+
+    def coalesce_key(
+        self, method: str, url: str, *, headers: Headers, params: str
+    ) -> tuple[str, ...]:
+        """Key identifying requests which can share a single upstream call."""
+        return (
+            method,
+            url,
+            params,
+            *(headers.get(name, "") for name in self.coalesce_headers),
+        )
+
+    def response_from_upstream(
+        self, request: Request, resp: httpx.Response, content: bytes
+    ) -> Response:
+        """Build the response to return to the client from an upstream response."""
+        response_headers = maybe_update_response_headers(
+            resp.headers,
+            content_length=len(content),
+        )
+
+        response = Response(
+            content=content,
+            status_code=resp.status_code,
+            headers=response_headers,
+            media_type=response_headers.get("content-type"),
+        )
+
+        if self.record_templates and self.should_record(request, resp):
+            # recording happens off the request path, once the response is sent.
+            response.background = BackgroundTask(
+                self.recorder.record, request.url.path, content
+            )
+
+        return response
+
+    def record_upstream_metrics(
+        self, request: Request, resp: httpx.Response, duration: float
+    ) -> None:
+        """Report the status and duration of an upstream call for metrics."""
+        request_metrics = request_metrics_for(request.scope)
+        if request_metrics is not None:
+            request_metrics.upstream_status_code = resp.status_code
+            request_metrics.upstream_duration = duration
+
+    def should_record(self, request: Request, resp: httpx.Response) -> bool:
+        """Whether an upstream response should be recorded as a template."""
+        return request.method == "GET" and resp.is_success
+
+    async def cached_reverse_proxy(self, request: Request, url: str) -> Response:
+        """Reverse proxy a GET request through the HTTP cache.
+
+        Fresh cached responses are served directly. Stale responses are either
+        served while being revalidated in the background (stale-while-revalidate)
+        or revalidated with a conditional request before being served.
+
+        """
+        assert self.cache is not None
+
+        request_cache_control = parse_cache_control(
+            request.headers.get("cache-control")
+        )
+        if "no-store" in request_cache_control:
+            start_time = time.perf_counter()
+            resp, content = await self.send_upstream(
                 request.method,
                 url,
-                content=request_content,
-                headers=request_headers,
+                headers=self.reverse_proxy_headers(request.headers, url=url),
                 params=request.url.query,
             )
+            self.record_upstream_metrics(
+                request, resp, time.perf_counter() - start_time
+            )
+            return self.response_from_upstream(request, resp, content)
 
-            resp = await client.send(req, stream=False)
-            content = resp.read()
+        cache_url = f"{url}?{request.url.query}" if request.url.query else url
+        cached = await self.cache.get(request.method, cache_url, request.headers)
 
-            response_headers = maybe_update_response_headers(
-                resp.headers,
-                content_length=len(content),
-            )
+        now = time.time()
+        must_revalidate = "no-cache" in request_cache_control or (
+            request_cache_control.get("max-age") == "0"
+        )
+        if cached is not None and not must_revalidate:
+            if cached.is_fresh(now):
+                return self.response_from_cache(cached, now, cache_status="HIT")
 
-            return Response(
-                content=content,
-                status_code=resp.status_code,
-                headers=response_headers,
-                media_type=response_headers.get("content-type"),
+            if cached.can_serve_stale(now):
+                self.revalidate_in_background(request, url, cache_url, cached)
+                return self.response_from_cache(cached, now, cache_status="STALE")
+
+        headers = self.reverse_proxy_headers(request.headers, url=url)
+        if cached is not None:
+            headers.update(cached.validators())
+
+        start_time = time.perf_counter()
+        resp, content = await self.send_upstream(
+            request.method, url, headers=headers, params=request.url.query
+        )
+        self.record_upstream_metrics(request, resp, time.perf_counter() - start_time)
+
+        if cached is not None and resp.status_code == status.HTTP_304_NOT_MODIFIED:
+            cached = cached.revalidated(resp.headers.multi_items(), now)
+            await self.cache.set(request.method, cache_url, request.headers, cached)
+            return self.response_from_cache(cached, now, cache_status="REVALIDATED")
+
+        response = self.response_from_upstream(request, resp, content)
+        if is_storable(request.headers, response.status_code, response.headers):
+            await self.cache.set(
+                request.method,
+                cache_url,
+                request.headers,
+                CachedResponse(
+                    status_code=response.status_code,
+                    headers=response.headers.items(),
+                    content=content,
+                    stored_at=now,
+                ),
             )
+        response.headers[CACHE_STATUS_HEADER] = "MISS"
+
+        return response
 
-    def reverse_proxy_headers(self, headers: Headers, url: str) -> Headers:
+    def response_from_cache(
+        self, cached: CachedResponse, now: float, *, cache_status: str
+    ) -> Response:
+        """Build the response to return to the client from a cached response."""
+        response = Response(
+            content=cached.content,
+            status_code=cached.status_code,
+            headers=Headers(
+                raw=[
+                    (k.lower().encode("latin-1"), v.encode("latin-1"))
+                    for k, v in cached.headers
+                    if k.lower() not in HOP_BY_HOP_HEADERS
+                ]
+            ),
+        )
+        response.headers["age"] = str(int(cached.age(now)))
+        response.headers[CACHE_STATUS_HEADER] = cache_status
+        return response
+
+    def revalidate_in_background(
+        self, request: Request, url: str, cache_url: str, cached: CachedResponse
+    ) -> None:
+        """Revalidate a stale cached response without blocking the request."""
+        assert self.cache is not None
+        cache = self.cache
+
+        if cache_url in self._revalidations:
+            return
+
+        method = request.method
+        request_headers = request.headers
+        headers = self.reverse_proxy_headers(request_headers, url=url)
+        headers.update(cached.validators())
+        params = request.url.query
+
+        async def revalidate() -> None:
+            try:
+                resp, content = await self.send_upstream(
+                    method, url, headers=headers, params=params
+                )
+                now = time.time()
+                if resp.status_code == status.HTTP_304_NOT_MODIFIED:
+                    revalidated = cached.revalidated(resp.headers.multi_items(), now)
+                else:
+                    response_headers = maybe_update_response_headers(
+                        resp.headers, content_length=len(content)
+                    )
+                    if not is_storable(
+                        request_headers, resp.status_code, response_headers
+                    ):
+                        return
+                    revalidated = CachedResponse(
+                        status_code=resp.status_code,
+                        headers=list(response_headers.items()),
+                        content=content,
+                        stored_at=now,
+                    )
+                await cache.set(method, cache_url, request_headers, revalidated)
+            except Exception:
+                self.logger.exception("Failed to revalidate %s", url)
+
+        task = asyncio.create_task(revalidate())
+        self._revalidations[cache_url] = task
+        task.add_done_callback(lambda _: self._revalidations.pop(cache_url, None))
+
+    async def streaming_reverse_proxy(self, request: Request, url: str) -> Response:
+        """Reverse proxy the request to the target URL without buffering bodies.
+
+        The incoming request body is piped to the upstream request as it arrives,
+        and the upstream response body is relayed to the client chunk by chunk.
+        Raw (undecoded) bytes are relayed, so upstream content-encoding and
+        content-length headers remain valid.
+
+        Requests without a body are sent without one, rather than as an empty
+        chunked body. Reads are not timed out, as streams such as server-sent
+        events can stay idle for long.
+
+        """
+        request_headers = self.reverse_proxy_headers(request.headers, url=url)
+        req = self.client.build_request(
+            request.method,
+            url,
+            content=request.stream() if has_request_body(request.headers) else None,
+            headers=request_headers,
+            params=request.url.query,
+            timeout=httpx.Timeout(self.reverse_proxy_timeout, read=None),
+        )
+
+        start_time = time.perf_counter()
+        resp = await self.client.send(req, stream=True)
+        # the body is still being streamed, so this measures time to first byte.
+        self.record_upstream_metrics(request, resp, time.perf_counter() - start_time)
+
+        return StreamingResponse(
+            resp.aiter_raw(),
+            status_code=resp.status_code,
+            headers=without_hop_by_hop_headers(resp.headers),
+            media_type=resp.headers.get("content-type"),
+            background=BackgroundTask(resp.aclose),
+        )
+
+    def reverse_proxy_headers(self, headers: Headers, url: str) -> MutableHeaders:
         """Mutate the request headers for the reverse proxy mode."""
         _headers = headers.mutablecopy()
 
@@ -251,24 +673,38 @@ class ProxyRulesStrategy(BaseStrategy, CreateMixin):
     ) -> None:
         """Update the opentelemetry span with template-specific details."""
         span = request.state.span
-        if rule.name is not None:
-            span.set_attribute("mockstack.proxyrules.rule_name", rule.name)
-        if rule.method is not None:
-            span.set_attribute("mockstack.proxyrules.rule_method", rule.method)
-
-        span.set_attribute("mockstack.proxyrules.rule_pattern", rule.pattern)
-        span.set_attribute("mockstack.proxyrules.rule_replacement", rule.replacement)
-        span.set_attribute("mockstack.proxyrules.template_path", result.template_path)
-        span.set_attribute("mockstack.proxyrules.result_type", "template")
+        if not span.is_recording():
+            return
+
+        span.set_attributes(
+            {
+                **self._rule_attributes(rule),
+                "mockstack.proxyrules.template_path": result.template_path,
+                "mockstack.proxyrules.result_type": "template",
+            }
+        )
 
     def update_opentelemetry(self, request: Request, rule: Rule, url: str) -> None:
         """Update the opentelemetry span with the proxy rules rule details."""
         span = request.state.span
+        if not span.is_recording():
+            return
+
+        span.set_attributes(
+            {
+                **self._rule_attributes(rule),
+                "mockstack.proxyrules.rewritten_url": url,
+            }
+        )
+
+    def _rule_attributes(self, rule: Rule) -> dict[str, str]:
+        """Span attributes describing a rule."""
+        attributes = {
+            "mockstack.proxyrules.rule_pattern": rule.pattern,
+            "mockstack.proxyrules.rule_replacement": rule.replacement,
+        }
         if rule.name is not None:
-            span.set_attribute("mockstack.proxyrules.rule_name", rule.name)
+            attributes["mockstack.proxyrules.rule_name"] = rule.name
         if rule.method is not None:
-            span.set_attribute("mockstack.proxyrules.rule_method", rule.method)
-
-        span.set_attribute("mockstack.proxyrules.rule_pattern", rule.pattern)
-        span.set_attribute("mockstack.proxyrules.rule_replacement", rule.replacement)
-        span.set_attribute("mockstack.proxyrules.rewritten_url", url)
+            attributes["mockstack.proxyrules.rule_method"] = rule.method
+        return attributes
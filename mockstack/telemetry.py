@@ -1,18 +1,19 @@
 """OpenTelemetry integration."""
 
 from importlib import metadata
-from typing import List, Tuple
+from typing import TYPE_CHECKING, AbstractSet
 
 from fastapi import FastAPI, Request
 from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.trace import Span
-from starlette.responses import StreamingResponse, Response
+from opentelemetry.util.types import AttributeValue
+from starlette.datastructures import Headers
 
-from mockstack.config import Settings
+from mockstack.config import OpenTelemetrySettings, Settings
+from mockstack.constants import OpenTelemetryExporterProtocol
+
+if TYPE_CHECKING:
+    from opentelemetry.sdk.trace.export import SpanExporter
 
 
 def span_name_for(request: Request) -> str:
@@ -21,97 +22,158 @@ def span_name_for(request: Request) -> str:
 
 
 def with_request_attributes(
-    request: Request, span: Span, *, sensitive_headers: List[str] = []
+    request: Request,
+    span: Span,
+    *,
+    sensitive_headers: AbstractSet[str] = frozenset(),
 ) -> Span:
-    """Add request attributes to the span."""
-    span.set_attribute("http.method", request.method)
-    span.set_attribute("http.url", str(request.url))
-    span.set_attribute("http.scheme", request.url.scheme)
-    if request.url.hostname:
-        span.set_attribute("http.host", request.url.hostname)
-    span.set_attribute("http.target", request.url.path)
-    if request.url.port:
-        span.set_attribute("http.server_port", request.url.port)
+    """Add request attributes to the span.
+
+    Attributes are collected first and set with a single call, since each call
+    to the span acquires its lock. `sensitive_headers` must be lowercase.
+
+    """
+    url = request.url
+    attributes: dict[str, AttributeValue] = {
+        "http.method": request.method,
+        "http.url": str(url),
+        "http.scheme": url.scheme,
+        "http.target": url.path,
+    }
+    if url.hostname:
+        attributes["http.host"] = url.hostname
+    if url.port:
+        attributes["http.server_port"] = url.port
 
     # Client information
     if request.client:
-        span.set_attribute("net.peer.ip", request.client.host)
+        attributes["net.peer.ip"] = request.client.host
         if request.client.port:
-            span.set_attribute("net.peer.port", request.client.port)
+            attributes["net.peer.port"] = request.client.port
 
-    # Request headers (excluding sensitive headers)
+    # Request headers (excluding sensitive headers). Header names in the raw
+    # ASGI scope are already lowercase.
     for header_name, header_value in request.headers.items():
-        if header_name.lower() not in sensitive_headers:
-            span.set_attribute(
-                f"http.request.header.{header_name.lower()}", header_value
-            )
+        if header_name not in sensitive_headers:
+            attributes[f"http.request.header.{header_name}"] = header_value
 
     # Query parameters
-    if request.query_params:
-        for param_name, param_value in request.query_params.items():
-            span.set_attribute(f"http.request.query.{param_name}", param_value)
+    for param_name, param_value in request.query_params.items():
+        attributes[f"http.request.query.{param_name}"] = param_value
 
+    span.set_attributes(attributes)
     return span
 
 
 def with_response_attributes(
-    response: Response, span: Span, *, sensitive_headers: List[str] = []
+    status_code: int,
+    headers: Headers,
+    span: Span,
+    *,
+    sensitive_headers: AbstractSet[str] = frozenset(),
 ) -> Span:
-    """Add response attributes to the span."""
-    # Response attributes
-    span.set_attribute("http.status_code", response.status_code)
-    span.set_attribute(
-        "http.response_content_length", response.headers.get("content-length", 0)
-    )
+    """Add response attributes to the span.
 
-    # Response headers
-    for header_name, header_value in response.headers.items():
-        if header_name.lower() not in sensitive_headers:
-            span.set_attribute(
-                f"http.response.header.{header_name.lower()}", header_value
-            )
+    `sensitive_headers` must be lowercase.
 
+    """
+    attributes: dict[str, AttributeValue] = {
+        "http.status_code": status_code,
+        "http.response_content_length": headers.get("content-length", 0),
+    }
+
+    # Response headers (excluding sensitive headers)
+    for header_name, header_value in headers.items():
+        if header_name not in sensitive_headers:
+            attributes[f"http.response.header.{header_name}"] = header_value
+
+    span.set_attributes(attributes)
     return span
 
 
-async def with_response_body(
-    response: StreamingResponse, span: Span
-) -> Tuple[Response, Span]:
-    """Add the response body to the span."""
-    body = await extract_body(response)
+# content types whose captured body is recorded as text.
+TEXTUAL_CONTENT_TYPES = (
+    "text/",
+    "application/json",
+    "application/xml",
+    "application/javascript",
+    "application/x-www-form-urlencoded",
+    "application/x-yaml",
+)
+
+
+class ResponseBodyCapture:
+    """Captures the beginning of a response body as it is sent.
+
+    At most `max_bytes` are kept, in a buffer allocated once up front (sized to
+    the content length when known), so capturing never holds more than that
+    regardless of the size of the response. The total size is still counted,
+    so truncation can be reported.
+
+    """
+
+    def __init__(self, max_bytes: int, *, content_length: int | None = None):
+        size = max_bytes if content_length is None else min(max_bytes, content_length)
+        self.buffer = bytearray(size)
+        self.length = 0
+        self.size = 0
+
+    @property
+    def truncated(self) -> bool:
+        return self.size > self.length
+
+    def write(self, chunk: bytes) -> None:
+        """Capture the part of a body chunk that fits in the buffer."""
+        self.size += len(chunk)
+        n = min(len(chunk), len(self.buffer) - self.length)
+        if n > 0:
+            self.buffer[self.length : self.length + n] = chunk[:n]
+            self.length += n
+
+    def attributes(self, content_type: str | None) -> dict[str, AttributeValue]:
+        """Span attributes describing the captured body.
+
+        The body itself is only recorded for textual content types.
+
+        """
+        # for semantics of payload attribute naming see:
+        # https://github.com/open-telemetry/oteps/pull/234
+        attributes: dict[str, AttributeValue] = {
+            "http.response.body.size": self.size,
+            "http.response.body.truncated": self.truncated,
+        }
+        if content_type is not None:
+            attributes["http.response.body.content_type"] = content_type
 
-    # for semantics of payload attribute naming see:
-    # https://github.com/open-telemetry/oteps/pull/234
-    span.set_attribute("http.response.body", body)
+        if content_type is None or content_type.startswith(TEXTUAL_CONTENT_TYPES):
+            body = memoryview(self.buffer)[: self.length]
+            attributes["http.response.body"] = str(body, "utf-8", errors="replace")
 
-    # recreate response with the same body since when consuming it to log it above
-    # we effectively "deplete" the iterator.
-    _response = Response(
-        content=body,
-        status_code=response.status_code,
-        headers=dict(response.headers),
-        media_type=response.media_type,
-    )
+        return attributes
 
-    return _response, span
 
+def span_exporter_for(settings: OpenTelemetrySettings) -> "SpanExporter":
+    """The span exporter to use for the given settings.
 
-async def extract_body(response: StreamingResponse) -> str:
-    """Extract the body of a response."""
+    Exporters are imported on demand, as they are slow to import (the gRPC one
+    in particular) and only one of them is ever used.
 
-    async def read_response_body(response: StreamingResponse) -> bytes:
-        """Helper function to read response body asynchronously into memory."""
-        body = b""
-        async for chunk in response.body_iterator:
-            if isinstance(chunk, str):
-                body += chunk.encode()
-            else:
-                body += chunk
-        return body
+    """
+    match settings.protocol:
+        case OpenTelemetryExporterProtocol.GRPC:
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (
+                OTLPSpanExporter,
+            )
 
-    body = await read_response_body(response)
+            return OTLPSpanExporter(endpoint=settings.endpoint)
+        case OpenTelemetryExporterProtocol.HTTP_PROTOBUF:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter as OTLPHttpSpanExporter,
+            )
 
-    return body.decode()
+            return OTLPHttpSpanExporter(endpoint=settings.endpoint)
+        case _:
+            raise ValueError(f"Invalid exporter protocol: {settings.protocol=}")
 
 
 def opentelemetry_provider(app: FastAPI, settings: Settings) -> None:
@@ -119,6 +181,13 @@ def opentelemetry_provider(app: FastAPI, settings: Settings) -> None:
     if not settings.opentelemetry.enabled:
         return
 
+    # the SDK is only needed (and imported) when OpenTelemetry is enabled.
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    from mockstack.sampling import sampler_for
+
     # Initialize OpenTelemetry
     distribution = metadata.distribution("mockstack")
     resource = Resource(
@@ -128,12 +197,19 @@ def opentelemetry_provider(app: FastAPI, settings: Settings) -> None:
         }
     )
 
-    tracer_provider = TracerProvider(resource=resource)
+    tracer_provider = TracerProvider(
+        resource=resource, sampler=sampler_for(settings.opentelemetry)
+    )
     trace.set_tracer_provider(tracer_provider)
 
     # Set up OTLP exporter
-    otlp_exporter = OTLPSpanExporter(endpoint=settings.opentelemetry.endpoint)
-    span_processor = BatchSpanProcessor(otlp_exporter)
+    span_processor = BatchSpanProcessor(
+        span_exporter_for(settings.opentelemetry),
+        max_queue_size=settings.opentelemetry.max_queue_size,
+        schedule_delay_millis=settings.opentelemetry.schedule_delay_millis,
+        max_export_batch_size=settings.opentelemetry.max_export_batch_size,
+        export_timeout_millis=settings.opentelemetry.export_timeout_millis,
+    )
     tracer_provider.add_span_processor(span_processor)
 
     # Nb. we do not actually use the default FastAPIInstrumentor here
@@ -1,35 +1,99 @@
 """Templates related functionality."""
 
 from collections import OrderedDict
-from functools import partial
+from functools import cached_property
 from pathlib import Path
-from typing import Generator
+from typing import TYPE_CHECKING, Awaitable, Callable, Generator
 
 from fastapi import Request
 from jinja2 import Environment, FileSystemLoader
 
 from mockstack.exceptions import raise_for_missing
 from mockstack.identifiers import looks_like_id, prefixes
+from mockstack.llm.cache import LLMCache
 
+if TYPE_CHECKING:
+    from mockstack.datasets import Datasets
 
-def templates_env_provider(templates_dir: Path | str | None = None) -> Environment:
-    """Provide a Jinja2 environment for the templates."""
-    # TODO refactor a bit to be more generic for optional dependencies.
-    from mockstack.llm import ollama
+
+class LazyOllamaLLM:
+    """The `ollama` template function, loading the Ollama integration on first use.
+
+    Importing the ollama client is comparatively slow, and most templates never
+    call it, so this is deferred until a template does.
+
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str | None = None,
+        max_concurrency: int = 1,
+        cache: LLMCache | None = None,
+    ):
+        self.host = host
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+
+    @cached_property
+    def llm(self) -> Callable[..., Awaitable[str]]:
+        # TODO refactor a bit to be more generic for optional dependencies.
+        from mockstack.llm import ollama
+
+        if not ollama.IS_OLLAMA_AVAILABLE:
+            raise_for_missing(
+                "Ollama is not available. Install with optional dependency mockstack[llm] to use it."
+            )
+
+        return ollama.AsyncOllamaLLM(
+            host=self.host, max_concurrency=self.max_concurrency, cache=self.cache
+        )
+
+    async def __call__(self, *args, **kwargs) -> str:
+        return await self.llm(*args, **kwargs)
+
+
+def templates_env_provider(
+    templates_dir: Path | str | None = None,
+    *,
+    auto_reload: bool = True,
+    ollama_host: str | None = None,
+    ollama_max_concurrency: int = 1,
+    ollama_cache: LLMCache | None = None,
+    datasets: "Datasets | None" = None,
+) -> Environment:
+    """Provide a Jinja2 environment for the templates.
+
+    Templates are rendered asynchronously (see `Template.render_async`), so that
+    template functions doing I/O such as `ollama` do not block the event loop.
+
+    When `auto_reload` is disabled, the environment will not stat template files
+    to check for modifications on every lookup. Callers are then responsible for
+    invalidating the template cache themselves when templates change.
+
+    `datasets`, when given, are available to templates as the `datasets` global.
+
+    """
+    # imported here, as datasets depend on this module.
+    from mockstack.pagination import json_dumps, paginate
 
     loader = FileSystemLoader(templates_dir) if templates_dir else None
 
-    env = Environment(loader=loader)
+    env = Environment(loader=loader, auto_reload=auto_reload, enable_async=True)
 
     env.filters["json_escape"] = json_escape
+    env.filters["json_dumps"] = json_dumps
 
-    if ollama.IS_OLLAMA_AVAILABLE:
-        env.globals["ollama"] = ollama.ollama
-    else:
-        env.globals["ollama"] = partial(
-            raise_for_missing,
-            "Ollama is not available. Install with optional dependency mockstack[llm] to use it.",
-        )
+    env.globals["paginate"] = paginate
+
+    env.globals["ollama"] = LazyOllamaLLM(
+        host=ollama_host,
+        max_concurrency=ollama_max_concurrency,
+        cache=ollama_cache,
+    )
+
+    if datasets is not None:
+        env.globals["datasets"] = datasets
 
     return env
 
@@ -0,0 +1,83 @@
+"""Shared fixtures for the benchmarks.
+
+Benchmarks are disabled by default, in which case each runs once as a regular
+test. Run them, saving the results for comparison with later runs, with:
+
+    uv run pytest mockstack/tests/benchmarks --benchmark-enable --benchmark-autosave
+
+"""
+
+import asyncio
+
+import pytest
+from fastapi import Request
+
+from mockstack.embedding import QUIET_LOGGING
+
+
+@pytest.fixture
+def benchmark(benchmark, pytestconfig):
+    """The pytest-benchmark fixture, disabled unless --benchmark-enable is given."""
+    if not pytestconfig.getoption("benchmark_enable"):
+        benchmark.disabled = True
+    return benchmark
+
+
+@pytest.fixture
+def run_async():
+    """Run coroutines to completion, as pytest-benchmark only times sync calls."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture
+def make_request():
+    """Factory for requests as received by the catch-all route."""
+
+    def make_request(
+        method: str,
+        path: str,
+        *,
+        query_string: bytes = b"",
+        headers: dict[str, str] | None = None,
+    ) -> Request:
+        return Request(
+            scope={
+                "type": "http",
+                "scheme": "http",
+                "server": ("localhost", 8000),
+                "client": ("127.0.0.1", 54321),
+                "method": method,
+                "path": path,
+                "query_string": query_string,
+                "headers": [
+                    (name.lower().encode(), value.encode())
+                    for name, value in (headers or {}).items()
+                ],
+            }
+        )
+
+    return make_request
+
+
+@pytest.fixture
+def request_headers():
+    """Headers of a typical request from a service client."""
+    return {
+        "host": "localhost:8000",
+        "accept": "application/json",
+        "accept-encoding": "gzip, deflate",
+        "content-type": "application/json",
+        "user-agent": "python-httpx/0.28.1",
+        "authorization": "Bearer token",
+        "x-user-id": "8c2e5d7a-9f4b-4e1a-b3c6-2d8f0a1e7b94",
+        "x-request-id": "4b1f9e2c-7a3d-4c8e-9b5f-1e6a0d2c8f73",
+        "traceparent": "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01",
+    }
+
+
+@pytest.fixture
+def quiet_settings(settings):
+    """Settings without per-request logging, which would dominate timings."""
+    return settings.model_copy(update={"logging": QUIET_LOGGING})
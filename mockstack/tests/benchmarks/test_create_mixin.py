@@ -0,0 +1,40 @@
+"""Benchmarks for the create mixin module."""
+
+import pytest
+from jinja2 import Environment
+
+from mockstack.strategies.create_mixin import CreateMixin
+
+
+@pytest.fixture
+def resource():
+    """A resource as sent in the body of a create request."""
+    return {
+        "name": "new project",
+        "description": "a project created by the benchmarks",
+        "tags": ["a", "b", "c"],
+        "settings": {"visibility": "private", "retention_days": 30},
+    }
+
+
+def test_content(
+    benchmark, run_async, make_request, request_headers, resource, settings
+):
+    """Benchmark injecting the default metadata into a created resource."""
+    strategy = CreateMixin()
+    env = Environment(enable_async=True)
+    request = make_request("POST", "/api/v1/projects", headers=request_headers)
+
+    content = benchmark(
+        lambda: run_async(
+            strategy._content(
+                resource,
+                env=env,
+                request=request,
+                created_resource_metadata=settings.created_resource_metadata,
+            )
+        )
+    )
+
+    assert content["name"] == resource["name"]
+    assert content["createdBy"] == request_headers["x-user-id"]
@@ -0,0 +1,35 @@
+"""Benchmarks for the datasets module."""
+
+import pytest
+
+from mockstack.datasets import Dataset
+
+ROWS = 100_000
+
+
+@pytest.fixture(scope="module")
+def customers():
+    """A dataset of customers, as loaded from a large CSV file."""
+    return Dataset.from_rows(
+        "customers",
+        (
+            {"id": 100_000 + i, "country": f"C{i % 50}", "tier": i % 3}
+            for i in range(ROWS)
+        ),
+        index_columns=["id", "country"],
+    )
+
+
+def test_get(benchmark, customers):
+    """Benchmark looking up a row by id, as given in the path."""
+    benchmark(customers.get, "150000")
+
+
+def test_filter_indexed(benchmark, customers):
+    """Benchmark a page of rows filtered on an indexed and a scanned column."""
+    benchmark(customers.filter, {"country": "C7", "tier": "1", "page": "1"}, limit=20)
+
+
+def test_filter_scan(benchmark, customers):
+    """Benchmark a page of rows filtered on a scanned column only."""
+    benchmark(customers.filter, {"tier": "2"}, offset=1000, limit=20)
@@ -0,0 +1,20 @@
+"""Benchmarks for the identifiers module."""
+
+import pytest
+
+from mockstack.identifiers import looks_like_id
+
+
+@pytest.mark.parametrize(
+    "segment",
+    [
+        "projects",
+        "1234",
+        "c9d4c7a2-3f5b-4e8a-9d1c-6b2e0f7a8c35",
+        "6507f1f77bcf86cd79943901",
+        "embedding_search",
+    ],
+)
+def test_looks_like_id(benchmark, segment):
+    """Benchmark classifying path segments of various kinds."""
+    benchmark(looks_like_id, segment)
@@ -0,0 +1,20 @@
+"""Benchmarks for the pagination module."""
+
+from mockstack.pagination import json_dumps, paginate
+
+ITEMS = range(1_000_000)
+
+
+def test_paginate_cursor(benchmark):
+    """Benchmark locating a page deep into a virtual collection."""
+    query = {"cursor": paginate(ITEMS, {"offset": "900000"}).next_cursor}
+    benchmark(paginate, ITEMS, query, max_limit=1000)
+
+
+def test_json_dumps_page(benchmark):
+    """Benchmark serializing a page of 1000 items."""
+    page = paginate(
+        [{"id": i, "name": f"item {i}", "tags": ["a", "b"]} for i in range(1000)],
+        {"limit": "1000"},
+    )
+    benchmark(json_dumps, page)
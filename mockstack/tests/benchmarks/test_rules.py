@@ -0,0 +1,95 @@
+"""Benchmarks for the rules module, over a large rule set."""
+
+import pytest
+
+from mockstack.rules import Rule, RuleMatcher, TemplateRuleResult, URLRuleResult
+
+# number of services in the rule set, each with a few rules.
+SERVICES = 250
+
+
+@pytest.fixture(scope="module")
+def rules():
+    """A large rule set, with the rules for the last service at its end."""
+    rules = []
+    for i in range(SERVICES):
+        rules.extend(
+            [
+                Rule(
+                    pattern=rf"/api/v1/service{i}/projects/(\d+)",
+                    replacement=rf"https://service{i}.internal/projects/\1",
+                    method="GET",
+                ),
+                Rule(
+                    pattern=rf"/api/v1/service{i}/users/([^/]+)",
+                    replacement=rf"https://service{i}.internal/users/\1",
+                ),
+                Rule(
+                    pattern=rf"/api/v1/service{i}/templates/(\d+)",
+                    replacement=rf"file:///service{i}-templates.\1.j2",
+                ),
+            ]
+        )
+    return rules
+
+
+@pytest.fixture
+def last_service_request(make_request, request_headers):
+    """A request matching one of the last rules only."""
+    return make_request(
+        "GET",
+        f"/api/v1/service{SERVICES - 1}/users/alice",
+        headers=request_headers,
+    )
+
+
+def test_rule_matches_scan(benchmark, rules, last_service_request):
+    """Benchmark finding the first matching rule by scanning all rules in order."""
+
+    def first_match():
+        return next(rule for rule in rules if rule.matches(last_service_request))
+
+    rule = benchmark(first_match)
+
+    assert rule is rules[-2]
+
+
+def test_rule_matcher_match(benchmark, rules, last_service_request):
+    """Benchmark finding the first matching rule with the compiled matcher."""
+    matcher = RuleMatcher(rules)
+
+    rule = benchmark(matcher.rule_for, last_service_request)
+
+    assert rule is rules[-2]
+
+
+def test_rule_matches_miss(benchmark, rules, make_request):
+    """Benchmark scanning all rules for a request matching none of them."""
+    request = make_request("GET", "/api/v2/unknown/1234")
+
+    benchmark(lambda: [rule for rule in rules if rule.matches(request)])
+
+
+def test_rule_apply_url(benchmark, rules, make_request):
+    """Benchmark applying a URL rule, given its match as found by the matcher."""
+    request = make_request("GET", "/api/v1/service7/projects/1234")
+    match = rules[21].regex.match(request.url.path)
+
+    result = benchmark(rules[21].apply, request, match)
+
+    assert result == URLRuleResult(url="https://service7.internal/projects/1234")
+
+
+def test_rule_apply_template(benchmark, rules, make_request, request_headers):
+    """Benchmark applying a template rule, including its template context."""
+    request = make_request(
+        "GET",
+        "/api/v1/service7/templates/1234",
+        query_string=b"page=2",
+        headers=request_headers,
+    )
+
+    result = benchmark(rules[23].apply, request)
+
+    assert isinstance(result, TemplateRuleResult)
+    assert result.template_path == "/service7-templates.1234.j2"
@@ -0,0 +1,96 @@
+"""Benchmarks of full request round trips through the app, for both strategies."""
+
+import pytest
+import yaml
+from fastapi import status
+from starlette.testclient import TestClient
+
+from mockstack.main import create_app
+
+# number of rules preceding the rules exercised by the proxyrules benchmarks.
+FILLER_RULES = 500
+
+
+@pytest.fixture
+def filefixtures_client(quiet_settings):
+    """A client of the app using the filefixtures strategy."""
+    settings = quiet_settings.model_copy(update={"strategy": "filefixtures"})
+    with TestClient(create_app(settings=settings)) as client:
+        yield client
+
+
+@pytest.fixture
+def proxyrules_client(quiet_settings, tmp_path):
+    """A client of the app using the proxyrules strategy, with a large rule set."""
+    template_file = tmp_path / "project.json.j2"
+    template_file.write_text(
+        '{"id": "{{ projects }}", "name": "Project {{ projects }}"}'
+    )
+
+    rules = [
+        {
+            "pattern": rf"/api/v1/service{i}/items/(\d+)",
+            "replacement": rf"https://service{i}.internal/items/\1",
+        }
+        for i in range(FILLER_RULES)
+    ]
+    rules.extend(
+        [
+            {
+                "pattern": r"/api/v1/projects/(\d+)",
+                "replacement": f"file:///{template_file}",
+                "method": "GET",
+            },
+            {
+                "pattern": r"/api/v1/users/([^/]+)",
+                "replacement": r"https://users.internal/users/\1",
+            },
+        ]
+    )
+    rules_filename = tmp_path / "proxyrules.yml"
+    rules_filename.write_text(yaml.safe_dump({"rules": rules}))
+
+    settings = quiet_settings.model_copy(
+        update={"proxyrules_rules_filename": str(rules_filename)}
+    )
+    with TestClient(create_app(settings=settings), follow_redirects=False) as client:
+        yield client
+
+
+def test_filefixtures_template(benchmark, filefixtures_client):
+    """Benchmark rendering a template."""
+    response = benchmark(filefixtures_client.get, "/example-template")
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_filefixtures_missing(benchmark, filefixtures_client):
+    """Benchmark looking up all candidate templates of a missing resource."""
+    response = benchmark(filefixtures_client.get, "/api/v1/projects/1234/tasks/5678")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_filefixtures_create(benchmark, filefixtures_client):
+    """Benchmark simulating creation of a resource."""
+    response = benchmark(
+        filefixtures_client.post, "/api/v1/projects", json={"name": "new project"}
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+def test_proxyrules_template(benchmark, proxyrules_client):
+    """Benchmark matching a template rule and rendering its template."""
+    response = benchmark(proxyrules_client.get, "/api/v1/projects/1234")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["id"] == "1234"
+
+
+def test_proxyrules_redirect(benchmark, proxyrules_client):
+    """Benchmark matching a URL rule and redirecting to it."""
+    response = benchmark(proxyrules_client.get, "/api/v1/users/alice")
+
+    assert response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+    assert response.headers["location"] == "https://users.internal/users/alice"
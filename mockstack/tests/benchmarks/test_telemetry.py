@@ -0,0 +1,32 @@
+"""Benchmarks for the telemetry module."""
+
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+
+from mockstack.constants import SENSITIVE_HEADERS
+from mockstack.telemetry import with_request_attributes
+
+
+@pytest.fixture
+def tracer():
+    """A tracer recording spans, without exporting them."""
+    return TracerProvider().get_tracer(__name__)
+
+
+def test_with_request_attributes(benchmark, tracer, make_request, request_headers):
+    """Benchmark adding the attributes of a typical request to a span."""
+    request = make_request(
+        "GET",
+        "/api/v1/projects/1234",
+        query_string=b"page=2&size=50&sort=name",
+        headers=request_headers,
+    )
+    span = tracer.start_span("GET /api/v1/projects/1234")
+
+    benchmark(
+        with_request_attributes, request, span, sensitive_headers=SENSITIVE_HEADERS
+    )
+
+    assert span.attributes is not None
+    assert "http.request.header.authorization" not in span.attributes
+    span.end()
@@ -0,0 +1,38 @@
+"""Benchmarks for the templating module."""
+
+import pytest
+
+from mockstack.templating import (
+    iter_possible_template_arguments,
+    parse_template_name_segments_and_identifiers,
+)
+
+PATHS = [
+    "/api/v1/projects",
+    "/api/v1/projects/1234",
+    "/api/v1/projects/1234/tasks/c9d4c7a2-3f5b-4e8a-9d1c-6b2e0f7a8c35/comments",
+]
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_parse_template_name_segments_and_identifiers(benchmark, path):
+    """Benchmark parsing paths of increasing depth."""
+    benchmark(
+        parse_template_name_segments_and_identifiers,
+        path,
+        default_identifier_key="id",
+    )
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_iter_possible_template_arguments(
+    benchmark, make_request, request_headers, path
+):
+    """Benchmark inferring all candidate templates for a request."""
+    request = make_request(
+        "GET", path, query_string=b"page=2&size=50", headers=request_headers
+    )
+
+    arguments = benchmark(lambda: list(iter_possible_template_arguments(request)))
+
+    assert arguments[-1]["name"] == "index.j2"
@@ -11,6 +11,12 @@ from mockstack.constants import ProxyRulesRedirectVia
 from mockstack.strategies.filefixtures import FileFixturesStrategy
 
 
+def pytest_ignore_collect(collection_path, config):
+    """Skip the benchmarks when the pytest-benchmark plugin is not available."""
+    if collection_path.name == "benchmarks":
+        return not config.pluginmanager.hasplugin("benchmark") or None
+
+
 @pytest.fixture
 def span():
     """Create a mock span object for testing."""
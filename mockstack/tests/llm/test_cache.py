@@ -0,0 +1,43 @@
+"""Tests for the LLM cache module."""
+
+import pytest
+
+from mockstack.llm.cache import LLMCache
+
+
+def test_llm_cache_key():
+    """Test cache keys depend only on the content of the inputs."""
+    messages = [{"role": "user", "content": "Hello"}]
+    key = LLMCache.key("llama3.2", messages, {"num_ctx": 4096, "temperature": 0.7})
+
+    assert key == LLMCache.key(
+        "llama3.2",
+        [{"content": "Hello", "role": "user"}],
+        {"temperature": 0.7, "num_ctx": 4096},
+    )
+    assert key != LLMCache.key("other", messages, {"num_ctx": 4096})
+    assert key != LLMCache.key("llama3.2", messages, {"num_ctx": 2048})
+
+
+@pytest.mark.asyncio
+async def test_llm_cache_get_set():
+    """Test storing and looking up completions in memory."""
+    cache = LLMCache(max_entries=2)
+
+    assert await cache.get("a") is None
+    await cache.set("a", "completion")
+    assert await cache.get("a") == "completion"
+
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_llm_cache_disk(tmp_path):
+    """Test completions are persisted to disk."""
+    await LLMCache(max_entries=2, directory=tmp_path).set("a", "completion ✓")
+
+    cache = LLMCache(max_entries=2, directory=tmp_path)
+    assert await cache.get("a") == "completion ✓"
+    assert "a" in cache.memory
+    assert cache.hits == 1
@@ -1,7 +1,8 @@
 """Tests for the Ollama module."""
 
+import importlib
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 from typing import List, Dict
 
 
@@ -26,70 +27,99 @@ def mock_ollama_module():
     # TODO: Should probably remove this in favor making sure ollama optional package
     # is installed for running unit-tests, and instead mocking it as missing for the
     # "not available" test cases.
+    from mockstack.llm import ollama
+
+    # the module may have been imported already without ollama being available.
     with patch.dict("sys.modules", {"ollama": MagicMock()}) as mocked_dict:
+        importlib.reload(ollama)
         yield mocked_dict
+    importlib.reload(ollama)
 
 
 class TestOllamaAvailable:
     """Test cases when Ollama is available."""
 
     @patch("mockstack.llm.ollama.IS_OLLAMA_AVAILABLE", True)
-    def test_ollama_llm_initialization(self, mock_ollama_module):
-        """Test OllamaLLM initialization with default model."""
-        from mockstack.llm.ollama import OllamaLLM
+    def test_content_function(self, mock_ollama_module, mock_chat_response):
+        """Test content function extraction."""
+        from mockstack.llm.ollama import content
 
-        llm = OllamaLLM()
-        assert llm.model == "llama3.2"
+        result = content(mock_chat_response)
+        assert result == "This is a test response"
 
+    @pytest.mark.asyncio
     @patch("mockstack.llm.ollama.IS_OLLAMA_AVAILABLE", True)
-    def test_ollama_llm_initialization_custom_model(self, mock_ollama_module):
-        """Test OllamaLLM initialization with custom model."""
-        from mockstack.llm.ollama import OllamaLLM
+    async def test_async_ollama_llm_call(
+        self, mock_ollama_module, mock_messages, mock_chat_response
+    ):
+        """Test AsyncOllamaLLM.__call__ method reuses a single async client."""
+        from mockstack.llm.ollama import AsyncOllamaLLM
+
+        llm = AsyncOllamaLLM(host="http://ollama:11434")
+        llm.client = MagicMock()
+        llm.client.chat = AsyncMock(return_value=mock_chat_response)
 
-        llm = OllamaLLM(model="custom-model")
-        assert llm.model == "custom-model"
+        response = await llm(mock_messages, "custom-model")
+        await llm(mock_messages, "custom-model")
 
+        llm.client.chat.assert_awaited_with(
+            model="custom-model",
+            messages=mock_messages,
+            options={"num_ctx": 4096, "temperature": 0.7},
+        )
+        assert llm.client.chat.await_count == 2
+        assert response == "This is a test response"
+
+    @pytest.mark.asyncio
     @patch("mockstack.llm.ollama.IS_OLLAMA_AVAILABLE", True)
-    def test_ollama_llm_call(
+    async def test_async_ollama_llm_concurrency_per_model(
         self, mock_ollama_module, mock_messages, mock_chat_response
     ):
-        """Test OllamaLLM.__call__ method."""
-        from mockstack.llm.ollama import OllamaLLM
+        """Test AsyncOllamaLLM bounds concurrent calls per model."""
+        import asyncio
 
-        mock_chat = MagicMock(return_value=mock_chat_response)
-        with patch("mockstack.llm.ollama.chat", mock_chat):
-            llm = OllamaLLM()
-            response = llm(mock_messages)
+        from mockstack.llm.ollama import AsyncOllamaLLM
 
-            mock_chat.assert_called_once_with(
-                model="llama3.2",
-                messages=mock_messages,
-                options={"num_ctx": 4096, "temperature": 0.7},
-            )
-            assert response == "This is a test response"
+        running = {"a": 0, "b": 0}
+        max_running = {"a": 0, "b": 0}
 
-    @patch("mockstack.llm.ollama.IS_OLLAMA_AVAILABLE", True)
-    def test_content_function(self, mock_ollama_module, mock_chat_response):
-        """Test content function extraction."""
-        from mockstack.llm.ollama import content
+        async def chat(model, **kwargs):
+            running[model] += 1
+            max_running[model] = max(max_running[model], running[model])
+            await asyncio.sleep(0.01)
+            running[model] -= 1
+            return mock_chat_response
 
-        result = content(mock_chat_response)
-        assert result == "This is a test response"
+        llm = AsyncOllamaLLM(max_concurrency=2)
+        llm.client = MagicMock()
+        llm.client.chat = chat
+
+        await asyncio.gather(
+            *(llm(mock_messages, model) for model in ["a"] * 5 + ["b"] * 5)
+        )
 
+        assert max_running == {"a": 2, "b": 2}
+
+    @pytest.mark.asyncio
     @patch("mockstack.llm.ollama.IS_OLLAMA_AVAILABLE", True)
-    def test_ollama_function(
+    async def test_async_ollama_llm_cache(
         self, mock_ollama_module, mock_messages, mock_chat_response
     ):
-        """Test ollama function."""
-        from mockstack.llm.ollama import ollama
-
-        mock_chat = MagicMock(return_value=mock_chat_response)
-        with patch("mockstack.llm.ollama.chat", mock_chat):
-            response = ollama(mock_messages)
-
-            mock_chat.assert_called_once_with(
-                model="llama3.2",
-                messages=mock_messages,
-                options={"num_ctx": 4096, "temperature": 0.7},
-            )
-            assert response == "This is a test response"
+        """Test AsyncOllamaLLM generates identical prompts only once."""
+        import asyncio
+
+        from mockstack.llm.cache import LLMCache
+        from mockstack.llm.ollama import AsyncOllamaLLM
+
+        llm = AsyncOllamaLLM(cache=LLMCache(max_entries=10))
+        llm.client = MagicMock()
+        llm.client.chat = AsyncMock(return_value=mock_chat_response)
+
+        responses = await asyncio.gather(*(llm(mock_messages) for _ in range(5)))
+        await llm(mock_messages)
+        await llm(mock_messages, temperature=0.0)
+
+        assert responses == ["This is a test response"] * 5
+        assert llm.client.chat.await_count == 2
+        assert llm.cache.hits == 1
+        assert llm.cache.misses == 2
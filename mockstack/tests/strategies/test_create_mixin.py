@@ -8,7 +8,7 @@ import pytest
 from fastapi import Request, status
 from jinja2 import Environment
 
-from mockstack.strategies.create_mixin import CreateMixin
+from mockstack.strategies.create_mixin import CreateMixin, MetadataRenderer
 
 
 class TestStrategy(CreateMixin):
@@ -26,7 +26,7 @@ def strategy():
 @pytest.fixture
 def env():
     """Return a Jinja2 Environment instance."""
-    return Environment()
+    return Environment(enable_async=True)
 
 
 @pytest.fixture
@@ -97,7 +97,8 @@ async def test_create_with_non_json_request(
     assert response.body == b""  # FastAPI Response with no content returns empty bytes
 
 
-def test_content_with_string_metadata(strategy, env, span):
+@pytest.mark.asyncio
+async def test_content_with_string_metadata(strategy, env, span):
     """Test content generation with string metadata."""
     request = Request(
         scope={
@@ -115,7 +116,7 @@ def test_content_with_string_metadata(strategy, env, span):
         "createdBy": "{{ request.headers.get('X-User-Id') }}",
     }
 
-    result = strategy._content(
+    result = await strategy._content(
         resource,
         env=env,
         request=request,
@@ -127,7 +128,8 @@ def test_content_with_string_metadata(strategy, env, span):
     assert result["createdBy"] == "test-user"
 
 
-def test_content_with_dict_metadata(strategy, env, span):
+@pytest.mark.asyncio
+async def test_content_with_dict_metadata(strategy, env, span):
     """Test content generation with dictionary metadata."""
     request = Request(
         scope={
@@ -144,7 +146,7 @@ def test_content_with_dict_metadata(strategy, env, span):
         "status": {"code": "OK", "message": None},
     }
 
-    result = strategy._content(
+    result = await strategy._content(
         resource,
         env=env,
         request=request,
@@ -198,3 +200,71 @@ def test_create_mixin_update_opentelemetry(strategy, span):
         "mockstack.create_mixin.created_resource_metadata",
         json.dumps(metadata),
     )
+
+
+@pytest.mark.asyncio
+async def test_content_compiles_metadata_once(
+    strategy, env, created_resource_metadata, span, mocker
+):
+    """Test metadata templates are compiled on first use only."""
+    request = Request(
+        scope={
+            "type": "http",
+            "method": "POST",
+            "path": "/test",
+            "headers": [(b"x-user-id", b"test-user")],
+        }
+    )
+    request.state.span = span
+    from_string = mocker.spy(env, "from_string")
+
+    first = await strategy._content(
+        {"name": "first"},
+        env=env,
+        request=request,
+        created_resource_metadata=created_resource_metadata,
+    )
+    second = await strategy._content(
+        {"name": "second"},
+        env=env,
+        request=request,
+        created_resource_metadata=created_resource_metadata,
+    )
+
+    assert from_string.call_count == 3
+    assert first["id"] != second["id"]
+    assert second["createdBy"] == "test-user"
+
+
+@pytest.mark.parametrize(
+    "value,is_template",
+    [
+        ("{{ uuid4() }}", True),
+        ("{% if true %}yes{% endif %}", True),
+        ("{# comment #}", True),
+        ("line\n", True),
+        ("active", False),
+        ("", False),
+    ],
+)
+def test_metadata_renderer_skips_constants(env, value, is_template):
+    """Test only strings with template syntax are compiled into templates."""
+    renderer = MetadataRenderer(env, {"field": value, "status": {"code": "OK"}})
+
+    assert [template is not None for _, _, template in renderer.fields] == [
+        is_template,
+        False,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_metadata_renderer_keeps_field_order(env):
+    """Test fields are injected in the configured order."""
+    renderer = MetadataRenderer(
+        env, {"id": "{{ 1 + 1 }}", "status": "active", "version": "{{ 3 }}"}
+    )
+
+    result = await renderer.render({"name": "test"}, {})
+
+    assert result == {"name": "test", "id": "2", "status": "active", "version": "3"}
+    assert list(result) == ["name", "id", "status", "version"]
@@ -0,0 +1,40 @@
+"""Unit tests for the strategies factory module."""
+
+import pytest
+from fastapi import FastAPI
+
+from mockstack.strategies import FileFixturesStrategy, ProxyRulesStrategy
+from mockstack.strategies.factory import (
+    AVAILABLE_STRATEGIES,
+    available_strategies,
+    name_for,
+    strategy_class_for,
+    strategy_provider,
+)
+
+
+def test_strategy_class_for():
+    """Test importing strategy classes by name."""
+    assert strategy_class_for("filefixtures") is FileFixturesStrategy
+    assert strategy_class_for("proxyrules") is ProxyRulesStrategy
+
+    with pytest.raises(ValueError, match="Unknown strategy"):
+        strategy_class_for("unknown")
+
+
+def test_available_strategies():
+    """Test the registered strategy names match their classes."""
+    strategies = available_strategies()
+
+    assert tuple(strategies) == AVAILABLE_STRATEGIES
+    assert all(name_for(cls) == name for name, cls in strategies.items())
+
+
+def test_strategy_provider(settings):
+    """Test the configured strategy is created and added to the app state."""
+    app = FastAPI()
+
+    strategy = strategy_provider(app, settings)
+
+    assert isinstance(strategy, ProxyRulesStrategy)
+    assert app.state.strategy is strategy
@@ -4,8 +4,11 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi import HTTPException, Request, status
+from starlette.testclient import TestClient
 import json
 
+from mockstack.constants import TemplatesManifestWatchMode
+from mockstack.main import create_app
 from mockstack.strategies.filefixtures import FileFixturesStrategy
 
 
@@ -24,6 +27,30 @@ def test_filefixtures_strategy_init_missing_templates_dir():
         FileFixturesStrategy(settings)
 
 
+def test_filefixtures_strategy_preload(settings):
+    """Test preloading compiles all templates up front."""
+    settings.filefixtures_templates_manifest = True
+    strategy = FileFixturesStrategy(settings)
+    strategy.preload()
+
+    assert "manifest" in strategy.__dict__
+    assert strategy.env.cache is not None
+    assert len(strategy.env.cache) == len(strategy.env.list_templates(["j2"]))
+
+
+def test_filefixtures_strategy_preload_syntax_error(settings, tmp_path, caplog):
+    """Test a template with a syntax error does not prevent preloading others."""
+    (tmp_path / "api-v1-broken.j2").write_text("{% if %}")
+    (tmp_path / "api-v1-projects.j2").write_text("{}")
+    settings.templates_dir = tmp_path
+    strategy = FileFixturesStrategy(settings)
+
+    strategy.preload()
+
+    assert "api-v1-broken.j2" in caplog.text
+    assert len(strategy.env.cache) == 1
+
+
 def test_filefixtures_strategy_str(settings):
     """Test string representation of FileFixturesStrategy."""
     strategy = FileFixturesStrategy(settings)
@@ -38,7 +65,7 @@ async def test_file_fixtures_strategy_apply_success(settings, span):
 
     # Create a mock template
     mock_template = MagicMock()
-    mock_template.render.return_value = '{"status": "success"}'
+    mock_template.render_async = AsyncMock(return_value='{"status": "success"}')
 
     # Patch the environment to return our mock template
     with (
@@ -62,7 +89,7 @@ async def test_file_fixtures_strategy_apply_success(settings, span):
         # Assert
         assert response.media_type == "application/json"
         assert response.body.decode() == '{"status": "success"}'
-        mock_template.render.assert_called_once()
+        mock_template.render_async.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -132,7 +159,7 @@ async def test_file_fixtures_strategy_post_search(settings, span):
     request.json = AsyncMock(return_value={"query": "test"})
 
     mock_template = MagicMock()
-    mock_template.render.return_value = '{"results": []}'
+    mock_template.render_async = AsyncMock(return_value='{"results": []}')
 
     with (
         patch.object(strategy.env, "get_template", return_value=mock_template),
@@ -160,7 +187,7 @@ async def test_file_fixtures_strategy_post_command(settings, span):
     request.json = AsyncMock(return_value={"action": "start"})
 
     mock_template = MagicMock()
-    mock_template.render.return_value = '{"status": "started"}'
+    mock_template.render_async = AsyncMock(return_value='{"status": "started"}')
 
     with (
         patch.object(strategy.env, "get_template", return_value=mock_template),
@@ -273,3 +300,101 @@ def test_file_fixtures_strategy_update_opentelemetry(settings, span):
     span.set_attribute.assert_called_once_with(
         "mockstack.filefixtures.template_name", "test-template.j2"
     )
+
+
+@pytest.mark.asyncio
+async def test_file_fixtures_strategy_templates_manifest(settings, span, tmp_path):
+    """Test template lookups are answered from the templates manifest."""
+    (tmp_path / "api-v1-projects.j2").write_text('{"id": "{{ projects }}"}')
+    settings.templates_dir = tmp_path
+    settings.filefixtures_templates_manifest = True
+    settings.filefixtures_templates_manifest_watch = TemplatesManifestWatchMode.NONE
+    strategy = FileFixturesStrategy(settings)
+    await strategy.startup()
+
+    request = Request(
+        scope={
+            "type": "http",
+            "method": "GET",
+            "path": "/api/v1/projects/1234",
+            "query_string": b"",
+            "headers": [],
+        }
+    )
+    request.state.span = span
+
+    with patch("os.path.exists") as mock_exists:
+        response = await strategy.apply(request)
+        mock_exists.assert_not_called()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.body.decode() == '{"id": "1234"}'
+
+    # templates added after startup are not visible until the manifest is refreshed.
+    (tmp_path / "api-v1-projects.1234.j2").write_text('{"id": "specific"}')
+    response = await strategy.apply(request)
+    assert response.body.decode() == '{"id": "1234"}'
+
+    strategy._on_manifest_change(strategy.manifest.refresh())
+    response = await strategy.apply(request)
+    assert response.body.decode() == '{"id": "specific"}'
+
+    await strategy.shutdown()
+
+
+def test_file_fixtures_strategy_resource_store(settings):
+    """Test created resources are read back, updated and deleted from the store."""
+    settings = settings.model_copy(
+        update={
+            "strategy": "filefixtures",
+            "filefixtures_resource_store": True,
+            "filefixtures_resource_store_indexed_fields": ["state"],
+        }
+    )
+
+    with TestClient(create_app(settings=settings)) as client:
+        # collections without stored resources fall back to templates.
+        assert client.get("/api/v1/projects").status_code == status.HTTP_404_NOT_FOUND
+
+        created = client.post("/api/v1/projects", json={"state": "active"}).json()
+        client.post("/api/v1/projects", json={"state": "archived"})
+        project_url = f"/api/v1/projects/{created['id']}"
+
+        response = client.get(project_url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == created
+
+        response = client.patch(project_url, json={"name": "patched"})
+        assert response.json() == {**created, "name": "patched"}
+
+        response = client.put(project_url, json={"state": "archived", "id": "x"})
+        assert response.json() == {"state": "archived", "id": created["id"]}
+
+        response = client.get("/api/v1/projects", params={"state": "archived"})
+        assert len(response.json()) == 2
+        response = client.get("/api/v1/projects", params={"state": "active"})
+        assert response.json() == []
+
+        assert client.delete(project_url).status_code == status.HTTP_204_NO_CONTENT
+        assert client.get(project_url).status_code == status.HTTP_404_NOT_FOUND
+        assert len(client.get("/api/v1/projects").json()) == 1
+
+
+def test_file_fixtures_strategy_resource_store_persisted(settings, tmp_path):
+    """Test persisted resources survive restarts of the app."""
+    settings = settings.model_copy(
+        update={
+            "strategy": "filefixtures",
+            "filefixtures_resource_store": True,
+            "filefixtures_resource_store_path": tmp_path / "resources.db",
+        }
+    )
+
+    with TestClient(create_app(settings=settings)) as client:
+        created = client.post("/api/v1/projects", json={"name": "durable"}).json()
+
+    with TestClient(create_app(settings=settings)) as client:
+        response = client.get(f"/api/v1/projects/{created['id']}")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == created
@@ -1,19 +1,24 @@
 """Unit tests for the proxyrules module."""
 
+import asyncio
+import gzip
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import pytest
 from fastapi import Request, status
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
 from starlette.datastructures import Headers
 
 from mockstack.constants import ProxyRulesRedirectVia
+from mockstack.strategies.filefixtures import FileFixturesStrategy
 from mockstack.strategies.proxyrules import (
     ProxyRulesStrategy,
     Rule,
+    has_request_body,
     maybe_update_response_headers,
+    without_hop_by_hop_headers,
 )
 
 
@@ -25,6 +30,14 @@ def test_proxy_rules_strategy_load_rules(settings):
     assert all(isinstance(rule, Rule) for rule in rules)
 
 
+def test_proxy_rules_strategy_preload(settings):
+    """Test preloading loads and compiles the rules up front."""
+    strategy = ProxyRulesStrategy(settings)
+    strategy.preload()
+    assert "rules" in strategy.__dict__
+    assert "matcher" in strategy.__dict__
+
+
 def test_proxy_rules_strategy_rule_for(settings, span):
     """Test finding a matching rule for a request."""
     strategy = ProxyRulesStrategy(settings)
@@ -113,11 +126,12 @@ async def test_proxy_rules_strategy_apply_template(settings, span, tmp_path):
         "name": "test_template_rule",
     }
 
-    # Mock the rule_for method to return our test rule
+    # Mock the match_for method to return our test rule
     strategy = ProxyRulesStrategy(settings)
     test_rule = Rule.from_dict(rule_data)
+    test_match = test_rule.regex.match("/api/v1/projects/1234")
 
-    with patch.object(strategy, "rule_for", return_value=test_rule):
+    with patch.object(strategy, "match_for", return_value=(test_rule, test_match)):
         request = Request(
             scope={
                 "type": "http",
@@ -289,13 +303,37 @@ def test_proxy_rules_strategy_update_opentelemetry(settings, span):
 
     strategy.update_opentelemetry(request, rule, "/target")
 
-    span.set_attribute.assert_any_call("mockstack.proxyrules.rule_name", "test_rule")
-    span.set_attribute.assert_any_call("mockstack.proxyrules.rule_method", "GET")
-    span.set_attribute.assert_any_call("mockstack.proxyrules.rule_pattern", "/test")
-    span.set_attribute.assert_any_call(
-        "mockstack.proxyrules.rule_replacement", "/target"
+    span.set_attributes.assert_called_once_with(
+        {
+            "mockstack.proxyrules.rule_name": "test_rule",
+            "mockstack.proxyrules.rule_method": "GET",
+            "mockstack.proxyrules.rule_pattern": "/test",
+            "mockstack.proxyrules.rule_replacement": "/target",
+            "mockstack.proxyrules.rewritten_url": "/target",
+        }
     )
-    span.set_attribute.assert_any_call("mockstack.proxyrules.rewritten_url", "/target")
+
+
+def test_proxy_rules_strategy_update_opentelemetry_not_recording(settings, span):
+    """Test no attributes are computed for spans which are not recording."""
+    strategy = ProxyRulesStrategy(settings)
+    request = Request(
+        scope={
+            "type": "http",
+            "method": "GET",
+            "path": "/test",
+            "query_string": b"",
+            "headers": [],
+        }
+    )
+    span.is_recording.return_value = False
+    request.state.span = span
+
+    rule = Rule(pattern="/test", replacement="/target", method="GET", name="test_rule")
+
+    strategy.update_opentelemetry(request, rule, "/target")
+
+    span.set_attributes.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -374,3 +412,435 @@ def test_maybe_update_response_headers_updates_content_encoding():
     assert updated_headers["content-encoding"] == "identity"
     assert updated_headers["content-type"] == "application/json"
     assert updated_headers["content-length"] == "100"
+
+
+@pytest.mark.asyncio
+async def test_proxy_rules_strategy_client_is_pooled(settings_reverse_proxy):
+    """Test the reverse proxy client is shared across requests and closed on shutdown."""
+    settings_reverse_proxy.proxyrules_reverse_proxy_max_connections = 7
+    settings_reverse_proxy.proxyrules_reverse_proxy_keepalive_expiry = 2.5
+    strategy = ProxyRulesStrategy(settings_reverse_proxy)
+
+    with patch("httpx.AsyncClient") as mock_client_class:
+        mock_client_class.return_value.aclose = AsyncMock()
+        client = strategy.client
+        assert strategy.client is client
+        mock_client_class.assert_called_once()
+
+        limits = mock_client_class.call_args.kwargs["limits"]
+        assert limits.max_connections == 7
+        assert limits.keepalive_expiry == 2.5
+
+        await strategy.shutdown()
+        client.aclose.assert_awaited_once()
+        assert "client" not in strategy.__dict__
+
+
+@pytest.mark.asyncio
+async def test_proxy_rules_strategy_streaming_reverse_proxy(settings_reverse_proxy):
+    """Test streaming reverse proxy relays raw bodies without buffering."""
+    compressed = gzip.compress(b'{"message": "success"}')
+    upstream_requests = []
+
+    async def handler(req: httpx.Request) -> httpx.Response:
+        upstream_requests.append((req, await req.aread()))
+        return httpx.Response(
+            200,
+            headers={
+                "content-type": "application/json",
+                "content-encoding": "gzip",
+                "content-length": str(len(compressed)),
+                "connection": "keep-alive",
+            },
+            stream=httpx.ByteStream(compressed),
+        )
+
+    settings_reverse_proxy.proxyrules_reverse_proxy_streaming = True
+    strategy = ProxyRulesStrategy(settings_reverse_proxy)
+    strategy.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    chunks = [b'{"data": ', b'"test"}']
+
+    async def receive():
+        body = chunks.pop(0)
+        return {"type": "http.request", "body": body, "more_body": bool(chunks)}
+
+    request = Request(
+        scope={
+            "type": "http",
+            "method": "POST",
+            "path": "/test",
+            "query_string": b"key=value",
+            "headers": [
+                (b"host", b"example.com"),
+                (b"content-type", b"application/json"),
+                (b"transfer-encoding", b"chunked"),
+            ],
+        },
+        receive=receive,
+    )
+
+    response = await strategy.reverse_proxy(request, "https://api.target.com/test")
+
+    assert isinstance(response, StreamingResponse)
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-length"] == str(len(compressed))
+    assert "connection" not in response.headers
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    assert body == compressed
+
+    upstream_request, upstream_body = upstream_requests[0]
+    assert upstream_body == b'{"data": "test"}'
+    assert upstream_request.url == "https://api.target.com/test?key=value"
+    assert upstream_request.headers["host"] == "api.target.com"
+
+    await strategy.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_proxy_rules_strategy_streaming_reverse_proxy_without_body(
+    settings_reverse_proxy,
+):
+    """Test requests without a body are streamed upstream without one."""
+    upstream_requests = []
+
+    async def handler(req: httpx.Request) -> httpx.Response:
+        upstream_requests.append(req)
+        return httpx.Response(200, stream=httpx.ByteStream(b"data: ping\n\n"))
+
+    settings_reverse_proxy.proxyrules_reverse_proxy_streaming = True
+    strategy = ProxyRulesStrategy(settings_reverse_proxy)
+    strategy.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    request = Request(
+        scope={
+            "type": "http",
+            "method": "GET",
+            "path": "/events",
+            "query_string": b"",
+            "headers": [(b"host", b"example.com")],
+        },
+    )
+
+    response = await strategy.reverse_proxy(request, "https://api.target.com/events")
+    assert b"".join([chunk async for chunk in response.body_iterator]) == (
+        b"data: ping\n\n"
+    )
+
+    (upstream_request,) = upstream_requests
+    assert "transfer-encoding" not in upstream_request.headers
+    assert "content-length" not in upstream_request.headers
+    assert upstream_request.extensions["timeout"]["read"] is None
+
+    await strategy.shutdown()
+
+
+@pytest.mark.parametrize(
+    "headers,expected",
+    [
+        ({}, False),
+        ({"content-length": "0"}, False),
+        ({"content-length": "12"}, True),
+        ({"content-length": "many"}, False),
+        ({"transfer-encoding": "chunked"}, True),
+    ],
+)
+def test_has_request_body(headers, expected):
+    """Test request bodies are detected from the request headers."""
+    assert has_request_body(Headers(headers)) is expected
+
+
+def test_without_hop_by_hop_headers():
+    """Test hop-by-hop headers are stripped from proxied responses."""
+    response_headers = httpx.Headers(
+        {
+            "content-type": "application/json",
+            "transfer-encoding": "chunked",
+            "connection": "close",
+        }
+    )
+
+    updated_headers = without_hop_by_hop_headers(response_headers)
+
+    assert updated_headers["content-type"] == "application/json"
+    assert "transfer-encoding" not in updated_headers
+    assert "connection" not in updated_headers
+
+
+@pytest.mark.asyncio
+async def test_proxy_rules_strategy_record_and_replay(
+    settings_reverse_proxy, span, tmp_path
+):
+    """Test proxied responses are recorded as templates that filefixtures replays."""
+
+    def handler(req: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": "application/json"},
+            content=b'{"id": "1234", "name": "{{ not a template }}"}',
+        )
+
+    settings_reverse_proxy.templates_dir = tmp_path
+    settings_reverse_proxy.proxyrules_record_templates = True
+    strategy = ProxyRulesStrategy(settings_reverse_proxy)
+    strategy.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    request = Request(
+        scope={
+            "type": "http",
+            "method": "GET",
+            "path": "/api/v1/projects/1234",
+            "query_string": b"",
+            "headers": [],
+        }
+    )
+    request.state.span = span
+    request.body = AsyncMock(return_value=b"")
+
+    response = await strategy.reverse_proxy(
+        request, "https://api.target.com/projects/1234"
+    )
+    assert response.status_code == 200
+
+    # recording is deferred to a background task run after the response is sent.
+    assert not (tmp_path / "api-v1-projects.1234.j2").exists()
+    await response.background()
+    assert (tmp_path / "api-v1-projects.1234.j2").exists()
+
+    settings_reverse_proxy.strategy = "filefixtures"
+    replay = FileFixturesStrategy(settings_reverse_proxy)
+    response = await replay.apply(request)
+
+    assert response.status_code == 200
+    assert response.body == b'{"id": "1234", "name": "{{ not a template }}"}'
+
+    await strategy.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_proxy_rules_strategy_record_skips_errors(
+    settings_reverse_proxy, span, tmp_path
+):
+    """Test unsuccessful upstream responses are not recorded."""
+
+    def handler(req: httpx.Request) -> httpx.Response:
+        return httpx.Response(500, content=b"oops")
+
+    settings_reverse_proxy.templates_dir = tmp_path
+    settings_reverse_proxy.proxyrules_record_templates = True
+    strategy = ProxyRulesStrategy(settings_reverse_proxy)
+    strategy.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    request = Request(
+        scope={
+            "type": "http",
+            "method": "GET",
+            "path": "/api/v1/projects/1234",
+            "query_string": b"",
+            "headers": [],
+        }
+    )
+    request.state.span = span
+    request.body = AsyncMock(return_value=b"")
+
+    response = await strategy.reverse_proxy(
+        request, "https://api.target.com/projects/1234"
+    )
+
+    assert response.status_code == 500
+    assert response.background is None
+
+    await strategy.shutdown()
+
+
+def cached_get_request(span, headers=()):
+    """Create a GET request for exercising the reverse proxy cache."""
+    request = Request(
+        scope={
+            "type": "http",
+            "method": "GET",
+            "path": "/api/v1/projects/1234",
+            "query_string": b"",
+            "headers": list(headers),
+        }
+    )
+    request.state.span = span
+    request.body = AsyncMock(return_value=b"")
+    return request
+
+
+@pytest.mark.asyncio
+async def test_proxy_rules_strategy_cached_reverse_proxy(settings_reverse_proxy, span):
+    """Test fresh responses are served from the cache."""
+    upstream_requests = []
+
+    def handler(req: httpx.Request) -> httpx.Response:
+        upstream_requests.append(req)
+        return httpx.Response(
+            200,
+            headers={"cache-control": "max-age=60", "content-type": "application/json"},
+            content=b'{"id": "1234"}',
+        )
+
+    settings_reverse_proxy.proxyrules_cache_enabled = True
+    strategy = ProxyRulesStrategy(settings_reverse_proxy)
+    strategy.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    url = "https://api.target.com/projects/1234"
+
+    response = await strategy.reverse_proxy(cached_get_request(span), url)
+    assert response.headers["x-mockstack-cache"] == "MISS"
+
+    response = await strategy.reverse_proxy(cached_get_request(span), url)
+    assert response.headers["x-mockstack-cache"] == "HIT"
+    assert response.body == b'{"id": "1234"}'
+    assert response.headers["content-type"] == "application/json"
+    assert len(upstream_requests) == 1
+
+    # clients can opt out of the cache per request.
+    request = cached_get_request(span, headers=[(b"cache-control", b"no-store")])
+    response = await strategy.reverse_proxy(request, url)
+    assert "x-mockstack-cache" not in response.headers
+    assert len(upstream_requests) == 2
+
+    await strategy.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_proxy_rules_strategy_cached_reverse_proxy_revalidates(
+    settings_reverse_proxy, span
+):
+    """Test stale responses are revalidated with a conditional request."""
+    upstream_requests = []
+
+    def handler(req: httpx.Request) -> httpx.Response:
+        upstream_requests.append(req)
+        if req.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"etag": '"v1"'})
+        return httpx.Response(
+            200,
+            headers={"cache-control": "no-cache", "etag": '"v1"'},
+            content=b"body",
+        )
+
+    settings_reverse_proxy.proxyrules_cache_enabled = True
+    strategy = ProxyRulesStrategy(settings_reverse_proxy)
+    strategy.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    url = "https://api.target.com/projects/1234"
+
+    response = await strategy.reverse_proxy(cached_get_request(span), url)
+    assert response.headers["x-mockstack-cache"] == "MISS"
+
+    response = await strategy.reverse_proxy(cached_get_request(span), url)
+    assert response.headers["x-mockstack-cache"] == "REVALIDATED"
+    assert response.status_code == 200
+    assert response.body == b"body"
+    assert len(upstream_requests) == 2
+
+    await strategy.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_proxy_rules_strategy_cached_reverse_proxy_stale_while_revalidate(
+    settings_reverse_proxy, span
+):
+    """Test stale responses are served while revalidating in the background."""
+    versions = iter([b"v1", b"v2"])
+
+    def handler(req: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"cache-control": "max-age=0, stale-while-revalidate=60"},
+            content=next(versions),
+        )
+
+    settings_reverse_proxy.proxyrules_cache_enabled = True
+    strategy = ProxyRulesStrategy(settings_reverse_proxy)
+    strategy.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    url = "https://api.target.com/projects/1234"
+
+    await strategy.reverse_proxy(cached_get_request(span), url)
+
+    response = await strategy.reverse_proxy(cached_get_request(span), url)
+    assert response.headers["x-mockstack-cache"] == "STALE"
+    assert response.body == b"v1"
+
+    await asyncio.gather(*strategy._revalidations.values())
+
+    response = await strategy.reverse_proxy(cached_get_request(span), url)
+    assert response.body == b"v2"
+
+    await strategy.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_proxy_rules_strategy_stale_while_revalidate_failure(
+    settings_reverse_proxy, span, caplog
+):
+    """Test failures to revalidate in the background are logged."""
+    responses = iter(
+        [
+            httpx.Response(
+                200,
+                headers={"cache-control": "max-age=0, stale-while-revalidate=60"},
+                content=b"v1",
+            )
+        ]
+    )
+
+    def handler(req: httpx.Request) -> httpx.Response:
+        try:
+            return next(responses)
+        except StopIteration:
+            raise httpx.ConnectError("upstream is down")
+
+    settings_reverse_proxy.proxyrules_cache_enabled = True
+    strategy = ProxyRulesStrategy(settings_reverse_proxy)
+    strategy.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    url = "https://api.target.com/projects/1234"
+
+    await strategy.reverse_proxy(cached_get_request(span), url)
+    response = await strategy.reverse_proxy(cached_get_request(span), url)
+    assert response.headers["x-mockstack-cache"] == "STALE"
+
+    await asyncio.gather(*strategy._revalidations.values())
+    assert f"Failed to revalidate {url}" in caplog.text
+
+    await strategy.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_proxy_rules_strategy_coalesces_requests(settings_reverse_proxy, span):
+    """Test identical concurrent requests share a single upstream call."""
+    upstream_requests = []
+    release = asyncio.Event()
+
+    async def handler(req: httpx.Request) -> httpx.Response:
+        upstream_requests.append(req)
+        await release.wait()
+        return httpx.Response(200, content=b'{"id": "1234"}')
+
+    settings_reverse_proxy.proxyrules_coalesce_requests = True
+    strategy = ProxyRulesStrategy(settings_reverse_proxy)
+    strategy.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    url = "https://api.target.com/projects/1234"
+
+    requests = [cached_get_request(span) for _ in range(10)]
+    requests.append(
+        cached_get_request(span, headers=[(b"authorization", b"Bearer other")])
+    )
+    tasks = [
+        asyncio.create_task(strategy.reverse_proxy(request, url))
+        for request in requests
+    ]
+    await asyncio.sleep(0.01)
+    release.set()
+    responses = await asyncio.gather(*tasks)
+
+    assert all(response.status_code == 200 for response in responses)
+    assert all(response.body == b'{"id": "1234"}' for response in responses)
+    # requests with different credentials are never coalesced.
+    assert len(upstream_requests) == 2
+
+    await strategy.shutdown()
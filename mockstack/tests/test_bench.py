@@ -0,0 +1,180 @@
+"""Tests for the bench module."""
+
+import json
+import socket
+
+import pytest
+
+from mockstack.bench import (
+    BenchMode,
+    BenchRequest,
+    BenchResult,
+    bench,
+    load_traffic_file,
+    percentile,
+    report_for,
+    run,
+)
+from mockstack.embedding import EmbeddedSettings
+
+
+@pytest.fixture
+def bench_settings(templates_dir):
+    """Settings for benchmarking the test templates."""
+    return EmbeddedSettings(strategy="filefixtures", templates_dir=templates_dir)
+
+
+@pytest.mark.parametrize(
+    "spec,method,path",
+    [
+        ("/api/v1/projects", "GET", "/api/v1/projects"),
+        ("post /api/v1/projects", "POST", "/api/v1/projects"),
+        ("  DELETE /api/v1/projects/1234 ", "DELETE", "/api/v1/projects/1234"),
+    ],
+)
+def test_bench_request_from_spec(spec, method, path):
+    """Test parsing requests given on the command line."""
+    request = BenchRequest.from_spec(spec)
+
+    assert request.method == method
+    assert request.path == path
+
+
+def test_bench_request_from_dict():
+    """Test parsing recorded requests, with JSON bodies."""
+    request = BenchRequest.from_dict(
+        {"method": "post", "path": "/api/v1/projects", "body": {"name": "new"}}
+    )
+
+    assert request.method == "POST"
+    assert request.headers == {"content-type": "application/json"}
+    assert json.loads(request.body or b"") == {"name": "new"}
+    assert BenchRequest.from_dict({"path": "/", "body": "raw"}).body == b"raw"
+
+
+def test_load_traffic_file(tmp_path):
+    """Test loading recorded traffic, skipping blank lines."""
+    traffic_file = tmp_path / "traffic.jsonl"
+    traffic_file.write_text(
+        '{"path": "/example-template"}\n\n{"method": "POST", "path": "/api/v1/x"}\n'
+    )
+
+    assert load_traffic_file(traffic_file) == [
+        BenchRequest(method="GET", path="/example-template"),
+        BenchRequest(method="POST", path="/api/v1/x"),
+    ]
+
+
+def test_percentile():
+    """Test nearest-rank percentiles."""
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([3.0], 90) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+def test_report_for():
+    """Test reports are broken down by route, counting server errors as failed."""
+    results = [
+        BenchResult(route="a.j2", duration=0.001, status_code=200),
+        BenchResult(route="a.j2", duration=0.003, status_code=500),
+        BenchResult(route="unmatched", duration=0.002, error="ConnectError"),
+        BenchResult(route="unmatched", duration=0.002, status_code=404),
+    ]
+
+    report = report_for(results, elapsed=2.0)
+
+    assert report["requests"] == 4
+    assert report["rps"] == 2.0
+    assert report["errors"] == 2
+    assert report["error_rate"] == 0.5
+    assert report["latency_ms"]["max"] == pytest.approx(3.0)
+    assert report["status_codes"] == {
+        "200": 1,
+        "404": 1,
+        "500": 1,
+        "ConnectError": 1,
+    }
+    assert list(report["routes"]) == ["a.j2", "unmatched"]
+    assert report["routes"]["a.j2"]["requests"] == 2
+    assert report["routes"]["a.j2"]["error_rate"] == 0.5
+    assert report_for(results, elapsed=2.0, by_route=False)["routes"] is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", list(BenchMode))
+async def test_bench(bench_settings, mode):
+    """Test benchmarking the app, with a breakdown by route."""
+    report = await bench(
+        bench_settings,
+        [
+            BenchRequest.from_spec("GET /example-template"),
+            BenchRequest.from_spec("GET /api/v1/missing"),
+        ],
+        mode=mode,
+        concurrency=2,
+        total=20,
+        warmup=2,
+    )
+
+    assert report["requests"] == 20
+    assert report["errors"] == 0
+    assert report["status_codes"] == {"200": 10, "404": 10}
+    assert sum(route["requests"] for route in report["routes"].values()) == 20
+    assert report["routes"]["example-template.j2"]["requests"] == 10
+
+
+@pytest.mark.asyncio
+async def test_bench_requires_total_or_duration(bench_settings):
+    """Test the number of requests is bounded."""
+    with pytest.raises(ValueError):
+        await bench(bench_settings, [BenchRequest.from_spec("/")])
+
+
+def test_run(templates_dir, tmp_path):
+    """Test the bench command writing a JSON report."""
+    report_file = tmp_path / "report.json"
+
+    report = run(
+        [
+            "--templates-dir",
+            templates_dir,
+            "--request",
+            "/example-template",
+            "--total",
+            "5",
+            "--concurrency",
+            "1",
+            "--json",
+            str(report_file),
+        ]
+    )
+
+    assert report["requests"] == 5
+    assert json.loads(report_file.read_text()) == report
+
+
+def test_run_url(tmp_path):
+    """Test the bench command for a running mockstack needs no settings."""
+    with socket.create_server(("127.0.0.1", 0)) as sock:
+        port = sock.getsockname()[1]
+
+    report = run(
+        [
+            "--url",
+            f"http://127.0.0.1:{port}",
+            "--request",
+            "/example-template",
+            "--total",
+            "3",
+            "--json",
+            "-",
+        ]
+    )
+
+    assert report["requests"] == 3
+    assert report["errors"] == 3
+    assert report["routes"] is None
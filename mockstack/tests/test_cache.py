@@ -0,0 +1,122 @@
+"""Tests for the cache module."""
+
+import os
+
+from mockstack.cache import DiskCache, LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test the LRU cache evicts the least recently used entries."""
+    cache: LRUCache[str, int] = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert len(cache) == 2
+
+
+def test_lru_cache_bounded_by_size():
+    """Test the LRU cache can be bounded by the size of its values."""
+    cache: LRUCache[str, bytes] = LRUCache(10, sizeof=len)
+    cache.set("a", b"12345")
+    cache.set("b", b"1234")
+    assert cache.size == 9
+
+    cache.set("c", b"12")
+    assert "a" not in cache
+    assert cache.size == 6
+
+    # values larger than the whole cache are never stored.
+    cache.set("d", b"12345678901")
+    assert "d" not in cache
+
+    # replacing a value accounts for the size of the previous value.
+    cache.set("b", b"1")
+    assert cache.size == 3
+
+
+def test_lru_cache_counters():
+    """Test hit and miss counters."""
+    cache: LRUCache[str, int] = LRUCache(2)
+    cache.set("a", 1)
+
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    assert cache.hits == 2
+    assert cache.misses == 1
+
+
+def test_lru_cache_on_evict():
+    """Test the eviction callback is called for evicted entries only."""
+    evicted = []
+    cache: LRUCache[str, int] = LRUCache(
+        2, on_evict=lambda key, value: evicted.append((key, value))
+    )
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.pop("b")
+    cache.set("c", 3)
+    cache.set("d", 4)
+
+    assert evicted == [("a", 1)]
+
+
+def test_disk_cache(tmp_path):
+    """Test storing, reading and deleting values on disk."""
+    cache = DiskCache(tmp_path / "cache")
+
+    assert cache.get("key") is None
+    cache.set("key", b"value")
+    assert cache.get("key") == b"value"
+
+    # persisted across instances.
+    assert DiskCache(tmp_path / "cache").get("key") == b"value"
+
+    cache.delete("key")
+    assert cache.get("key") is None
+    cache.delete("key")
+
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+def test_disk_cache_max_bytes(tmp_path):
+    """Test least recently used values are pruned beyond max_bytes."""
+    cache = DiskCache(tmp_path / "cache", max_bytes=100)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.set(key, b"x" * 30)
+        # distinct modification times, which filesystems may not resolve.
+        os.utime(cache.path_for(key), (1000 + i, 1000 + i))
+
+    # reading "a" marks it as recently used.
+    assert cache.get("a") is not None
+    cache.set("d", b"x" * 30)
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in ["a", "c", "d"])
+    assert cache.size == 90
+
+    # too large to be stored at all, replacing any previous value.
+    cache.set("a", b"x" * 101)
+    assert cache.get("a") is None
+    assert cache.size == 60
+
+
+def test_disk_cache_max_bytes_existing(tmp_path):
+    """Test values stored before a restart count towards max_bytes."""
+    previous = DiskCache(tmp_path / "cache")
+    previous.set("a", b"x" * 80)
+    os.utime(previous.path_for("a"), (1000, 1000))
+
+    cache = DiskCache(tmp_path / "cache", max_bytes=100)
+    cache.set("b", b"x" * 30)
+
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
@@ -0,0 +1,229 @@
+"""Tests for the datasets module."""
+
+import json
+from array import array
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from mockstack.datasets import (
+    IS_PYARROW_AVAILABLE,
+    Dataset,
+    Datasets,
+    compact_column,
+    load_csv,
+    load_jsonl,
+    load_parquet,
+)
+from mockstack.main import create_app
+
+CUSTOMERS_CSV = """id,name,country,balance,zip
+1001,Ada,UK,10.5,007
+1002,Grace,US,0.25,10001
+1003,Linus,FI,-3.0,00100
+1004,Barbara,US,12.0,02134
+"""
+
+
+@pytest.fixture
+def datasets_dir(tmp_path):
+    """A directory with a CSV and a JSON lines dataset."""
+    (tmp_path / "customers.csv").write_text(CUSTOMERS_CSV)
+    (tmp_path / "orders.jsonl").write_text(
+        "\n".join(
+            json.dumps(order)
+            for order in [
+                {"id": "o-1", "customer_id": 2, "total": 30},
+                {"id": "o-2", "customer_id": 4, "total": 12, "tags": ["gift"]},
+                {"id": "o-3", "customer_id": 2, "total": 7},
+            ]
+        )
+    )
+    (tmp_path / "README.md").write_text("not a dataset")
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "values,parse,expected",
+    [
+        ([1, 2, 3], False, array("q", [1, 2, 3])),
+        ([1, 2.5], False, array("d", [1.0, 2.5])),
+        (["1", "2"], True, array("q", [1, 2])),
+        (["1.5", "-2.0"], True, array("d", [1.5, -2.0])),
+        (["1", "2"], False, ["1", "2"]),
+        # leading zeros would be lost as numbers.
+        (["007", "10001"], True, ["007", "10001"]),
+        (["1", ""], True, ["1", ""]),
+        ([True, False], False, [True, False]),
+        ([1, None], False, [1, None]),
+    ],
+)
+def test_compact_column(values, parse, expected):
+    """Test columns are stored in typed arrays when lossless."""
+    column = compact_column(values, parse=parse)
+    assert type(column) is type(expected)
+    assert column == expected
+
+
+def test_compact_column_deduplicates_strings():
+    """Test repeated strings are shared by the rows of a column."""
+    column = compact_column(["".join(["U", "S"]), "".join(["U", "S"])])
+    assert column[0] is column[1]
+
+
+def test_load_csv(datasets_dir):
+    """Test loading a CSV dataset into typed columns."""
+    dataset = load_csv(datasets_dir / "customers.csv", index_columns=["id"])
+
+    assert dataset.name == "customers"
+    assert len(dataset) == 4
+    assert dataset.columns["id"] == array("q", [1001, 1002, 1003, 1004])
+    assert dataset.row(0) == {
+        "id": 1001,
+        "name": "Ada",
+        "country": "UK",
+        "balance": 10.5,
+        "zip": "007",
+    }
+
+
+def test_load_csv_misaligned_rows(tmp_path, caplog):
+    """Test short rows are padded, and rows with extra values are skipped."""
+    path = tmp_path / "customers.csv"
+    path.write_text("id,name,country\n1001,Ada,UK\n1002,Grace\n1003,Linus,FI,extra\n")
+
+    dataset = load_csv(path)
+
+    assert list(dataset) == [
+        {"id": 1001, "name": "Ada", "country": "UK"},
+        {"id": 1002, "name": "Grace", "country": None},
+    ]
+    assert "Skipping row 4" in caplog.text
+
+
+def test_load_jsonl(datasets_dir):
+    """Test loading a JSON lines dataset, padding missing fields."""
+    dataset = load_jsonl(datasets_dir / "orders.jsonl", index_columns=["id"])
+
+    assert len(dataset) == 3
+    assert list(dataset.columns) == ["id", "customer_id", "total", "tags"]
+    assert [row["tags"] for row in dataset] == [None, ["gift"], None]
+
+
+@pytest.mark.skipif(IS_PYARROW_AVAILABLE, reason="pyarrow is installed")
+def test_load_parquet_without_pyarrow(tmp_path):
+    """Test a helpful error is raised when Parquet support is not installed."""
+    with pytest.raises(RuntimeError, match="mockstack\\[parquet\\]"):
+        load_parquet(tmp_path / "customers.parquet")
+
+
+def test_load_parquet(tmp_path):
+    """Test loading a Parquet dataset."""
+    pyarrow = pytest.importorskip("pyarrow")
+    parquet = pytest.importorskip("pyarrow.parquet")
+
+    path = tmp_path / "customers.parquet"
+    parquet.write_table(pyarrow.table({"id": [1, 2], "name": ["Ada", "Grace"]}), path)
+
+    dataset = load_parquet(path, index_columns=["id"])
+
+    assert dataset.columns["id"] == array("q", [1, 2])
+    assert dataset.get("2") == {"id": 2, "name": "Grace"}
+
+
+def test_dataset_get(datasets_dir):
+    """Test looking up rows by indexed and non-indexed columns."""
+    dataset = load_csv(datasets_dir / "customers.csv", index_columns=["id"])
+
+    assert dataset.get(1003)["name"] == "Linus"
+    # as given in paths and query strings.
+    assert dataset.get("1003")["name"] == "Linus"
+    assert dataset.get("1005") is None
+    assert dataset.get("US", column="country")["name"] == "Grace"
+    assert dataset.get("02134", column="zip")["name"] == "Barbara"
+
+
+def test_dataset_get_without_index():
+    """Test lookups need a column when none is indexed."""
+    dataset = Dataset("empty", {"id": [1]})
+
+    with pytest.raises(ValueError, match="no indexed columns"):
+        dataset.get(1)
+
+
+def test_dataset_filter(datasets_dir):
+    """Test filtering rows by column values, ignoring other names."""
+    dataset = load_csv(datasets_dir / "customers.csv", index_columns=["id", "country"])
+
+    rows = dataset.filter({"country": "US", "page": "2"})
+    assert [row["name"] for row in rows] == ["Grace", "Barbara"]
+    assert dataset.filter(country="US", balance="12.0")[0]["name"] == "Barbara"
+    assert dataset.filter(country="US", id="1001") == []
+    assert dataset.filter(balance="not a number") == []
+    assert [row["id"] for row in dataset.filter()] == [1001, 1002, 1003, 1004]
+    assert [row["id"] for row in dataset.filter(limit=2, offset=1)] == [1002, 1003]
+    assert dataset.count(country="US") == 2
+
+
+def test_dataset_page(datasets_dir):
+    """Test pages of rows are returned along with the number of matching rows."""
+    dataset = load_csv(datasets_dir / "customers.csv", index_columns=["id", "country"])
+
+    total, rows = dataset.page(limit=2, offset=3)
+    assert total == 4
+    assert [row["id"] for row in rows] == [1004]
+    total, rows = dataset.page({"country": "US"}, limit=1, offset=1)
+    assert (total, [row["id"] for row in rows]) == (2, [1004])
+    total, rows = dataset.page({"balance": "0.25", "limit": "1"}, limit=5)
+    assert (total, [row["id"] for row in rows]) == (1, [1002])
+    assert dataset.page({"country": "FR"}, limit=5) == (0, [])
+
+
+def test_dataset_index_duplicates(datasets_dir):
+    """Test indexes keep all rows of repeated values, in order."""
+    dataset = load_jsonl(datasets_dir / "orders.jsonl", index_columns=["customer_id"])
+
+    assert dataset.indexes["customer_id"] == {"2": [0, 2], "4": 1}
+    assert [row["id"] for row in dataset.filter(customer_id=2)] == ["o-1", "o-3"]
+    assert dataset.filter(tags=json.dumps(["gift"]))[0]["id"] == "o-2"
+
+
+def test_datasets(datasets_dir):
+    """Test datasets are found by name and loaded on first use."""
+    datasets = Datasets(datasets_dir)
+
+    assert list(datasets) == ["customers", "orders"]
+    assert "customers" in datasets
+    assert not datasets._datasets
+
+    assert datasets.customers is datasets["customers"]
+    assert datasets.orders.get("o-2")["total"] == 12
+    with pytest.raises(AttributeError):
+        _ = datasets.suppliers
+    with pytest.raises(KeyError):
+        _ = datasets["suppliers"]
+
+
+def test_datasets_template_global(settings_filefixtures, datasets_dir, tmp_path):
+    """Test templates look up and filter datasets."""
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "api-v1-customers.j2").write_text(
+        "{% if customers is defined %}"
+        "{{ datasets.customers.get(customers) | tojson }}"
+        "{% else %}"
+        "{{ datasets.customers.filter(query) | map(attribute='name') | list | tojson }}"
+        "{% endif %}"
+    )
+    settings = settings_filefixtures.model_copy(
+        update={"templates_dir": templates_dir, "datasets_dir": datasets_dir}
+    )
+
+    with TestClient(create_app(settings=settings)) as client:
+        response = client.get("/api/v1/customers/1002")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["name"] == "Grace"
+
+        response = client.get("/api/v1/customers", params={"country": "US"})
+        assert response.json() == ["Grace", "Barbara"]
@@ -18,3 +18,6 @@ def test_announce(app, settings):
         # Check that the log message contains the expected information
         first_log_message = mock_logger.info.call_args[0][0]
         assert "OpenTelemetry" in first_log_message
+
+        messages = [call[0][0] for call in mock_logger.info.call_args_list]
+        assert any("loop:" in message and "http:" in message for message in messages)
@@ -0,0 +1,105 @@
+"""Tests for the embedding module."""
+
+import httpx
+import pytest
+
+from mockstack.config import Settings
+from mockstack.embedding import BASE_URL, EmbeddedMockStack, EmbeddedSettings
+
+
+@pytest.fixture
+def embedded(templates_dir):
+    """An embedded mockstack serving the test templates."""
+    return EmbeddedMockStack(
+        strategy="filefixtures",
+        templates_dir=templates_dir,
+        filefixtures_enable_templates_for_post=False,
+    )
+
+
+def test_embedded_settings_ignore_environment(templates_dir, monkeypatch):
+    """Test embedded settings are not read from the environment."""
+    monkeypatch.setenv("MOCKSTACK__PORT", "1234")
+
+    settings = EmbeddedSettings(templates_dir=templates_dir)
+
+    assert settings.port == 8000
+    assert Settings(templates_dir=templates_dir).port == 1234
+
+
+def test_embedded_settings_ignore_environment_for_nested_settings(
+    templates_dir, monkeypatch
+):
+    """Test nested embedded settings are not read from the environment either."""
+    monkeypatch.setenv("MOCKSTACK__METRICS__PATH", "/leaked")
+    monkeypatch.setenv("MOCKSTACK__SERVER__ACCESS_LOG", "false")
+    monkeypatch.setenv("ENABLED", "true")
+
+    settings = EmbeddedSettings(templates_dir=templates_dir)
+
+    assert settings.metrics.path == "/__mockstack__/metrics"
+    assert settings.server.access_log is True
+    assert settings.opentelemetry.enabled is False
+
+    settings = EmbeddedSettings(templates_dir=templates_dir, server={"backlog": 10})
+    assert settings.server.backlog == 10
+    assert settings.server.access_log is True
+
+
+def test_embedded_settings_overrides(settings):
+    """Test overriding some of the given settings."""
+    embedded = EmbeddedMockStack(settings, strategy="filefixtures")
+
+    assert embedded.settings.strategy == "filefixtures"
+    assert embedded.settings.templates_dir == settings.templates_dir
+
+
+def test_embedded_transport(embedded):
+    """Test requests through the sync httpx transport."""
+    with embedded:
+        with httpx.Client(transport=embedded.transport(), base_url=BASE_URL) as client:
+            response = client.get("/example-template")
+            missing = client.get("/api/v1/missing")
+            created = client.post("/api/v1/projects", json={"name": "new"})
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "example-template"
+    assert missing.status_code == 404
+    assert created.status_code == 201
+    assert created.json()["name"] == "new"
+
+
+def test_embedded_transport_requires_sync_context(embedded):
+    """Test the sync transport is only available within `with`."""
+    with pytest.raises(RuntimeError, match="with"):
+        embedded.transport()
+
+
+@pytest.mark.asyncio
+async def test_embedded_async_transport(embedded):
+    """Test requests through the async httpx transport."""
+    async with embedded:
+        async with httpx.AsyncClient(
+            transport=embedded.async_transport(), base_url=BASE_URL
+        ) as client:
+            response = await client.get("/example-template")
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "example-template"
+
+
+def test_embedded_requests_adapter(embedded):
+    """Test requests through a `requests` session."""
+    requests = pytest.importorskip("requests")
+
+    with embedded:
+        with requests.Session() as session:
+            session.mount(BASE_URL, embedded.requests_adapter())
+            response = session.get(f"{BASE_URL}/example-template")
+            created = session.post(f"{BASE_URL}/api/v1/projects", json={"name": "new"})
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "example-template"
+    assert response.headers["Content-Type"].startswith("application/json")
+    assert created.status_code == 201
+    assert created.json()["name"] == "new"
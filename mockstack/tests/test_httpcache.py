@@ -0,0 +1,157 @@
+"""Tests for the httpcache module."""
+
+import pytest
+
+from mockstack.httpcache import (
+    CachedResponse,
+    HttpCache,
+    is_storable,
+    parse_cache_control,
+)
+
+
+def cached_response(headers, *, stored_at=1000.0, content=b"body"):
+    """Create a cached response with the given headers."""
+    return CachedResponse(
+        status_code=200,
+        headers=list(headers.items()),
+        content=content,
+        stored_at=stored_at,
+    )
+
+
+def test_parse_cache_control():
+    """Test parsing Cache-Control header values."""
+    assert parse_cache_control(None) == {}
+    assert parse_cache_control('Max-Age=60, no-cache, private="set-cookie"') == {
+        "max-age": "60",
+        "no-cache": None,
+        "private": "set-cookie",
+    }
+
+
+@pytest.mark.parametrize(
+    "headers,expected",
+    [
+        ({"cache-control": "max-age=60"}, 60),
+        ({"cache-control": "max-age=60, s-maxage=120"}, 120),
+        (
+            {
+                "expires": "Thu, 01 Jan 2025 00:01:00 GMT",
+                "date": "Thu, 01 Jan 2025 00:00:00 GMT",
+            },
+            60,
+        ),
+        ({"expires": "0"}, 0),
+        ({"etag": '"abc"'}, None),
+    ],
+)
+def test_cached_response_freshness_lifetime(headers, expected):
+    """Test computing the freshness lifetime of a response."""
+    assert cached_response(headers).freshness_lifetime() == expected
+
+
+def test_cached_response_freshness():
+    """Test freshness and stale-while-revalidate windows."""
+    response = cached_response(
+        {"cache-control": "max-age=60, stale-while-revalidate=30", "age": "10"}
+    )
+
+    assert response.is_fresh(1049.0)
+    assert not response.is_fresh(1051.0)
+    assert response.can_serve_stale(1051.0)
+    assert not response.can_serve_stale(1081.0)
+
+    no_cache = cached_response({"cache-control": "max-age=60, no-cache"})
+    assert not no_cache.is_fresh(1000.0)
+
+    must_revalidate = cached_response(
+        {"cache-control": "max-age=0, stale-while-revalidate=30, must-revalidate"}
+    )
+    assert not must_revalidate.can_serve_stale(1001.0)
+
+
+def test_cached_response_validators_and_revalidated():
+    """Test revalidation headers and refreshing from a 304 response."""
+    response = cached_response(
+        {
+            "etag": '"v1"',
+            "last-modified": "Thu, 01 Jan 2025 00:00:00 GMT",
+            "cache-control": "max-age=0",
+            "content-length": "4",
+        }
+    )
+
+    assert response.validators() == {
+        "if-none-match": '"v1"',
+        "if-modified-since": "Thu, 01 Jan 2025 00:00:00 GMT",
+    }
+
+    revalidated = response.revalidated(
+        [("Cache-Control", "max-age=60"), ("content-length", "0")], now=2000.0
+    )
+    assert revalidated.stored_at == 2000.0
+    assert revalidated.header("cache-control") == "max-age=60"
+    assert revalidated.header("content-length") == "4"
+    assert revalidated.content == b"body"
+
+
+def test_cached_response_serialization():
+    """Test round-tripping a response through bytes."""
+    response = cached_response(
+        {"content-type": "application/json"}, content=b'{"a":\n1}'
+    )
+    assert CachedResponse.from_bytes(response.to_bytes()) == response
+
+
+@pytest.mark.parametrize(
+    "request_headers,status_code,response_headers,expected",
+    [
+        ({}, 200, {"cache-control": "max-age=60"}, True),
+        ({}, 200, {"etag": '"v1"'}, True),
+        ({}, 200, {}, False),
+        ({}, 500, {"cache-control": "max-age=60"}, False),
+        ({}, 200, {"cache-control": "max-age=60, private"}, False),
+        ({}, 200, {"cache-control": "no-store"}, False),
+        ({"cache-control": "no-store"}, 200, {"cache-control": "max-age=60"}, False),
+        ({}, 200, {"cache-control": "max-age=60", "vary": "*"}, False),
+        ({"authorization": "Bearer x"}, 200, {"cache-control": "max-age=60"}, False),
+        (
+            {"authorization": "Bearer x"},
+            200,
+            {"cache-control": "max-age=60, public"},
+            True,
+        ),
+    ],
+)
+def test_is_storable(request_headers, status_code, response_headers, expected):
+    """Test which responses may be stored."""
+    assert is_storable(request_headers, status_code, response_headers) == expected
+
+
+@pytest.mark.asyncio
+async def test_http_cache_vary():
+    """Test cached responses are keyed on the headers named by Vary."""
+    cache = HttpCache(max_bytes=1024)
+    response = cached_response(
+        {"cache-control": "max-age=60", "vary": "Accept-Language"}
+    )
+
+    await cache.set("GET", "http://a/b", {"accept-language": "en"}, response)
+
+    assert await cache.get("GET", "http://a/b", {"accept-language": "en"}) == response
+    assert await cache.get("GET", "http://a/b", {"accept-language": "fr"}) is None
+    assert await cache.get("GET", "http://a/c", {"accept-language": "en"}) is None
+
+
+@pytest.mark.asyncio
+async def test_http_cache_disk_tier(tmp_path):
+    """Test cached responses are persisted to the disk tier."""
+    response = cached_response({"cache-control": "max-age=60"})
+    await HttpCache(max_bytes=1024, directory=tmp_path).set(
+        "GET", "http://a/b", {}, response
+    )
+
+    cache = HttpCache(max_bytes=1024, directory=tmp_path)
+    assert await cache.get("GET", "http://a/b", {}) == response
+    assert len(cache.memory) == 1
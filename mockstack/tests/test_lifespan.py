@@ -0,0 +1,23 @@
+"""Tests for the lifespan module."""
+
+from mockstack.config import ServerSettings
+from mockstack.lifespan import logging_dict_config_from
+
+
+def test_logging_dict_config_access_log_disabled(settings):
+    """Test the access logger is silenced when the access log is disabled."""
+    settings.server = ServerSettings(access_log=False)
+
+    config = logging_dict_config_from(settings)
+
+    assert config["loggers"]["uvicorn.access"] == {
+        "handlers": [],
+        "propagate": False,
+    }
+
+
+def test_logging_dict_config_access_log_enabled(settings):
+    """Test the access logger is left alone by default."""
+    config = logging_dict_config_from(settings)
+
+    assert "uvicorn.access" not in config["loggers"]
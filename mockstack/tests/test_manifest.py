@@ -0,0 +1,182 @@
+"""Tests for the templates manifest module."""
+
+import asyncio
+import os
+
+import pytest
+
+from mockstack.constants import TemplatesManifestWatchMode
+from mockstack.manifest import ManifestChange, TemplatesManifest
+
+
+@pytest.fixture
+def manifest_dir(tmp_path):
+    """Create a templates directory with a few files."""
+    (tmp_path / "api-v1-projects.j2").write_text("{}")
+    (tmp_path / "index.j2").write_text("{}")
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "api-v1-items.j2").write_text("[]")
+    return tmp_path
+
+
+def test_manifest_build(manifest_dir):
+    """Test building the manifest from the templates directory."""
+    manifest = TemplatesManifest(manifest_dir)
+    manifest.build()
+
+    assert len(manifest) == 3
+    assert "api-v1-projects.j2" in manifest
+    assert "index.j2" in manifest
+    assert "nested/api-v1-items.j2" in manifest
+    assert "missing.j2" not in manifest
+
+
+def test_manifest_apply(manifest_dir):
+    """Test applying incremental changes to the manifest."""
+    manifest = TemplatesManifest(manifest_dir)
+    manifest.build()
+
+    (manifest_dir / "api-v1-users.j2").write_text("{}")
+    os.remove(manifest_dir / "index.j2")
+
+    applied = manifest.apply(
+        [
+            (ManifestChange.ADDED, "api-v1-users.j2"),
+            (ManifestChange.DELETED, "index.j2"),
+            (ManifestChange.DELETED, "never-existed.j2"),
+        ]
+    )
+
+    assert applied == [
+        (ManifestChange.ADDED, "api-v1-users.j2"),
+        (ManifestChange.DELETED, "index.j2"),
+    ]
+    assert "api-v1-users.j2" in manifest
+    assert "index.j2" not in manifest
+
+
+def test_manifest_apply_modified_missing_file(manifest_dir):
+    """Test that a modification event for a vanished file is treated as a delete."""
+    manifest = TemplatesManifest(manifest_dir)
+    manifest.build()
+    os.remove(manifest_dir / "index.j2")
+
+    applied = manifest.apply([(ManifestChange.MODIFIED, "index.j2")])
+
+    assert applied == [(ManifestChange.DELETED, "index.j2")]
+    assert "index.j2" not in manifest
+
+
+def test_manifest_refresh(manifest_dir):
+    """Test re-scanning the directory yields the difference."""
+    manifest = TemplatesManifest(manifest_dir)
+    manifest.build()
+
+    (manifest_dir / "api-v1-users.j2").write_text("{}")
+    os.remove(manifest_dir / "index.j2")
+    mtime = manifest.entries["api-v1-projects.j2"]
+    os.utime(manifest_dir / "api-v1-projects.j2", (mtime + 10, mtime + 10))
+
+    changes = manifest.refresh()
+
+    assert sorted(changes) == sorted(
+        [
+            (ManifestChange.ADDED, "api-v1-users.j2"),
+            (ManifestChange.DELETED, "index.j2"),
+            (ManifestChange.MODIFIED, "api-v1-projects.j2"),
+        ]
+    )
+    assert manifest.refresh() == []
+
+
+@pytest.mark.asyncio
+async def test_manifest_watch_poll(manifest_dir):
+    """Test the polling watcher picks up new files."""
+    manifest = TemplatesManifest(manifest_dir)
+    manifest.build()
+
+    received = asyncio.Queue()
+    task = asyncio.create_task(
+        manifest.watch(
+            mode=TemplatesManifestWatchMode.POLL,
+            poll_interval=0.01,
+            on_change=received.put_nowait,
+        )
+    )
+    try:
+        (manifest_dir / "api-v1-users.j2").write_text("{}")
+        changes = await asyncio.wait_for(received.get(), timeout=5)
+    finally:
+        task.cancel()
+
+    assert changes == [(ManifestChange.ADDED, "api-v1-users.j2")]
+    assert "api-v1-users.j2" in manifest
+
+
+@pytest.mark.asyncio
+async def test_manifest_watch_none(manifest_dir):
+    """Test that watching can be disabled."""
+    manifest = TemplatesManifest(manifest_dir)
+    await asyncio.wait_for(
+        manifest.watch(mode=TemplatesManifestWatchMode.NONE), timeout=1
+    )
+
+
+def test_manifest_apply_directories(manifest_dir, tmp_path_factory):
+    """Test directories moved in or out apply to all templates under them."""
+    manifest = TemplatesManifest(manifest_dir)
+    manifest.build()
+
+    outside = tmp_path_factory.mktemp("outside")
+    os.rename(manifest_dir / "nested", outside / "nested")
+    applied = manifest.apply([(ManifestChange.DELETED, "nested")])
+
+    assert applied == [(ManifestChange.DELETED, "nested/api-v1-items.j2")]
+    assert "nested/api-v1-items.j2" not in manifest
+
+    (outside / "nested" / "deeper").mkdir()
+    (outside / "nested" / "deeper" / "api-v1-tags.j2").write_text("[]")
+    os.rename(outside / "nested", manifest_dir / "moved")
+    applied = manifest.apply([(ManifestChange.ADDED, "moved")])
+
+    assert sorted(applied) == [
+        (ManifestChange.ADDED, "moved/api-v1-items.j2"),
+        (ManifestChange.ADDED, "moved/deeper/api-v1-tags.j2"),
+    ]
+    assert len(manifest) == 4
+
+
+@pytest.mark.asyncio
+async def test_manifest_watch_restarts_after_failure(manifest_dir, monkeypatch):
+    """Test the watcher logs failures and catches up instead of stopping."""
+    manifest = TemplatesManifest(manifest_dir)
+    manifest.build()
+
+    failures = []
+    iter_polled_changes = manifest._iter_polled_changes
+
+    async def flaky(poll_interval):
+        if not failures:
+            failures.append(True)
+            raise OSError("watch limit reached")
+        async for changes in iter_polled_changes(poll_interval):
+            yield changes
+
+    monkeypatch.setattr(manifest, "_iter_polled_changes", flaky)
+    (manifest_dir / "api-v1-users.j2").write_text("{}")
+
+    received = asyncio.Queue()
+    task = asyncio.create_task(
+        manifest.watch(
+            mode=TemplatesManifestWatchMode.POLL,
+            poll_interval=0.01,
+            on_change=received.put_nowait,
+        )
+    )
+    try:
+        changes = await asyncio.wait_for(received.get(), timeout=5)
+    finally:
+        task.cancel()
+
+    assert failures
+    assert changes == [(ManifestChange.ADDED, "api-v1-users.j2")]
@@ -0,0 +1,76 @@
+"""Tests for the metrics module."""
+
+import pytest
+from fastapi import FastAPI, Request
+from starlette.testclient import TestClient
+
+from mockstack.config import MetricsSettings
+from mockstack.metrics import metrics_provider, request_metrics_for
+from mockstack.middleware import middleware_provider
+from mockstack.routers.catchall import catchall_router_provider
+from mockstack.strategies.filefixtures import FileFixturesStrategy
+
+pytest.importorskip("prometheus_client")
+
+
+@pytest.fixture
+def metrics_app(settings):
+    """Create an app with metrics enabled."""
+    settings.strategy = "filefixtures"
+    settings.metrics = MetricsSettings(enabled=True)
+    app = FastAPI()
+
+    @app.get("/custom")
+    async def custom(request: Request):
+        request_metrics = request_metrics_for(request.scope)
+        assert request_metrics is not None
+        request_metrics.route = "custom-route"
+        request_metrics.upstream_status_code = 502
+        request_metrics.upstream_duration = 0.25
+        return {}
+
+    app.state.strategy = FileFixturesStrategy(settings)
+    middleware_provider(app, settings)
+    metrics_provider(app, settings)
+    catchall_router_provider(app, settings)
+    return app
+
+
+def test_metrics_disabled(app, settings):
+    """Test no middleware is installed when metrics are disabled."""
+    metrics_provider(app, settings)
+    assert app.user_middleware == []
+
+
+def test_metrics_endpoint(metrics_app):
+    """Test request metrics are collected and exposed on the reserved path."""
+    client = TestClient(metrics_app)
+
+    assert client.get("/example/template").status_code == 200
+    assert client.get("/missing").status_code == 404
+    client.get("/custom")
+
+    response = client.get("/__mockstack__/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    metrics = response.text
+
+    assert (
+        'mockstack_request_duration_seconds_count{method="GET",'
+        'route="example-template.j2",strategy="filefixtures"} 1.0'
+    ) in metrics
+    assert (
+        'mockstack_request_duration_seconds_count{method="GET",'
+        'route="unmatched",strategy="filefixtures"} 1.0'
+    ) in metrics
+    assert (
+        'mockstack_template_lookups_total{result="hit",strategy="filefixtures"} 1.0'
+    ) in metrics
+    assert (
+        'mockstack_template_lookups_total{result="miss",strategy="filefixtures"} 1.0'
+    ) in metrics
+    assert (
+        'mockstack_upstream_request_duration_seconds_sum{method="GET",'
+        'status_code="502"} 0.25'
+    ) in metrics
+    assert "mockstack_requests_in_flight 0.0" in metrics
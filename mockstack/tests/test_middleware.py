@@ -1,8 +1,11 @@
 """Tests for the middleware module."""
 
 import time
+from unittest.mock import MagicMock, patch
 
 import pytest
+from fastapi import Request
+from starlette.responses import StreamingResponse
 from starlette.testclient import TestClient
 
 from mockstack.middleware import middleware_provider
@@ -35,3 +38,101 @@ async def test_middleware_provider_process_time(app, settings):
     assert "X-Process-Time" in response.headers
     process_time = float(response.headers["X-Process-Time"])
     assert process_time > 0  # Should be greater than 0 due to sleep
+
+
+@pytest.fixture
+def recording_span():
+    """Patch the tracer to record span attributes in a MagicMock span."""
+    span = MagicMock()
+    with patch("mockstack.middleware.trace") as mock_trace:
+        tracer = mock_trace.get_tracer.return_value
+        tracer.start_as_current_span.return_value.__enter__.return_value = span
+        yield span
+
+
+def test_middleware_provider_opentelemetry(app, settings, recording_span):
+    """Test that requests are traced and the span is available to the app."""
+    settings.opentelemetry.enabled = True
+    middleware_provider(app, settings)
+    client = TestClient(app)
+
+    @app.get("/test")
+    def test_route(request: Request):
+        request.state.span.set_attribute("custom", "value")
+        return {"message": "test"}
+
+    response = client.get("/test", headers={"authorization": "Bearer secret"})
+
+    assert response.status_code == 200
+    recording_span.set_attribute.assert_called_once_with("custom", "value")
+
+    request_attributes, response_attributes = [
+        args[0] for args, _ in recording_span.set_attributes.call_args_list
+    ]
+    assert request_attributes["http.method"] == "GET"
+    assert "http.request.header.authorization" not in request_attributes
+    assert response_attributes["http.status_code"] == 200
+    assert (
+        response_attributes["http.response.header.content-type"] == "application/json"
+    )
+
+
+def test_middleware_provider_opentelemetry_disabled(app, settings, recording_span):
+    """Test that no spans are created when OpenTelemetry is disabled."""
+    middleware_provider(app, settings)
+    client = TestClient(app)
+
+    @app.get("/test")
+    def test_route(request: Request):
+        assert not request.state.span.is_recording()
+        request.state.span.set_attribute("custom", "value")
+        return {"message": "test"}
+
+    response = client.get("/test")
+
+    assert response.status_code == 200
+    recording_span.set_attributes.assert_not_called()
+    recording_span.set_attribute.assert_not_called()
+
+
+def test_middleware_provider_streaming_response_body(app, settings, recording_span):
+    """Test that streaming responses pass through and their body is captured."""
+    settings.opentelemetry.enabled = True
+    settings.opentelemetry.capture_response_body = True
+    middleware_provider(app, settings)
+    client = TestClient(app)
+
+    @app.get("/stream")
+    def stream_route():
+        return StreamingResponse(iter([b"part1", b"part2", b"part3"]))
+
+    with client.stream("GET", "/stream") as response:
+        chunks = list(response.iter_raw())
+
+    assert b"".join(chunks) == b"part1part2part3"
+    assert "X-Process-Time" in response.headers
+    recording_span.set_attributes.assert_called_with(
+        {
+            "http.response.body.size": 15,
+            "http.response.body.truncated": False,
+            "http.response.body": "part1part2part3",
+        }
+    )
+
+
+def test_middleware_provider_response_body_sampling(app, settings, recording_span):
+    """Test that response bodies are only captured for sampled requests."""
+    settings.opentelemetry.enabled = True
+    settings.opentelemetry.capture_response_body = True
+    settings.opentelemetry.capture_response_body_sample_ratio = 0.0
+    middleware_provider(app, settings)
+    client = TestClient(app)
+
+    @app.get("/test")
+    def test_route():
+        return {"message": "test"}
+
+    client.get("/test")
+
+    for args, _ in recording_span.set_attributes.call_args_list:
+        assert "http.response.body" not in args[0]
@@ -0,0 +1,152 @@
+"""Tests for the pagination module."""
+
+import json
+
+import pytest
+
+from mockstack import pagination
+from mockstack.datasets import Dataset
+from mockstack.pagination import (
+    Page,
+    decode_cursor,
+    encode_cursor,
+    json_dumps,
+    paginate,
+)
+from mockstack.templating import templates_env_provider
+
+ITEMS = range(1_000_000)
+
+
+@pytest.fixture
+def customers():
+    """A dataset of customers, indexed by id and country."""
+    return Dataset.from_rows(
+        "customers",
+        ({"id": 1000 + i, "country": "US" if i % 2 else "UK"} for i in range(10)),
+        index_columns=["id", "country"],
+    )
+
+
+@pytest.mark.parametrize("offset", [0, 40, 999_999])
+def test_cursor_round_trip(offset):
+    """Test cursors decode to the offset they were created for."""
+    assert decode_cursor(encode_cursor(offset)) == offset
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", "MTIz", encode_cursor(-1)])
+def test_decode_cursor_invalid(cursor):
+    """Test invalid cursors are rejected."""
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize(
+    "query,offset,limit",
+    [
+        ({}, 0, 20),
+        ({"limit": "50"}, 0, 50),
+        ({"limit": "0"}, 0, 1),
+        ({"limit": "5000"}, 0, 1000),
+        ({"limit": "many"}, 0, 20),
+        ({"offset": "30"}, 30, 20),
+        ({"offset": "-30"}, 0, 20),
+        ({"page": "3", "limit": "10"}, 20, 10),
+        ({"page": "0"}, 0, 20),
+        # cursors take precedence over offsets, which do over pages.
+        ({"offset": "30", "page": "3"}, 30, 20),
+        ({"cursor": encode_cursor(70), "offset": "30"}, 70, 20),
+        ({"cursor": ""}, 0, 20),
+        # invalid cursors fall back to the first page.
+        ({"cursor": "not base64!", "offset": "30"}, 0, 20),
+        ({"cursor": encode_cursor(-1)}, 0, 20),
+    ],
+)
+def test_paginate_query(query, offset, limit):
+    """Test pages are located from the query parameters."""
+    page = paginate(ITEMS, query)
+
+    assert (page.offset, page.limit) == (offset, limit)
+    assert page.items == list(range(offset, offset + limit))
+    assert page.total == len(ITEMS)
+
+
+def test_paginate_custom_params():
+    """Test the names of the query parameters can be customized."""
+    page = paginate(
+        ITEMS, {"per_page": "5", "p": "2"}, limit_param="per_page", page_param="p"
+    )
+
+    assert page.items == [5, 6, 7, 8, 9]
+
+
+def test_paginate_next():
+    """Test next page metadata up to the end of the collection."""
+    page = paginate(range(45), {"page": "2"})
+    assert page.number == 2
+    assert (page.next_offset, page.next_page) == (40, 3)
+    assert decode_cursor(page.next_cursor) == 40
+
+    last = paginate(range(45), {"cursor": page.next_cursor})
+    assert last.items == list(range(40, 45))
+    assert not last.has_next
+    assert last.next_cursor is last.next_offset is last.next_page is None
+
+    beyond = paginate(range(45), {"offset": "100"})
+    assert beyond.items == []
+    assert beyond.total == 45
+
+
+def test_paginate_dataset(customers):
+    """Test datasets are paginated, filtered on columns but not pagination parameters."""
+    page = paginate(customers, {"limit": "2"})
+    assert [row["id"] for row in page.items] == [1000, 1001]
+    assert page.total == 10
+
+    query = {"country": "US", "limit": "2", "page": "2", "id": "ignored"}
+    page = paginate(customers, query, filters={"country": "US", "limit": "2"})
+    assert [row["id"] for row in page.items] == [1005, 1007]
+    assert page.total == 5
+    assert page.next_page == 3
+
+
+@pytest.mark.parametrize("is_orjson_available", [True, False])
+def test_json_dumps(monkeypatch, is_orjson_available):
+    """Test pages and other values serialize alike with or without orjson."""
+    if is_orjson_available and not pagination.IS_ORJSON_AVAILABLE:
+        pytest.skip("orjson is not installed")
+    monkeypatch.setattr(pagination, "IS_ORJSON_AVAILABLE", is_orjson_available)
+
+    page = Page(items=[{"id": 1, "tags": ["a"]}], total=3, offset=0, limit=1)
+
+    assert json.loads(json_dumps(page)) == {
+        "items": [{"id": 1, "tags": ["a"]}],
+        "total": 3,
+        "offset": 0,
+        "limit": 1,
+        "next": encode_cursor(1),
+    }
+    assert (
+        json_dumps({"name": 'say "hi"', 1: None}) == '{"name":"say \\"hi\\"","1":null}'
+    )
+
+
+@pytest.mark.asyncio
+async def test_paginate_template():
+    """Test templates paginate and serialize collections."""
+    env = templates_env_provider()
+    template = env.from_string(
+        "{% set page = paginate(range(1000000), query) %}"
+        '{"items": [{% for i in page.items %}{"id": {{ i }}}{{ "," if not loop.last }}{% endfor %}], '
+        '"total": {{ page.total }}, "next": {{ page.next_cursor | json_dumps }}}'
+    )
+
+    rendered = json.loads(
+        await template.render_async(query={"limit": "3", "page": "2"})
+    )
+
+    assert rendered == {
+        "items": [{"id": 3}, {"id": 4}, {"id": 5}],
+        "total": 1_000_000,
+        "next": encode_cursor(6),
+    }
@@ -0,0 +1,134 @@
+"""Tests for the persistence module."""
+
+import asyncio
+import multiprocessing
+import os
+import sqlite3
+
+import pytest
+
+from mockstack.persistence import SQLiteResourceStore
+
+PROJECTS = ("api-v1-projects", ())
+TASKS = ("api-v1-projects-tasks", ("1234",))
+
+
+@pytest.fixture
+def filename(tmp_path):
+    """Filename of the database."""
+    return tmp_path / "store" / "resources.db"
+
+
+@pytest.mark.asyncio
+async def test_sqlite_resource_store(filename):
+    """Test storing, reading, listing and deleting resources."""
+    store = SQLiteResourceStore(filename, max_bytes=1024, indexed_fields=["state"])
+
+    await store.put(PROJECTS, "1", {"id": "1", "state": "active"})
+    await store.put(PROJECTS, "2", {"id": "2", "state": "archived"})
+    await store.put(PROJECTS, "1", {"id": "1", "state": "archived"})
+    await store.put(TASKS, "1", {"id": "1", "state": "active"})
+
+    assert await store.get(PROJECTS, "1") == {"id": "1", "state": "archived"}
+    assert await store.get(PROJECTS, "3") is None
+    assert await store.count() == 3
+    assert await store.contains(PROJECTS)
+    assert not await store.contains(("api-v1-users", ()))
+
+    # replaced resources move to the end of the store order.
+    assert [r["id"] for r in await store.list(PROJECTS)] == ["2", "1"]
+    assert await store.list(PROJECTS, {"state": "active"}) == []
+    assert await store.list(TASKS, {"state": "active"}) == [
+        {"id": "1", "state": "active"}
+    ]
+    with pytest.raises(ValueError, match="not indexed"):
+        await store.list(PROJECTS, {"name": "x"})
+
+    assert await store.delete(PROJECTS, "1") == {"id": "1", "state": "archived"}
+    assert await store.delete(PROJECTS, "1") is None
+    assert [r["id"] for r in await store.list(PROJECTS, {"state": "archived"})] == ["2"]
+
+    await store.clear()
+    assert await store.count() == 0
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_resource_store_survives_restarts(filename):
+    """Test resources are kept across instances, reindexing changed fields."""
+    store = SQLiteResourceStore(filename, max_bytes=1024)
+    await store.put(PROJECTS, "1", {"id": "1", "state": "active"})
+    await store.close()
+
+    store = SQLiteResourceStore(filename, max_bytes=1024, indexed_fields=["state"])
+
+    assert await store.get(PROJECTS, "1") == {"id": "1", "state": "active"}
+    assert await store.list(PROJECTS, {"state": "active"}) == [
+        {"id": "1", "state": "active"}
+    ]
+    assert (
+        sqlite3.connect(filename).execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    )
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_resource_store_compact(filename):
+    """Test compaction removes expired resources and enforces max_bytes."""
+    now = 0.0
+    store = SQLiteResourceStore(
+        filename, max_bytes=40, ttl=10, indexed_fields=["state"], clock=lambda: now
+    )
+    await store.put(PROJECTS, "1", {"id": "1"})
+    now = 5.0
+    await store.put(PROJECTS, "2", {"id": "2", "state": "active"})
+    await store.put(PROJECTS, "3", {"id": "3", "state": "active"})
+    await store.put(PROJECTS, "4", {"id": "4", "state": "active"})
+
+    now = 10.0
+    assert await store.get(PROJECTS, "1") is None
+    assert await store.count() == 3
+
+    await store.compact()
+
+    assert [r["id"] for r in await store.list(PROJECTS)] == ["4"]
+    (fields,) = (
+        sqlite3.connect(filename)
+        .execute("SELECT COUNT(*) FROM resource_fields")
+        .fetchone()
+    )
+    assert fields == 1
+    await store.close()
+
+
+def put_resources(filename, worker: int, count: int) -> None:
+    """Store resources from a separate process."""
+
+    async def put() -> None:
+        store = SQLiteResourceStore(filename, max_bytes=1024 * 1024)
+        for i in range(count):
+            await store.put(PROJECTS, f"{worker}-{i}", {"id": f"{worker}-{i}"})
+        await store.close()
+
+    asyncio.run(put())
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+@pytest.mark.asyncio
+async def test_sqlite_resource_store_concurrent_processes(filename):
+    """Test several processes write to the same database concurrently."""
+    processes = [
+        multiprocessing.get_context("fork").Process(
+            target=put_resources, args=(filename, worker, 50)
+        )
+        for worker in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert [process.exitcode for process in processes] == [0] * 4
+    store = SQLiteResourceStore(filename, max_bytes=1024 * 1024)
+    assert await store.count() == 200
+    await store.close()
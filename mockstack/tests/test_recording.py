@@ -0,0 +1,55 @@
+"""Tests for the recording module."""
+
+import pytest
+
+from mockstack.recording import TemplateRecorder
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [
+        ("/api/v1/projects", "api-v1-projects.j2"),
+        ("/api/v1/projects/1234", "api-v1-projects.1234.j2"),
+        (
+            "/api/v1/projects/1234/tasks/abcd",
+            "api-v1-projects-tasks.1234.abcd.j2",
+        ),
+        ("/", "index.j2"),
+    ],
+)
+def test_template_name_for(tmp_path, path, expected):
+    """Test recorded responses use the most specific filefixtures template name."""
+    recorder = TemplateRecorder(tmp_path)
+    assert recorder.template_name_for(path) == expected
+
+
+def test_template_source_for(tmp_path):
+    """Test converting response bodies into template source."""
+    recorder = TemplateRecorder(tmp_path)
+
+    assert recorder.template_source_for(b'{"id": 1}') == '{"id": 1}'
+    assert (
+        recorder.template_source_for(b'{"text": "{{ x }}"}')
+        == '{% raw %}{"text": "{{ x }}"}{% endraw %}'
+    )
+    assert recorder.template_source_for(b"{% endraw %}") is None
+    assert recorder.template_source_for(b"\xff\xfe\x00") is None
+
+
+def test_record(tmp_path):
+    """Test recording a response body into the templates directory."""
+    recorder = TemplateRecorder(tmp_path)
+
+    filename = recorder.record("/api/v1/projects/1234", b'{"id": "1234"}')
+
+    assert filename == tmp_path / "api-v1-projects.1234.j2"
+    assert filename.read_text() == '{"id": "1234"}'
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["api-v1-projects.1234.j2"]
+
+
+def test_record_non_text(tmp_path):
+    """Test binary responses are not recorded."""
+    recorder = TemplateRecorder(tmp_path)
+
+    assert recorder.record("/api/v1/files", b"\xff\xfe\x00") is None
+    assert list(tmp_path.iterdir()) == []
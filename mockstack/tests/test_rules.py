@@ -1,9 +1,17 @@
 """Unit-tests for the rules module."""
 
+import re
+
 import pytest
 from fastapi import Request
 
-from mockstack.rules import Rule, TemplateRuleResult, URLRuleResult
+from mockstack.rules import (
+    Rule,
+    RuleMatcher,
+    TemplateRuleResult,
+    URLRuleResult,
+    literal_prefix,
+)
 
 
 def test_rule_from_dict():
@@ -111,6 +119,7 @@ def test_rule_apply(pattern, replacement, path, expected_url):
     assert isinstance(result, URLRuleResult)
     assert result.get_result_type() == "url"
     assert result.url == expected_url
+    assert rule.apply(request, rule.regex.match(path)) == result
 
 
 def test_rule_apply_template():
@@ -136,3 +145,116 @@ def test_rule_apply_template():
     # The context should contain the extracted project ID from the path
     assert "projects" in result.template_context
     assert result.template_context["projects"] == "1234"
+
+
+@pytest.mark.parametrize(
+    "pattern,expected",
+    [
+        (r"^/api/v1/projects/(\d+)", "/api/v1/projects/"),
+        (r"/api/v1/projects/(\d+)", "/api/v1/projects/"),
+        (r"/api/v1?/items", "/api/v"),
+        (r"/api/v1+/items", "/api/v1"),
+        (r"/api/v1{0,1}/items", "/api/v"),
+        (r"/api\.v1/items", "/api.v1/items"),
+        (r"/api/\d+", "/api/"),
+        (r"/api/.*", "/api/"),
+        (r"/api|/v1", ""),
+        (r"(?i)/api", ""),
+        (r".*", ""),
+    ],
+)
+def test_literal_prefix(pattern, expected):
+    """Test extracting the literal prefix of a rule pattern."""
+    assert literal_prefix(pattern) == expected
+
+
+@pytest.mark.parametrize(
+    "pattern,replacement,path,expected",
+    [
+        (
+            r"/api/v1/projects/(\d+)",
+            r"/projects/\1",
+            "/api/v1/projects/123",
+            "/projects/123",
+        ),
+        (r"/api/v1/items", "/items", "/api/v1/items/api/v1/items", "/items/items"),
+        (
+            r"^/api/v1/items",
+            "/items",
+            "/api/v1/items/api/v1/items",
+            "/items/api/v1/items",
+        ),
+        (r"/api/(.*)", r"/\1", "/api/users", "/users"),
+        (r".*", "x", "/api", "xx"),
+        # top-level alternations are not anchored as a whole.
+        (r"^/a|x", "Y", "/a/x", "Y/Y"),
+    ],
+)
+def test_rule_url_for_with_match(pattern, replacement, path, expected):
+    """Test substitution from a known match is equivalent to re.sub."""
+    rule = Rule(pattern=pattern, replacement=replacement)
+    assert rule._url_for(path, rule.regex.match(path)) == expected
+    assert rule._url_for(path) == re.sub(pattern, replacement, path)
+
+
+@pytest.mark.parametrize(
+    "pattern,anchored",
+    [
+        (r"^/api", True),
+        (r"\A/api", True),
+        (r"/api", False),
+        (r"(?m)^/api", False),
+        (r"^/a|x", False),
+    ],
+)
+def test_rule_anchored(pattern, anchored):
+    """Test detecting patterns which can only match at the start of the path."""
+    assert Rule(pattern=pattern, replacement="/").anchored is anchored
+
+
+def linear_rule_for(rules, request):
+    """Reference implementation of finding the first matching rule."""
+    return next((rule for rule in rules if rule.matches(request)), None)
+
+
+def test_rule_matcher_preserves_first_match_wins():
+    """Test the compiled matcher returns the same rule as a linear scan."""
+    rules = [
+        Rule(pattern=r"/api/v1/projects/(\d+)/tasks", replacement="/a", method="GET"),
+        Rule(pattern=r".*/health", replacement="/b"),
+        Rule(pattern=r"^/api/v1/projects/(\d+)", replacement="/c", method="POST"),
+        Rule(pattern=r"/api/v1/projects", replacement="/d"),
+        Rule(pattern=r"/api/v1/users/([^/]+)", replacement="/e", method="get"),
+        Rule(pattern=r"/api/v1/users|/api/v2/users", replacement="/f"),
+        Rule(pattern=r"/api/v1/", replacement="/g"),
+        Rule(pattern=r"/api/v2?/users", replacement="/h"),
+    ]
+    matcher = RuleMatcher(rules)
+
+    paths = [
+        "/api/v1/projects/123/tasks",
+        "/api/v1/projects/123",
+        "/api/v1/projects",
+        "/api/v1/users/abc",
+        "/api/v2/users",
+        "/api/v/users",
+        "/api/v1/health",
+        "/api/v1/other",
+        "/nothing/here",
+        "/",
+    ]
+    for method in ("GET", "POST", "DELETE", "get"):
+        for path in paths:
+            request = Request(
+                scope={
+                    "type": "http",
+                    "method": method,
+                    "path": path,
+                    "query_string": b"",
+                    "headers": [],
+                }
+            )
+            assert matcher.rule_for(request) is linear_rule_for(rules, request), (
+                method,
+                path,
+            )
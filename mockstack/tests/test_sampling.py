@@ -0,0 +1,44 @@
+"""Tests for the sampling module."""
+
+from unittest.mock import patch
+
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+from mockstack.config import OpenTelemetrySettings
+from mockstack.sampling import RateLimitingSampler, sampler_for
+
+
+def test_rate_limiting_sampler():
+    """Test the rate limiting sampler bounds the number of sampled traces."""
+    with patch("mockstack.sampling.time.monotonic", return_value=100.0) as now:
+        sampler = RateLimitingSampler(5)
+
+        decisions = [
+            sampler.should_sample(None, trace_id, "span").decision.is_sampled()
+            for trace_id in range(1, 11)
+        ]
+        assert decisions == [True] * 5 + [False] * 5
+
+        # tokens are replenished over time.
+        now.return_value = 100.2
+        assert sampler.should_sample(None, 11, "span").decision.is_sampled()
+        assert not sampler.should_sample(None, 12, "span").decision.is_sampled()
+
+
+def test_rate_limiting_sampler_delegate():
+    """Test traces dropped by the delegate sampler do not use up the limit."""
+    sampler = RateLimitingSampler(5, delegate=TraceIdRatioBased(0.0))
+
+    assert not sampler.should_sample(None, 1, "span").decision.is_sampled()
+    assert sampler._tokens == 5
+
+
+def test_sampler_for():
+    """Test building the sampler from the settings."""
+    sampler = sampler_for(
+        OpenTelemetrySettings(sample_ratio=0.5, max_traces_per_second=100)
+    )
+
+    assert isinstance(sampler, ParentBased)
+    assert "TraceIdRatioBased{0.5}" in sampler.get_description()
+    assert "RateLimitingSampler{100.0" in sampler.get_description()
@@ -0,0 +1,130 @@
+"""Tests for the server module."""
+
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+
+from mockstack.config import ServerSettings
+from mockstack.constants import (
+    SERIALIZED_SETTINGS_ENV_VAR,
+    ServerHTTPProtocol,
+    ServerLoop,
+)
+from mockstack.main import create_app_from_environment
+from mockstack.server import (
+    APP_FACTORY,
+    WorkerRestarts,
+    effective_http,
+    effective_loop,
+    serve,
+    server_options,
+)
+
+
+def test_serve_single_worker(settings):
+    """Test a single worker serves the app in-process."""
+    app = FastAPI()
+    with patch("mockstack.server.uvicorn.run") as mock_run:
+        serve(app, settings)
+
+    mock_run.assert_called_once_with(app, **server_options(settings))
+
+
+def test_serve_multiple_workers_forked(settings):
+    """Test multiple workers are forked where supported."""
+    settings.workers = 4
+    app = FastAPI()
+    with patch("mockstack.server.serve_forked") as mock_serve_forked:
+        serve(app, settings)
+
+    mock_serve_forked.assert_called_once_with(app, settings)
+
+
+def test_serve_multiple_workers_spawned(settings, monkeypatch):
+    """Test workers are spawned with the app factory where fork is unavailable."""
+    settings.workers = 4
+    monkeypatch.delattr(os, "fork")
+    monkeypatch.delenv(SERIALIZED_SETTINGS_ENV_VAR, raising=False)
+    with patch("mockstack.server.uvicorn.run") as mock_run:
+        serve(MagicMock(), settings)
+
+    mock_run.assert_called_once_with(
+        APP_FACTORY,
+        factory=True,
+        workers=4,
+        **server_options(settings),
+    )
+    assert os.environ[SERIALIZED_SETTINGS_ENV_VAR] == settings.model_dump_json()
+
+
+def test_create_app_from_environment(settings, monkeypatch):
+    """Test the app factory rebuilds the app from serialized settings."""
+    settings.strategy = "filefixtures"
+    monkeypatch.setenv(SERIALIZED_SETTINGS_ENV_VAR, settings.model_dump_json())
+
+    app = create_app_from_environment()
+
+    assert app.state.strategy.settings == settings
+
+
+def test_server_options(settings):
+    """Test server tuning settings are passed through to uvicorn."""
+    settings.server = ServerSettings(
+        loop=ServerLoop.ASYNCIO,
+        http=ServerHTTPProtocol.H11,
+        backlog=4096,
+        limit_concurrency=1000,
+        timeout_keep_alive=30,
+        h11_max_incomplete_event_size=1024,
+        access_log=False,
+    )
+
+    assert server_options(settings) == {
+        "host": settings.host,
+        "port": settings.port,
+        "loop": "asyncio",
+        "http": "h11",
+        "backlog": 4096,
+        "limit_concurrency": 1000,
+        "timeout_keep_alive": 30,
+        "h11_max_incomplete_event_size": 1024,
+        "access_log": False,
+    }
+
+
+def test_server_options_default_h11_max_incomplete_event_size(settings):
+    """Test the h11 default is kept when not configured."""
+    assert "h11_max_incomplete_event_size" not in server_options(settings)
+
+
+def test_effective_loop_and_http():
+    """Test resolving the automatic event loop and HTTP parser choice."""
+    assert effective_loop(ServerLoop.ASYNCIO) == ServerLoop.ASYNCIO
+    assert effective_http(ServerHTTPProtocol.H11) == ServerHTTPProtocol.H11
+
+    with patch("mockstack.server.importlib.util.find_spec", return_value=None):
+        assert effective_loop(ServerLoop.AUTO) == ServerLoop.ASYNCIO
+        assert effective_http(ServerHTTPProtocol.AUTO) == ServerHTTPProtocol.H11
+
+    with patch("mockstack.server.importlib.util.find_spec", return_value=object()):
+        assert effective_loop(ServerLoop.AUTO) == ServerLoop.UVLOOP
+        assert effective_http(ServerHTTPProtocol.AUTO) == ServerHTTPProtocol.HTTPTOOLS
+
+
+def test_worker_restarts():
+    """Test restarts back off while workers keep failing fast, up to a limit."""
+    restarts = WorkerRestarts(
+        min_uptime=10, initial_delay=0.5, max_delay=1.5, max_failures=5
+    )
+
+    assert [restarts.delay_for(1) for _ in range(3)] == [0.5, 1.0, 1.5]
+    # a worker which ran for a while resets the backoff.
+    assert restarts.delay_for(60) == 0
+    assert restarts.delay_for(1) == 0.5
+
+    for _ in range(3):
+        restarts.delay_for(1)
+    with pytest.raises(RuntimeError, match="5 times in a row"):
+        restarts.delay_for(1)
@@ -0,0 +1,75 @@
+"""Tests for the singleflight module."""
+
+import asyncio
+
+import pytest
+
+from mockstack.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_concurrent_calls():
+    """Test concurrent calls for the same key share a single call."""
+    inflight: SingleFlight[int] = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def fn() -> int:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return calls
+
+    waiters = [asyncio.create_task(inflight.do("key", fn)) for _ in range(5)]
+    other = asyncio.create_task(inflight.do("other", fn))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [1] * 5
+    assert await other == 2
+    assert inflight.calls == 2
+    assert inflight.coalesced == 4
+    assert len(inflight) == 0
+
+    # completed calls are not reused.
+    assert await inflight.do("key", fn) == 3
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_exceptions():
+    """Test an exception raised by the call is raised to every caller."""
+    inflight: SingleFlight[int] = SingleFlight()
+    release = asyncio.Event()
+
+    async def fn() -> int:
+        await release.wait()
+        raise ValueError("upstream failed")
+
+    waiters = [asyncio.create_task(inflight.do("key", fn)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_caller_cancellation():
+    """Test cancelling one caller does not cancel the shared call."""
+    inflight: SingleFlight[str] = SingleFlight()
+    release = asyncio.Event()
+
+    async def fn() -> str:
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(inflight.do("key", fn))
+    second = asyncio.create_task(inflight.do("key", fn))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
@@ -0,0 +1,96 @@
+"""Tests for the startup time of mockstack.
+
+Each test starts a fresh interpreter, since modules imported by other tests
+would otherwise already be loaded.
+
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+FASTAPI_IMPORTS_ORJSON = (
+    "orjson"
+    in subprocess.run(
+        [sys.executable, "-c", "import sys, fastapi.responses; print(*sys.modules)"],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.split()
+)
+
+# modules which are slow to import and only needed for some configurations.
+DEFERRED_MODULES = (
+    "grpc",
+    "httpx",
+    "ollama",
+    # unless imported by FastAPI itself, for its ORJSONResponse.
+    pytest.param(
+        "orjson",
+        marks=pytest.mark.skipif(
+            FASTAPI_IMPORTS_ORJSON, reason="imported by fastapi.responses"
+        ),
+    ),
+    "opentelemetry.exporter.otlp.proto.grpc.trace_exporter",
+    "opentelemetry.exporter.otlp.proto.http.trace_exporter",
+    "opentelemetry.sdk.trace",
+    "prometheus_client",
+    "pyarrow",
+    "uvicorn",
+    "yaml",
+    "mockstack.llm.ollama",
+    "mockstack.strategies.proxyrules",
+)
+
+STARTUP_SCRIPT = """
+import json, sys, time
+
+start = time.perf_counter()
+
+from mockstack.config import Settings
+from mockstack.main import create_app
+
+create_app(Settings(strategy="filefixtures", templates_dir=sys.argv[1]))
+
+print(json.dumps({
+    "duration": time.perf_counter() - start,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+
+def run_startup(templates_dir: str) -> dict:
+    """Create the app in a fresh interpreter, reporting what was imported."""
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT, templates_dir],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+@pytest.fixture(scope="module")
+def startup():
+    """Startup report of the default filefixtures app, shared by the module."""
+    return run_startup(os.path.join(os.path.dirname(__file__), "fixtures", "templates"))
+
+
+@pytest.mark.parametrize("module", DEFERRED_MODULES)
+def test_startup_defers_imports(startup, module):
+    """Test creating the default app does not import optional heavy modules."""
+    assert module not in startup["modules"]
+
+
+def test_startup_time(startup, record_property):
+    """Benchmark the time to import mockstack and create the app.
+
+    The duration is reported in the test results (e.g. with --junitxml)
+    rather than asserted on, as it depends on the machine.
+
+    """
+    record_property("startup_duration_seconds", startup["duration"])
+    assert startup["duration"] > 0
@@ -0,0 +1,155 @@
+"""Tests for the store module."""
+
+import pytest
+
+from mockstack.persistence import SQLiteResourceStore
+from mockstack.store import (
+    ResourceStore,
+    index_value,
+    resource_key_for,
+    resource_store_for,
+)
+
+PROJECTS = ("api-v1-projects", ())
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [
+        ("/api/v1/projects", (PROJECTS, None)),
+        ("/api/v1/projects/1234", (PROJECTS, "1234")),
+        ("/api/v1/projects/1234/", (PROJECTS, "1234")),
+        (
+            "/api/v1/projects/1234/tasks",
+            (("api-v1-projects-tasks", ("1234",)), None),
+        ),
+        (
+            "/api/v1/projects/1234/tasks/5678",
+            (("api-v1-projects-tasks", ("1234",)), "5678"),
+        ),
+    ],
+)
+def test_resource_key_for(path, expected):
+    """Test deriving collections and ids from request paths."""
+    assert resource_key_for(path) == expected
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [("active", "active"), (3, "3"), (True, "true"), (None, "null")],
+)
+def test_index_value(value, expected):
+    """Test indexed values compare equal to query parameters."""
+    assert index_value(value) == expected
+
+
+@pytest.mark.asyncio
+async def test_resource_store_put_get_delete():
+    """Test storing, reading, replacing and deleting resources."""
+    store = ResourceStore(max_bytes=1024)
+
+    await store.put(PROJECTS, "1", {"id": "1", "name": "first"})
+    await store.put(PROJECTS, "1", {"id": "1", "name": "replaced"})
+
+    assert await store.get(PROJECTS, "1") == {"id": "1", "name": "replaced"}
+    assert await store.get(PROJECTS, "2") is None
+    assert await store.get(("api-v1-users", ()), "1") is None
+    assert await store.contains(PROJECTS)
+    assert await store.count() == 1
+
+    assert await store.delete(PROJECTS, "1") == {"id": "1", "name": "replaced"}
+    assert await store.delete(PROJECTS, "1") is None
+    assert await store.get(PROJECTS, "1") is None
+    assert not await store.contains(PROJECTS)
+
+
+@pytest.mark.asyncio
+async def test_resource_store_list():
+    """Test listing collections in store order, filtered by indexed fields."""
+    store = ResourceStore(max_bytes=1024, indexed_fields=["status", "owner"])
+    await store.put(PROJECTS, "1", {"id": "1", "status": "active", "owner": "a"})
+    await store.put(PROJECTS, "2", {"id": "2", "status": "archived", "owner": "a"})
+    await store.put(PROJECTS, "3", {"id": "3", "status": "active", "owner": "b"})
+    await store.put(("api-v1-users", ()), "4", {"id": "4", "status": "active"})
+
+    assert [r["id"] for r in await store.list(PROJECTS)] == ["1", "2", "3"]
+    assert [r["id"] for r in await store.list(PROJECTS, {"status": "active"})] == [
+        "1",
+        "3",
+    ]
+    assert [
+        r["id"] for r in await store.list(PROJECTS, {"status": "active", "owner": "b"})
+    ] == ["3"]
+    assert await store.list(PROJECTS, {"status": "deleted"}) == []
+
+    # indexes follow updates and deletes.
+    await store.put(PROJECTS, "2", {"id": "2", "status": "active", "owner": "a"})
+    await store.delete(PROJECTS, "1")
+    assert [r["id"] for r in await store.list(PROJECTS, {"status": "active"})] == [
+        "3",
+        "2",
+    ]
+
+    with pytest.raises(ValueError, match="not indexed"):
+        await store.list(PROJECTS, {"name": "x"})
+
+
+@pytest.mark.asyncio
+async def test_resource_store_evicts_least_recently_used():
+    """Test the store is bounded by the size of its resources."""
+    store = ResourceStore(max_bytes=70, indexed_fields=["status"])
+    await store.put(PROJECTS, "1", {"id": "1", "status": "active"})
+    await store.put(PROJECTS, "2", {"id": "2", "status": "active"})
+    await store.get(PROJECTS, "1")
+
+    await store.put(PROJECTS, "3", {"id": "3", "status": "active"})
+
+    assert await store.get(PROJECTS, "2") is None
+    assert [r["id"] for r in await store.list(PROJECTS, {"status": "active"})] == [
+        "1",
+        "3",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_resource_store_ttl():
+    """Test resources expire after the TTL since they were last written."""
+    now = 0.0
+    store = ResourceStore(max_bytes=1024, ttl=10, clock=lambda: now)
+    await store.put(PROJECTS, "1", {"id": "1"})
+
+    now = 5.0
+    await store.put(PROJECTS, "2", {"id": "2"})
+    assert await store.get(PROJECTS, "1") == {"id": "1"}
+
+    now = 10.0
+    assert await store.get(PROJECTS, "1") is None
+    assert await store.list(PROJECTS) == [{"id": "2"}]
+    assert await store.count() == 1
+
+
+@pytest.mark.asyncio
+async def test_resource_store_compact():
+    """Test compaction removes expired resources without accessing them."""
+    now = 0.0
+    store = ResourceStore(max_bytes=1024, ttl=10, clock=lambda: now)
+    await store.put(PROJECTS, "1", {"id": "1"})
+    now = 5.0
+    await store.put(PROJECTS, "2", {"id": "2"})
+
+    now = 12.0
+    await store.compact()
+
+    assert await store.count() == 1
+    assert await store.get(PROJECTS, "2") == {"id": "2"}
+
+
+def test_resource_store_for(settings, tmp_path):
+    """Test the resource store is persisted when a path is configured."""
+    assert resource_store_for(settings) is None
+
+    settings.filefixtures_resource_store = True
+    assert isinstance(resource_store_for(settings), ResourceStore)
+
+    settings.filefixtures_resource_store_path = tmp_path / "resources.db"
+    assert isinstance(resource_store_for(settings), SQLiteResourceStore)
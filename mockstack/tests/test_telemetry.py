@@ -2,18 +2,18 @@
 
 from unittest.mock import MagicMock, patch
 
-import pytest
 from fastapi import FastAPI, Request
-from starlette.responses import Response, StreamingResponse
+from starlette.datastructures import Headers
 
 from mockstack.config import OpenTelemetrySettings, Settings
+from mockstack.constants import OpenTelemetryExporterProtocol
 from mockstack.telemetry import (
-    extract_body,
+    ResponseBodyCapture,
     opentelemetry_provider,
+    span_exporter_for,
     span_name_for,
     with_request_attributes,
     with_response_attributes,
-    with_response_body,
 )
 
 
@@ -53,108 +53,98 @@ def test_with_request_attributes():
     )
 
     span = MagicMock()
-    sensitive_headers = ["authorization"]
+    sensitive_headers = frozenset({"authorization"})
 
     with_request_attributes(request, span, sensitive_headers=sensitive_headers)
 
-    # Verify basic request attributes
-    span.set_attribute.assert_any_call("http.method", "POST")
-    span.set_attribute.assert_any_call(
-        "http.url", "https://example.com:8443/test/path?key=value&other=123"
-    )
-    span.set_attribute.assert_any_call("http.scheme", "https")
-    span.set_attribute.assert_any_call("http.host", "example.com")
-    span.set_attribute.assert_any_call("http.target", "/test/path")
-    span.set_attribute.assert_any_call("http.server_port", 8443)
-
-    # Verify client information
-    span.set_attribute.assert_any_call("net.peer.ip", "127.0.0.1")
-    span.set_attribute.assert_any_call("net.peer.port", 12345)
-
-    # Verify headers (excluding sensitive)
-    span.set_attribute.assert_any_call("http.request.header.user-agent", "test-client")
-    span.set_attribute.assert_any_call(
-        "http.request.header.content-type", "application/json"
+    # Verify all attributes are set at once, excluding sensitive headers
+    span.set_attributes.assert_called_once_with(
+        {
+            "http.method": "POST",
+            "http.url": "https://example.com:8443/test/path?key=value&other=123",
+            "http.scheme": "https",
+            "http.host": "example.com",
+            "http.target": "/test/path",
+            "http.server_port": 8443,
+            "net.peer.ip": "127.0.0.1",
+            "net.peer.port": 12345,
+            "http.request.header.user-agent": "test-client",
+            "http.request.header.content-type": "application/json",
+            "http.request.header.host": "example.com:8443",
+            "http.request.query.key": "value",
+            "http.request.query.other": "123",
+        }
     )
-
-    # Verify query parameters
-    span.set_attribute.assert_any_call("http.request.query.key", "value")
-    span.set_attribute.assert_any_call("http.request.query.other", "123")
-
-    # Verify sensitive headers are not included
-    for args in span.set_attribute.call_args_list:
-        assert not any("authorization" in str(arg) for arg in args[0])
+    span.set_attribute.assert_not_called()
 
 
 def test_with_response_attributes():
     """Test adding response attributes to span."""
-    response = Response(
-        content="test content",
-        status_code=200,
-        headers={
+    headers = Headers(
+        {
             "content-type": "text/plain",
             "content-length": "11",
             "x-secret": "sensitive",
-        },
+        }
     )
     span = MagicMock()
-    sensitive_headers = ["x-secret"]
+    sensitive_headers = frozenset({"x-secret"})
 
-    with_response_attributes(response, span, sensitive_headers=sensitive_headers)
+    with_response_attributes(200, headers, span, sensitive_headers=sensitive_headers)
 
-    # Verify response attributes
-    span.set_attribute.assert_any_call("http.status_code", 200)
-    span.set_attribute.assert_any_call("http.response_content_length", "11")
-
-    # Verify headers (excluding sensitive)
-    span.set_attribute.assert_any_call(
-        "http.response.header.content-type", "text/plain"
+    # Verify all attributes are set at once, excluding sensitive headers
+    span.set_attributes.assert_called_once_with(
+        {
+            "http.status_code": 200,
+            "http.response_content_length": "11",
+            "http.response.header.content-type": "text/plain",
+            "http.response.header.content-length": "11",
+        }
     )
-    span.set_attribute.assert_any_call("http.response.header.content-length", "11")
 
-    # Verify sensitive headers are not included
-    for args in span.set_attribute.call_args_list:
-        assert not any("x-secret" in str(arg) for arg in args[0])
 
+def test_response_body_capture():
+    """Test capturing a response body from chunks."""
+    capture = ResponseBodyCapture(1024)
+    for chunk in [b"part1", b"part2", b"part3"]:
+        capture.write(chunk)
 
-@pytest.mark.asyncio
-async def test_with_response_body():
-    """Test adding response body to span."""
-    body_content = b"test response body"
-    response = StreamingResponse(
-        content=iter([body_content]),
-        status_code=200,
-        headers={"content-type": "text/plain"},
-    )
-    span = MagicMock()
+    assert capture.attributes("application/json") == {
+        "http.response.body.size": 15,
+        "http.response.body.truncated": False,
+        "http.response.body.content_type": "application/json",
+        "http.response.body": "part1part2part3",
+    }
 
-    new_response, updated_span = await with_response_body(response, span)
 
-    # Verify response body was added to span
-    span.set_attribute.assert_called_once_with(
-        "http.response.body", body_content.decode()
-    )
+def test_response_body_capture_truncated():
+    """Test bodies larger than the buffer are truncated."""
+    capture = ResponseBodyCapture(8)
+    for chunk in [b"part1", b"part2", b"part3"]:
+        capture.write(chunk)
 
-    # Verify new response has same properties
-    assert new_response.status_code == 200
-    assert new_response.headers["content-type"] == "text/plain"
-    assert new_response.body == body_content
+    attributes = capture.attributes("text/plain; charset=utf-8")
+    assert attributes["http.response.body"] == "part1par"
+    assert attributes["http.response.body.size"] == 15
+    assert attributes["http.response.body.truncated"] is True
 
 
-@pytest.mark.asyncio
-async def test_extract_body():
-    """Test extracting body from streaming response."""
-    # Test with bytes content
-    bytes_content = [b"part1", b"part2", b"part3"]
-    response = StreamingResponse(content=iter(bytes_content))
-    body = await extract_body(response)
-    assert body == "part1part2part3"
+def test_response_body_capture_content_length():
+    """Test the buffer is sized to the content length when known."""
+    assert len(ResponseBodyCapture(1024, content_length=10).buffer) == 10
+    assert len(ResponseBodyCapture(1024, content_length=4096).buffer) == 1024
 
-    # Test with string content
-    str_content = ["part1", "part2", "part3"]
-    response = StreamingResponse(content=iter(str_content))
-    body = await extract_body(response)
-    assert body == "part1part2part3"
+
+def test_response_body_capture_binary():
+    """Test binary and invalid UTF-8 bodies do not fail capturing."""
+    capture = ResponseBodyCapture(1024)
+    capture.write(b"\x89PNG\xff")
+
+    attributes = capture.attributes("image/png")
+    assert "http.response.body" not in attributes
+    assert attributes["http.response.body.size"] == 5
+
+    assert capture.attributes(None)["http.response.body"] == "\ufffdPNG\ufffd"
 
 
 def test_opentelemetry_provider_disabled(templates_dir):
@@ -170,9 +160,9 @@ def test_opentelemetry_provider_disabled(templates_dir):
     assert opentelemetry_provider(app, settings) is None
 
 
-@patch("mockstack.telemetry.OTLPSpanExporter")
-@patch("mockstack.telemetry.BatchSpanProcessor")
-@patch("mockstack.telemetry.TracerProvider")
+@patch("opentelemetry.exporter.otlp.proto.grpc.trace_exporter.OTLPSpanExporter")
+@patch("opentelemetry.sdk.trace.export.BatchSpanProcessor")
+@patch("opentelemetry.sdk.trace.TracerProvider")
 @patch("mockstack.telemetry.trace")
 @patch("mockstack.telemetry.metadata")
 def test_opentelemetry_provider_enabled(
@@ -212,7 +202,33 @@ def test_opentelemetry_provider_enabled(
 
     # Verify exporter setup
     mock_otlp_exporter.assert_called_once_with(endpoint="http://localhost:4317")
-    mock_batch_processor.assert_called_once_with(mock_otlp_exporter.return_value)
+    mock_batch_processor.assert_called_once_with(
+        mock_otlp_exporter.return_value,
+        max_queue_size=None,
+        schedule_delay_millis=None,
+        max_export_batch_size=None,
+        export_timeout_millis=None,
+    )
     mock_provider_instance.add_span_processor.assert_called_once_with(
         mock_batch_processor.return_value
     )
+
+
+@patch("opentelemetry.exporter.otlp.proto.http.trace_exporter.OTLPSpanExporter")
+@patch("opentelemetry.exporter.otlp.proto.grpc.trace_exporter.OTLPSpanExporter")
+def test_span_exporter_for(mock_grpc_exporter, mock_http_exporter):
+    """Test choosing the exporter transport from the settings."""
+    grpc = span_exporter_for(OpenTelemetrySettings(endpoint="http://collector:4317"))
+    http = span_exporter_for(
+        OpenTelemetrySettings(
+            endpoint="http://collector:4318/v1/traces",
+            protocol=OpenTelemetryExporterProtocol.HTTP_PROTOBUF,
+        )
+    )
+
+    assert grpc is mock_grpc_exporter.return_value
+    mock_grpc_exporter.assert_called_once_with(endpoint="http://collector:4317")
+    assert http is mock_http_exporter.return_value
+    mock_http_exporter.assert_called_once_with(
+        endpoint="http://collector:4318/v1/traces"
+    )
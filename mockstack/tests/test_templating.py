@@ -1,5 +1,7 @@
 """Unit tests for the templates module."""
 
+import asyncio
+
 import pytest
 from fastapi import Request
 
@@ -7,6 +9,7 @@ from mockstack.templating import (
     iter_possible_template_arguments,
     iter_possible_template_filenames,
     parse_template_name_segments_and_identifiers,
+    templates_env_provider,
 )
 
 
@@ -275,3 +278,38 @@ def test_iter_possible_template_filenames():
         "api_v1_projects.html",
         "default.html",
     ]
+
+
+@pytest.mark.asyncio
+async def test_templates_env_provider_renders_async_globals():
+    """Test template functions returning awaitables do not block other renders."""
+    env = templates_env_provider()
+
+    async def llm(messages, model):
+        await asyncio.sleep(0.05)
+        return f'{model} says "hi"'
+
+    env.globals["ollama"] = llm
+    template = env.from_string(
+        '{"content": "{{ ollama(messages, \'llama3.2\') | json_escape }}"}'
+    )
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(template.render_async(messages=[]) for _ in range(10))),
+        timeout=0.4,
+    )
+
+    assert results == ['{"content": "llama3.2 says \\"hi\\""}'] * 10
+
+
+@pytest.mark.asyncio
+async def test_templates_env_provider_ollama_missing(monkeypatch):
+    """Test the ollama function only fails once called when ollama is missing."""
+    from mockstack.llm import ollama
+
+    monkeypatch.setattr(ollama, "IS_OLLAMA_AVAILABLE", False)
+    env = templates_env_provider()
+    template = env.from_string("{{ ollama([]) }}")
+
+    with pytest.raises(RuntimeError, match="Ollama is not available"):
+        await template.render_async()